@@ -0,0 +1,226 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark the Calendars load (GetCalendarList and the GetPermissions
+of every calendar) on a synthetic organization, serially and with the
+concurrent permission loading, ie,
+    python benchmarks/bench_calendars.py --calendars 20000 \
+        --permissions 200000 --latency 0.005
+Each scenario runs in its own process and reports the wall time, the
+peak RSS and, in a second run under tracemalloc, the peak and retained
+allocations. With --baseline, the results are compared with the stored
+ones and the exit status is 1 if any is worse by more than --tolerance.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+BACKEND = 'uw_trumba.util.backend.SyntheticBackend'
+SCENARIOS = (('serial', False), ('concurrent', True))
+METRICS = ('wall_seconds', 'peak_rss_mb', 'alloc_peak_mb', 'retained_mb')
+
+
+def configure_settings():
+    """
+    Use the settings of conf/test.conf, before uw_trumba is imported
+    """
+    from commonconf.backends import use_configparser_backend
+    use_configparser_backend(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "conf", "test.conf"), "Trumba")
+
+
+def _setup(options):
+    from commonconf import override_settings
+    configure_settings()
+    from uw_trumba.util.backend import (
+        SyntheticBackend, lognormal_latency, uniform_latency)
+    from uw_trumba.util.synthetic import SyntheticOrg
+
+    settings = override_settings(
+        RESTCLIENTS_DAO_CLASS=BACKEND,
+        RESTCLIENTS_MAX_WORKERS=options['workers'],
+        RESTCLIENTS_MAX_RETRIES=0,
+        RESTCLIENTS_CIRCUIT_FAILURES=0)
+    settings.__enter__()
+    latency = options['latency']
+    if latency and options['latency_dist'] == 'uniform':
+        latency = uniform_latency(0, 2 * latency)
+    elif latency and options['latency_dist'] == 'lognormal':
+        latency = lognormal_latency(latency)
+    SyntheticBackend.configure(
+        SyntheticOrg(options['calendars'], options['permissions'],
+                     options['seed']),
+        latency)
+    return SyntheticBackend
+
+
+def _run_scenario(options, concurrent, trace_allocations):
+    backend = _setup(options)
+    from uw_trumba.calendars import Calendars
+
+    if trace_allocations:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    calendars = Calendars(concurrent=concurrent)
+    wall_seconds = time.perf_counter() - start_time
+    result = {'requests': backend.get_request_count(),
+              'calendars': sum(len(cals) for cals in
+                               calendars.campus_calendars.values())}
+    if trace_allocations:
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['alloc_peak_mb'] = peak / 2 ** 20
+        result['retained_mb'] = retained / 2 ** 20
+    else:
+        result['wall_seconds'] = wall_seconds
+        result['peak_rss_mb'] = get_peak_rss_mb()
+    return result
+
+
+def get_peak_rss_mb():
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _call(queue, target, args):
+    queue.put(target(*args))
+
+
+def run_in_process(target, *args):
+    """
+    :return: the result of target(*args) called in a new process, so
+    that its peak RSS is its own
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_call, args=(queue, target, args))
+    process.start()
+    # the result is small enough to be flushed before the exit
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError("The benchmark process failed ({0})".format(
+            process.exitcode))
+    return queue.get()
+
+
+def run_benchmarks(options):
+    """
+    :return: a dict of {scenario name, dict of the measurements}
+    """
+    results = {}
+    for name, concurrent in SCENARIOS:
+        result = run_in_process(_run_scenario, options, concurrent, False)
+        if options['allocations']:
+            result.update(run_in_process(
+                _run_scenario, options, concurrent, True))
+        results[name] = result
+    return results
+
+
+def get_regressions(results, baseline, tolerance):
+    """
+    :return: a list of the messages of the measurements worse than
+    the baseline by more than the tolerance fraction
+    """
+    regressions = []
+    for name, result in results.items():
+        for metric in METRICS:
+            expected = baseline.get(name, {}).get(metric)
+            if expected is None or metric not in result:
+                continue
+            if result[metric] > expected * (1 + tolerance):
+                regressions.append(
+                    "{0} {1}: {2:.3f} > {3:.3f} (+{4:.0%})".format(
+                        name, metric, result[metric], expected,
+                        result[metric] / expected - 1))
+    return regressions
+
+
+def format_results(results):
+    lines = ["{0:<12} {1:>9} {2:>10} {3:>12} {4:>14} {5:>12}".format(
+        "scenario", "requests", "wall(s)", "peak RSS(MB)",
+        "alloc peak(MB)", "retained(MB)")]
+    for name, result in results.items():
+        lines.append(
+            "{0:<12} {1:>9} {2:>10.3f} {3:>12.1f} {4:>14} {5:>12}".format(
+                name, result['requests'], result['wall_seconds'],
+                result['peak_rss_mb'],
+                _format_mb(result.get('alloc_peak_mb')),
+                _format_mb(result.get('retained_mb'))))
+    return "\n".join(lines)
+
+
+def _format_mb(value):
+    return "-" if value is None else "{0:.1f}".format(value)
+
+
+def _get_key(options):
+    return "{calendars}x{permissions}@{latency}s{0}/{workers}w".format(
+        "" if options['latency_dist'] == 'constant'
+        else "-" + options['latency_dist'], **options)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calendars", type=int, default=2000)
+    parser.add_argument("--permissions", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds per response")
+    parser.add_argument("--latency-dist", default="constant",
+                        choices=("constant", "uniform", "lognormal"),
+                        help="the latency is the mean of a uniform or "
+                        "the median of a lognormal distribution")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-allocations", dest="allocations",
+                        action="store_false",
+                        help="skip the tracemalloc runs")
+    parser.add_argument("--baseline",
+                        help="a json file of the stored baselines")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results in the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    options = vars(parser.parse_args(args))
+
+    results = run_benchmarks(options)
+    print("{0} calendars, {1} permissions, {2}s latency, {3} workers".format(
+        options['calendars'], options['permissions'], options['latency'],
+        options['workers']))
+    print(format_results(results))
+
+    if options['baseline'] is None:
+        return 0
+    baselines = {}
+    if os.path.exists(options['baseline']):
+        with open(options['baseline']) as f:
+            baselines = json.load(f)
+    key = _get_key(options)
+    if options['save_baseline']:
+        baselines[key] = results
+        with open(options['baseline'], 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print("Baseline {0} saved".format(key))
+        return 0
+    if key not in baselines:
+        print("No baseline for {0}".format(key))
+        return 0
+    regressions = get_regressions(results, baselines[key],
+                                  options['tolerance'])
+    for message in regressions:
+        print("REGRESSION {0}".format(message))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
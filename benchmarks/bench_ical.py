@@ -0,0 +1,208 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark the parsing and the range queries of synthetic calendar
+feeds shaped like the Trumba ones, ie,
+    python benchmarks/bench_ical.py --events 1000,10000,100000
+Each feed is read in three modes, each in its own process:
+    full    load_ical and walk('VEVENT'), queries scan all the events
+    stream  iter_events on the open feed file, a query re-reads it
+    index   load_ical and get_event_index, queries use the EventIndex
+and reports the parse time (with the index build in the index mode),
+the time to the first event, the peak RSS added by the parse, the range
+query latency and, for the full and index modes, the get_occurrences
+latency of the same windows.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta, timezone
+
+from bench_calendars import configure_settings, get_peak_rss_mb, \
+    run_in_process
+
+MODES = ('full', 'stream', 'index')
+FIRST_DAY = date(2015, 1, 1)
+DAYS = 1461
+
+
+def _get_windows(options):
+    """
+    :return: a list of the (start, end) date windows of the queries
+    """
+    rand = random.Random(options['seed'])
+    windows = []
+    for _ in range(options['queries']):
+        start = FIRST_DAY + timedelta(days=rand.randrange(DAYS))
+        windows.append((start, start + timedelta(
+            days=options['window_days'])))
+    return windows
+
+
+def _scan(events, tz, start, end):
+    from uw_trumba.events import get_event_interval, _to_datetime
+    start = _to_datetime(start, tz)
+    end = _to_datetime(end, tz)
+    found = 0
+    for event in events:
+        event_start, event_end = get_event_interval(event, tz)
+        if event_start is not None and (
+                event_start < end and
+                (event_end > start or event_start >= start)):
+            found += 1
+    return found
+
+
+def _time_queries(query, windows):
+    """
+    :return: the mean seconds of query(start, end) on the windows
+    """
+    start_time = time.perf_counter()
+    for start, end in windows:
+        query(start, end)
+    return (time.perf_counter() - start_time) / len(windows)
+
+
+def _run_mode(path, mode, options):
+    configure_settings()
+    from restclients_core.models import MockHTTP
+    from uw_trumba import load_ical
+    from uw_trumba.events import get_calendar_timezone, get_event_index
+    from uw_trumba.ical import iter_events
+    from uw_trumba.recurrence import get_occurrences
+
+    windows = _get_windows(options)
+    rss_before = get_peak_rss_mb()
+    result = {}
+    start_time = time.perf_counter()
+    if mode == 'stream':
+        count = 0
+        with open(path, 'rb') as f:
+            for event in iter_events(f):
+                if count == 0:
+                    result['first_event_seconds'] = (
+                        time.perf_counter() - start_time)
+                count += 1
+        result['parse_seconds'] = time.perf_counter() - start_time
+        result['peak_rss_mb'] = get_peak_rss_mb() - rss_before
+
+        def query(start, end):
+            # the events are only available by reading the feed again,
+            # without the X-WR-TIMEZONE of the calendar
+            with open(path, 'rb') as f:
+                return _scan(iter_events(f), timezone.utc, start, end)
+
+        result['query_seconds'] = _time_queries(query, windows[:1])
+        result['events'] = count
+        return result
+
+    with open(path, 'rb') as f:
+        response = MockHTTP()
+        response.status = 200
+        response.data = f.read()
+    calendar = load_ical(path, response)
+    events = calendar.walk('VEVENT')
+    result['first_event_seconds'] = time.perf_counter() - start_time
+    tz = get_calendar_timezone(calendar)
+    if mode == 'index':
+        index = get_event_index(calendar)
+
+        def query(start, end):
+            return index.overlapping(start, end)
+    else:
+        def query(start, end):
+            return _scan(events, tz, start, end)
+    result['parse_seconds'] = time.perf_counter() - start_time
+    result['peak_rss_mb'] = get_peak_rss_mb() - rss_before
+    result['query_seconds'] = _time_queries(query, windows)
+    result['occurrences_seconds'] = _time_queries(
+        lambda start, end: get_occurrences(calendar, start, end), windows)
+    result['events'] = len(events)
+    return result
+
+
+def write_feed(path, events, options):
+    from uw_trumba.util.synthetic import iter_ics
+    with open(path, 'wb') as f:
+        for chunk in iter_ics(events, seed=options['seed'],
+                              first_day=FIRST_DAY, days=DAYS,
+                              recurring=options['recurring']):
+            f.write(chunk)
+    return os.path.getsize(path)
+
+
+def run_benchmarks(options):
+    """
+    :return: a list of dicts of the measurements of each size and mode
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for events in options['events']:
+            path = os.path.join(directory, "feed{0}.ics".format(events))
+            size = write_feed(path, events, options)
+            for mode in options['modes']:
+                result = run_in_process(_run_mode, path, mode, options)
+                result.update({'size': events, 'mode': mode,
+                               'feed_mb': size / 2 ** 20})
+                results.append(result)
+    return results
+
+
+def format_results(results):
+    lines = ["{0:>8} {1:>8} {2:<7} {3:>9} {4:>13} {5:>12} {6:>10} "
+             "{7:>11}".format(
+                 "events", "feed(MB)", "mode", "parse(s)", "1st event(ms)",
+                 "+RSS(MB)", "query(ms)", "expand(ms)")]
+    for result in results:
+        lines.append(
+            "{0:>8} {1:>8.1f} {2:<7} {3:>9.3f} {4:>13.1f} {5:>12.1f} "
+            "{6:>10.3f} {7:>11}".format(
+                result['size'], result['feed_mb'], result['mode'],
+                result['parse_seconds'],
+                result['first_event_seconds'] * 1000,
+                result['peak_rss_mb'], result['query_seconds'] * 1000,
+                "-" if 'occurrences_seconds' not in result else
+                "{0:.3f}".format(result['occurrences_seconds'] * 1000)))
+    return "\n".join(lines)
+
+
+def _get_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=lambda v: _get_list(v, int),
+                        default=[1000, 10000],
+                        help="comma separated feed sizes (events)")
+    parser.add_argument("--modes", type=_get_list, default=list(MODES),
+                        help="comma separated modes of {0}".format(
+                            ",".join(MODES)))
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--window-days", type=int, default=7)
+    parser.add_argument("--recurring", type=float, default=0.1,
+                        help="the fraction of the events with an RRULE")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to a json file")
+    options = vars(parser.parse_args(args))
+    for mode in options['modes']:
+        if mode not in MODES:
+            parser.error("Unknown mode: {0}".format(mode))
+    configure_settings()
+
+    results = run_benchmarks(options)
+    print(format_results(results))
+    if options['json']:
+        with open(options['json'], 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
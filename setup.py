@@ -26,6 +26,7 @@ setup(
     install_requires=['UW-RestClients-Core',
                       'lxml<5',
                       'icalendar',
+                      'python-dateutil',
                       ],
     license='Apache License, Version 2.0',
     description=('A library for connecting to the Trumba API'),
@@ -7,12 +7,20 @@ It will log the http requests and responses.
 Be sure to set the logging configuration if you use the LiveDao!
 """
 
+import copy
 import logging
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from lxml import etree
 from icalendar import Calendar, Event
 from restclients_core.exceptions import DataFailureException
+from uw_trumba.cache import CalendarCache
+from uw_trumba.feeds import FeedCache
+from uw_trumba.ical import iter_events
+from uw_trumba.log import get_body_max, log_debug, truncate
+from uw_trumba.models import is_bot, is_tac
+from uw_trumba.trace import span
 from uw_trumba.dao import (
     TrumbaBot_DAO, TrumbaSea_DAO, TrumbaTac_DAO, TrumbaCalendar_DAO)
 
@@ -21,20 +29,134 @@ TrumbaCalendar = TrumbaCalendar_DAO()
 TrumbaBot = TrumbaBot_DAO()
 TrumbaSea = TrumbaSea_DAO()
 TrumbaTac = TrumbaTac_DAO()
+feed_cache = FeedCache(TrumbaCalendar)
+calendar_cache = CalendarCache(
+    TrumbaCalendar, on_remove=lambda name: feed_cache.invalidate(
+        _make_calendar_url(name)))
+# the feed of a cached calendar is released with it, the other feeds
+# are bounded by FEED_MAX_BYTES
+
+
+def get_campus_dao(campus):
+    """
+    :return: the DAO of the Trumba account of the given campus
+    """
+    if is_bot(campus):
+        return TrumbaBot
+    if is_tac(campus):
+        return TrumbaTac
+    return TrumbaSea
 
 
 def get_calendar_by_name(calendar_name):
-    url = "/calendars/{0}.ics".format(calendar_name)
+    """
+    :return: the icalendar.Calendar object of the calendar, owned by the
+    caller: a copy if the object is kept in calendar_cache or
+    feed_cache, or shared with a concurrent caller.
+    raise DataFailureException if the request failed or the data
+    can't be parsed.
+    """
+    with span("get_calendar_by_name", calendar=calendar_name):
+        calendar, shared = calendar_cache.get_item(
+            calendar_name, _load_calendar)
+    return copy.deepcopy(calendar) if shared else calendar
+
+
+def get_shared_calendar_by_name(calendar_name):
+    """
+    :return: the icalendar.Calendar object of the calendar, kept in
+    calendar_cache and revalidated through feed_cache. The object is
+    shared with the other callers, don't modify it.
+    raise DataFailureException if the request failed or the data
+    can't be parsed.
+    """
+    with span("get_calendar_by_name", calendar=calendar_name):
+        return calendar_cache.get(calendar_name, _load_calendar)
+
+
+def get_calendars_by_names(calendar_names, shared=False):
+    """
+    :param calendar_names: a list of calendar names
+    :param shared: if True, the calendars are the shared objects of
+        get_shared_calendar_by_name, otherwise copies
+    :return: a dict of {calendar name, icalendar.Calendar object} in the
+    order of calendar_names, fetched concurrently by up to MAX_WORKERS
+    requests at once.
+    raise DataFailureException if one of the requests failed or
+    its data can't be parsed.
+    """
+    names = list(dict.fromkeys(calendar_names))
+    get_calendar = (get_shared_calendar_by_name if shared
+                    else get_calendar_by_name)
+    with ThreadPoolExecutor(
+            max_workers=max(1, min(TrumbaCalendar.get_max_workers(),
+                                   len(names))),
+            thread_name_prefix="calendar") as executor:
+        return dict(zip(names, executor.map(get_calendar, names)))
+
+
+def invalidate_calendar(calendar_name):
+    """
+    Drop the cached calendar and feed validators of the calendar
+    """
+    calendar_cache.invalidate(calendar_name)
+    feed_cache.invalidate(_make_calendar_url(calendar_name))
+
+
+def _load_calendar(calendar_name):
+    """
+    :return: a tuple of the Calendar object, the size of its feed and
+    True if the object is kept in feed_cache
+    """
+    (calendar, size), shared = feed_cache.get_item(
+        _make_calendar_url(calendar_name), _parse_feed)
+    return calendar, size, shared
 
+
+def _parse_feed(url, response):
+    return load_ical(url, response), len(response.data)
+
+
+def iter_calendar_events(calendar_name):
+    """
+    :return: a generator of the icalendar.Event objects of the calendar,
+    parsed one at a time from the response data.
+    raise DataFailureException if the request failed, or (while
+    iterating) if an event can't be parsed.
+    """
+    url = _make_calendar_url(calendar_name)
     response = TrumbaCalendar.getURL(url)
+    if response.status != 200:
+        raise DataFailureException(url, response.status, str(response.data))
+    return _iter_ical_events(url, response.data)
+
+
+def _iter_ical_events(url, data):
+    try:
+        for event in iter_events(data):
+            yield event
+    except (ValueError, UnicodeError) as ex:
+        raise DataFailureException(url, 503, ex)
 
+
+def _make_calendar_url(calendar_name):
+    return "/calendars/{0}.ics".format(calendar_name)
+
+
+def load_ical(url, response):
+    """
+    :return: the icalendar.Calendar object parsed from the response
+    raise DataFailureException if the request failed or the data
+    can't be parsed.
+    """
     if response.status != 200:
         raise DataFailureException(url, response.status, str(response.data))
     data = (
         response.data.decode('UTF-8') if isinstance(response.data, bytes)
         else response.data)
     try:
-        calendar = Calendar.from_ical(data)
+        with span("Calendar.from_ical", url=url):
+            calendar = Calendar.from_ical(data)
     except Exception as ex:
         # turn data errors (ie, UnicodeEncodeError) into
         # DataFailureException
@@ -43,15 +165,9 @@ def get_calendar_by_name(calendar_name):
     return calendar
 
 
-def _log_xml_resp(campus, url, response):
+def _log_xml_resp(dao, campus, url, response):
     if response.status == 200 and response.data is not None:
-        root = etree.fromstring(response.data)
-        resp_msg = ''
-        for el in root.iterchildren():
-            resp_msg += str(el.attrib)
-        logger.debug({'campus': campus,
-                      'url': url,
-                      'resp': resp_msg})
+        log_debug(logger, dao, _xml_resp_message, campus, url, response)
     else:
         logger.error({'campus': campus,
                       'url': url,
@@ -59,19 +175,33 @@ def _log_xml_resp(campus, url, response):
                       'reason': response.reason})
 
 
-def _log_json_resp(campus, url, body, response):
+def _xml_resp_message(max_length, campus, url, response):
+    root = etree.fromstring(response.data)
+    resp_msg = ''
+    for el in root.iterchildren():
+        resp_msg += str(el.attrib)
+    return {'campus': campus,
+            'url': url,
+            'resp': truncate(resp_msg, max_length)}
+
+
+def _log_json_resp(dao, campus, url, body, response):
     if response.status == 200 and response.data is not None:
-        logger.debug({'campus': campus,
-                      'url': url,
-                      'resp': response.data})
+        log_debug(logger, dao, _json_resp_message, campus, url, response)
     else:
         logger.error({'campus': campus,
                       'url': url,
-                      'body': body,
+                      'body': truncate(body, get_body_max(dao)),
                       'status': response.status,
                       'reason': response.reason})
 
 
+def _json_resp_message(max_length, campus, url, response):
+    return {'campus': campus,
+            'url': url,
+            'resp': truncate(response.data, max_length)}
+
+
 def get_bot_resource(url):
     """
     Get the requested resource or update resource using Bothell account
@@ -79,7 +209,7 @@ def get_bot_resource(url):
     """
     response = None
     response = TrumbaBot.getURL(url, {"Content-Type": "application/xml"})
-    _log_xml_resp("Bothell", url, response)
+    _log_xml_resp(TrumbaBot, "Bothell", url, response)
     return response
 
 
@@ -90,7 +220,7 @@ def get_sea_resource(url):
     """
     response = None
     response = TrumbaSea.getURL(url, {"Accept": "application/xml"})
-    _log_xml_resp("Seattle", url, response)
+    _log_xml_resp(TrumbaSea, "Seattle", url, response)
     return response
 
 
@@ -101,7 +231,7 @@ def get_tac_resource(url):
     """
     response = None
     response = TrumbaTac.getURL(url, {"Accept": "application/xml"})
-    _log_xml_resp("Tacoma", url, response)
+    _log_xml_resp(TrumbaTac, "Tacoma", url, response)
     return response
 
 
@@ -113,7 +243,7 @@ def post_bot_resource(url, body):
     response = None
     response = TrumbaBot.postURL(
         url, {"Content-Type": "application/json"}, body)
-    _log_json_resp("Bothell", url, body, response)
+    _log_json_resp(TrumbaBot, "Bothell", url, body, response)
     return response
 
 
@@ -125,7 +255,7 @@ def post_sea_resource(url, body):
     response = None
     response = TrumbaSea.postURL(
         url, {"Content-Type": "application/json"}, body)
-    _log_json_resp("Seattle", url, body, response)
+    _log_json_resp(TrumbaSea, "Seattle", url, body, response)
     return response
 
 
@@ -137,5 +267,5 @@ def post_tac_resource(url, body):
     response = None
     response = TrumbaTac.postURL(
         url, {"Content-Type": "application/json"}, body)
-    _log_json_resp("Tacoma", url, body, response)
+    _log_json_resp(TrumbaTac, "Tacoma", url, body, response)
     return response
@@ -9,6 +9,7 @@ Be sure to set the logging configuration if you use the LiveDao!
 """
 
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 import logging
 import re
@@ -18,15 +19,17 @@ try:
 except ImportError:
     from urllib.parse import quote, unquote
 from restclients_core.exceptions import DataFailureException
+from uw_trumba.metrics import get_endpoint, registry
 from uw_trumba.models import Permission
+from uw_trumba.throttle import call_in_background
 from uw_trumba import (
-    get_bot_resource, get_sea_resource, get_tac_resource)
+    get_campus_dao, get_bot_resource, get_sea_resource, get_tac_resource)
 from uw_trumba.exceptions import (
     AccountNameEmpty, AccountNotExist, AccountUsedByDiffUser,
     CalendarNotExist, CalendarOwnByDiffAccount,
     InvalidEmail, InvalidPermissionLevel, FailedToClosePublisher,
     NoAllowedPermission, ErrorCreatingEditor, NoDataReturned,
-    UnexpectedError, UnknownError)
+    TrumbaException, UnexpectedError, UnknownError)
 
 
 add_account_url_prefix = "/service/accounts.asmx/CreateEditor"
@@ -55,7 +58,8 @@ def add_editor(name, userid):
     url = _make_add_account_url(name, userid)
     return _process_resp(url,
                          get_sea_resource(url),
-                         _is_editor_added
+                         _is_editor_added,
+                         "sea"
                          )
 
 
@@ -78,7 +82,8 @@ def delete_editor(userid):
     url = _make_del_account_url(userid)
     return _process_resp(url,
                          get_sea_resource(url),
-                         _is_editor_deleted
+                         _is_editor_deleted,
+                         "sea"
                          )
 
 
@@ -92,39 +97,104 @@ def _make_set_permissions_url(calendar_id, userid, level):
 
 
 def set_perm_editor(calendar, userid):
-    if calendar.is_bot():
-        return set_bot_permissions(calendar.calendarid,
-                                   userid, Permission.EDIT)
-    elif calendar.is_tac():
-        return set_tac_permissions(calendar.calendarid,
-                                   userid, Permission.EDIT)
-    else:
-        return set_sea_permissions(calendar.calendarid,
-                                   userid, Permission.EDIT)
+    return set_permissions(calendar, userid, Permission.EDIT)
 
 
 def set_perm_showon(calendar, userid):
-    if calendar.is_bot():
-        return set_bot_permissions(calendar.calendarid,
-                                   userid, Permission.SHOWON)
-    elif calendar.is_tac():
-        return set_tac_permissions(calendar.calendarid,
-                                   userid, Permission.SHOWON)
-    else:
-        return set_sea_permissions(calendar.calendarid,
-                                   userid, Permission.SHOWON)
+    return set_permissions(calendar, userid, Permission.SHOWON)
 
 
 def set_perm_none(calendar, userid):
+    return set_permissions(calendar, userid, Permission.NONE)
+
+
+def set_permissions(calendar, userid, level):
+    """
+    :param calendar: a TrumbaCalendar object
+    Set the permission level using the account of the calendar campus
+    """
     if calendar.is_bot():
-        return set_bot_permissions(calendar.calendarid,
-                                   userid, Permission.NONE)
+        return set_bot_permissions(calendar.calendarid, userid, level)
     elif calendar.is_tac():
-        return set_tac_permissions(calendar.calendarid,
-                                   userid, Permission.NONE)
+        return set_tac_permissions(calendar.calendarid, userid, level)
     else:
-        return set_sea_permissions(calendar.calendarid,
-                                   userid, Permission.NONE)
+        return set_sea_permissions(calendar.calendarid, userid, level)
+
+
+class PermissionChangeResult(object):
+    """
+    The outcome of one change in set_permissions_bulk
+    """
+
+    def __init__(self, calendar, userid, level):
+        self.calendar = calendar
+        self.userid = userid
+        self.level = level
+        self.error = None
+        # the DataFailureException or TrumbaException raised
+
+    def is_success(self):
+        return self.error is None
+
+    def get_error_code(self):
+        """
+        :return: the Trumba error code or the http status of the error
+        """
+        if isinstance(self.error, TrumbaException):
+            return self.error.code
+        if isinstance(self.error, DataFailureException):
+            return self.error.status
+        return None
+
+    def to_json(self):
+        return {'campus': self.calendar.campus,
+                'calendarid': self.calendar.calendarid,
+                'userid': self.userid,
+                'level': self.level,
+                'success': self.is_success(),
+                'error': (self.error.__class__.__name__
+                          if self.error is not None else None),
+                'code': self.get_error_code()}
+
+
+def set_permissions_bulk(changes):
+    """
+    :param changes: an iterable of (TrumbaCalendar, userid, level)
+    :return: a list of PermissionChangeResult in the order of changes.
+    The requests are sent concurrently, each campus account using
+    a worker pool bounded by its MAX_WORKERS setting. A failed change
+    doesn't stop the others.
+    """
+    results = []
+    executors = {}
+    try:
+        futures = []
+        for calendar, userid, level in changes:
+            result = PermissionChangeResult(calendar, userid, level)
+            if calendar.campus not in executors:
+                executors[calendar.campus] = ThreadPoolExecutor(
+                    max_workers=get_campus_dao(
+                        calendar.campus).get_max_workers())
+            futures.append(executors[calendar.campus].submit(
+                call_in_background, _apply_change, result))
+            results.append(result)
+        for future in futures:
+            future.result()
+    finally:
+        for executor in executors.values():
+            executor.shutdown()
+    return results
+
+
+def _apply_change(result):
+    try:
+        set_permissions(result.calendar, result.userid, result.level)
+    except (DataFailureException, TrumbaException) as ex:
+        result.error = ex
+    except Exception as ex:
+        logger.error("set_permissions_bulk {0} ==> {1}".format(
+            result.to_json(), ex))
+        result.error = ex
 
 
 def set_bot_permissions(calendar_id, userid, level):
@@ -140,7 +210,8 @@ def set_bot_permissions(calendar_id, userid, level):
         calendar_id, userid, level)
     return _process_resp(url,
                          get_bot_resource(url),
-                         _is_permission_set
+                         _is_permission_set,
+                         "bot"
                          )
 
 
@@ -157,7 +228,8 @@ def set_sea_permissions(calendar_id, userid, level):
         calendar_id, userid, level)
     return _process_resp(url,
                          get_sea_resource(url),
-                         _is_permission_set
+                         _is_permission_set,
+                         "sea"
                          )
 
 
@@ -174,16 +246,19 @@ def set_tac_permissions(calendar_id, userid, level):
         calendar_id, userid, level)
     return _process_resp(url,
                          get_tac_resource(url),
-                         _is_permission_set
+                         _is_permission_set,
+                         "tac"
                          )
 
 
-def _process_resp(request_id, response, is_success_func):
+def _process_resp(request_id, response, is_success_func, campus):
     """
     :param request_id: campus url identifying the request
     :param response: the GET method response object
     :param is_success_func: the name of the function for
         verifying a success code
+    :param campus: the campus code of the account, the label of the
+        error code metrics
     :return: True if successful, False otherwise.
     raise DataFailureException or a corresponding TrumbaException
     if the request failed or an error code has been returned.
@@ -204,6 +279,7 @@ def _process_resp(request_id, response, is_success_func):
     func = partial(is_success_func)
     if func(resp_code):
         return True
+    registry.count_error_code(campus, get_endpoint(request_id), resp_code)
     _check_err(resp_code, request_id)
 
 
@@ -0,0 +1,229 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+The asyncio interface of the Trumba services.
+The blocking DAO requests run in a thread pool of each service account,
+bounded by its MAX_WORKERS setting, so that any number of coroutines
+can be awaiting on one event loop. The responses are decoded and the
+error codes are mapped by the same functions as the synchronous API.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from uw_trumba import (
+    TrumbaBot, TrumbaCalendar, TrumbaSea, TrumbaTac, calendar_cache,
+    get_campus_dao, get_bot_resource, get_sea_resource, get_tac_resource,
+    _load_calendar, get_calendar_by_name as _get_calendar_by_name)
+from uw_trumba.account import (
+    _make_add_account_url, _make_del_account_url,
+    _make_set_permissions_url, _process_resp, _is_editor_added,
+    _is_editor_deleted, _is_permission_set)
+from uw_trumba.calendars import (
+    CAMPUS_CODES, Calendars, _post_calendarlist,
+    _make_request_id as _make_calendarlist_request_id)
+from uw_trumba.models import Permission
+from uw_trumba.permissions import (
+    is_unavailable, load_json, _post_permissions, _make_request_id)
+from uw_trumba.throttle import call_in_background
+
+
+logger = logging.getLogger(__name__)
+_executors = {}
+_executors_lock = Lock()
+
+
+def _get_executor(dao):
+    service = dao.service_name()
+    with _executors_lock:
+        if service not in _executors:
+            _executors[service] = ThreadPoolExecutor(
+                max_workers=dao.get_max_workers(),
+                thread_name_prefix=service)
+        return _executors[service]
+
+
+async def _run(dao, func, *args):
+    """
+    Run the blocking func in the thread pool of the given dao
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(dao), partial(func, *args))
+
+
+async def _run_in_background(dao, func, *args):
+    """
+    Run the blocking func in background_priority, so that its requests
+    wait for the interactive ones on the rate limiter
+    """
+    return await _run(dao, call_in_background, func, *args)
+
+
+async def get_calendar_by_name(calendar_name):
+    """
+    :return: a copy of the icalendar.Calendar object, owned by the caller
+    """
+    return await _run(TrumbaCalendar, _get_calendar_by_name,
+                      calendar_name)
+
+
+async def get_shared_calendar_by_name(calendar_name):
+    """
+    :return: the cached icalendar.Calendar object, shared with the other
+    callers (don't modify it)
+    """
+    return await _run(TrumbaCalendar, calendar_cache.get,
+                      calendar_name, _load_calendar)
+
+
+async def get_calendars_by_names(calendar_names, shared=False):
+    """
+    :param shared: if True, the calendars are the shared objects of
+        get_shared_calendar_by_name, otherwise copies
+    :return: a dict of {calendar name, icalendar.Calendar object} in the
+    order of calendar_names.
+    """
+    names = list(dict.fromkeys(calendar_names))
+    get_calendar = (get_shared_calendar_by_name if shared
+                    else get_calendar_by_name)
+    calendars = await asyncio.gather(*[
+        get_calendar(name) for name in names])
+    return dict(zip(names, calendars))
+
+
+async def get_cal_permissions(perm_loader, calendar, background=False):
+    """
+    :param perm_loader: a Permissions object
+    :param calendar: a TrumbaCalendar object
+    :param background: if True, the request is sent in
+        background_priority
+    Set the calendar.permissions attribute with a dict of
+    {uwnetid, Permission} and add uwnetids into perm_loader.account_set.
+    :except: DataFailureException if the service is unavailable
+    """
+    run = _run_in_background if background else _run
+    try:
+        response = await run(get_campus_dao(calendar.campus),
+                             _post_permissions, calendar)
+        perm_loader.set_cal_permissions(
+            calendar, load_json(_make_request_id(calendar), response,
+                                calendar.campus))
+    except Exception as ex:
+        if is_unavailable(ex):
+            raise
+        logger.error(
+            "get_cal_permissions on {0} ==> {1}".format(calendar, ex))
+
+
+async def get_calendars():
+    """
+    :return: a Calendars object loaded with the calendars and
+    their permissions of all campuses, in background_priority like
+    the synchronous load.
+    :except: DataFailureException if a GetCalendarList request failed.
+    """
+    calendars = Calendars(load=False)
+    responses = await asyncio.gather(*[
+        _run_in_background(get_campus_dao(campus), _post_calendarlist,
+                           campus)
+        for campus in CAMPUS_CODES])
+    calendars._extract_all_cals({
+        campus: load_json(_make_calendarlist_request_id(campus), response,
+                          campus)
+        for campus, response in zip(CAMPUS_CODES, responses)})
+    await asyncio.gather(*[
+        get_cal_permissions(calendars.perm_loader, trumba_cal,
+                            background=True)
+        for trumba_cal in calendars._get_all_calendars()])
+    return calendars
+
+
+async def add_editor(name, userid):
+    """
+    :param name: a string representing the user's name
+    :param userid: a string representing the user's UW NetID
+    :return: True if request is successful, False otherwise.
+    raise DataFailureException or a corresponding TrumbaException
+    if the request failed or an error code has been returned.
+    """
+    url = _make_add_account_url(name, userid)
+    response = await _run(TrumbaSea, get_sea_resource, url)
+    return _process_resp(url, response, _is_editor_added,
+                         TrumbaSea.metrics_campus)
+
+
+async def delete_editor(userid):
+    """
+    :param userid: a string representing the user's UW NetID
+    :return: True if request is successful, False otherwise.
+    raise DataFailureException or a corresponding TrumbaException
+    if the request failed or an error code has been returned.
+    """
+    url = _make_del_account_url(userid)
+    response = await _run(TrumbaSea, get_sea_resource, url)
+    return _process_resp(url, response, _is_editor_deleted,
+                         TrumbaSea.metrics_campus)
+
+
+async def _set_permissions(dao, get_resource, calendar_id, userid, level):
+    url = _make_set_permissions_url(calendar_id, userid, level)
+    response = await _run(dao, get_resource, url)
+    return _process_resp(url, response, _is_permission_set,
+                         dao.metrics_campus)
+
+
+async def set_bot_permissions(calendar_id, userid, level):
+    """
+    :param calendar_id: an integer representing calendar ID
+    :param userid: a string representing the user's UW NetID
+    :param level: a string representing the permission level
+    :return: True if request is successful, False otherwise.
+    raise DataFailureException or a corresponding TrumbaException
+    if the request failed or an error code has been returned.
+    """
+    return await _set_permissions(TrumbaBot,
+                                  get_bot_resource,
+                                  calendar_id, userid, level)
+
+
+async def set_sea_permissions(calendar_id, userid, level):
+    """
+    Same as set_bot_permissions, using the Seattle account
+    """
+    return await _set_permissions(TrumbaSea,
+                                  get_sea_resource,
+                                  calendar_id, userid, level)
+
+
+async def set_tac_permissions(calendar_id, userid, level):
+    """
+    Same as set_bot_permissions, using the Tacoma account
+    """
+    return await _set_permissions(TrumbaTac,
+                                  get_tac_resource,
+                                  calendar_id, userid, level)
+
+
+async def _set_perm(calendar, userid, level):
+    if calendar.is_bot():
+        return await set_bot_permissions(calendar.calendarid, userid, level)
+    elif calendar.is_tac():
+        return await set_tac_permissions(calendar.calendarid, userid, level)
+    else:
+        return await set_sea_permissions(calendar.calendarid, userid, level)
+
+
+async def set_perm_editor(calendar, userid):
+    return await _set_perm(calendar, userid, Permission.EDIT)
+
+
+async def set_perm_showon(calendar, userid):
+    return await _set_perm(calendar, userid, Permission.SHOWON)
+
+
+async def set_perm_none(calendar, userid):
+    return await _set_perm(calendar, userid, Permission.NONE)
@@ -0,0 +1,166 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+An in-process cache of the parsed calendars, bounded by the total size
+of their feeds, evicting the least recently used calendar first.
+Concurrent misses on one calendar wait for a single load.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight(object):
+    """
+    A load in progress, shared by the callers waiting for it
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class CalendarCache(object):
+    """
+    The calendars loaded with the given DAO settings:
+    CACHE_TTL, the seconds a calendar stays cached (default 0, disabled);
+    CACHE_MAX_BYTES, the total size of the cached feeds (default 64 MB).
+    on_remove(name) is called when a cached calendar is evicted or
+    invalidated, so that the objects kept with it elsewhere can be
+    released. An expired calendar is reloaded without the call.
+    """
+
+    def __init__(self, dao, on_remove=None):
+        self.dao = dao
+        self.on_remove = on_remove
+        self.entries = OrderedDict()
+        # {name, (calendar, size, expires_at)} from the least recently used
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, load):
+        """
+        :param name: the calendar name
+        :param load: a function(name) returning (calendar, size in bytes)
+        :return: the calendar, shared with the other callers (don't
+        modify it).
+        raise the exceptions of load, in every caller waiting for it.
+        """
+        return self.get_item(name, load)[0]
+
+    def get_item(self, name, load):
+        """
+        :param load: a function(name) returning (calendar, size in bytes)
+            or (calendar, size, shared) if the loader may keep the
+            calendar elsewhere
+        :return: a tuple of the calendar and True if it may be shared
+        with other callers, ie, it is cached, it came from the cache or
+        from a load also waited for by others.
+        """
+        ttl = float(self.dao.get_service_setting("CACHE_TTL", 0))
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is not None:
+                if entry[2] > time.monotonic():
+                    self.entries.move_to_end(name)
+                    self.hits += 1
+                    return entry[0], True
+                self._remove(name)
+
+            self.misses += 1
+            flight = self._flights.get(name)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[name] = flight
+            else:
+                flight.waiters += 1
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        added = False
+        try:
+            result = load(name)
+            flight.result, size = result[0], result[1]
+            shared = len(result) > 2 and result[2]
+        except BaseException as ex:
+            flight.error = ex
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(name) is flight:
+                    del self._flights[name]
+                    if flight.error is None and ttl > 0:
+                        added = self._add(name, flight.result, size, ttl)
+                waiters = flight.waiters
+            flight.done.set()
+        return flight.result, bool(shared or added or waiters)
+
+    def _add(self, name, calendar, size, ttl):
+        max_bytes = int(self.dao.get_service_setting(
+            "CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        if size > max_bytes:
+            return False
+        if name in self.entries:
+            self._remove(name)
+        while self.entries and self.total_bytes + size > max_bytes:
+            evicted = next(iter(self.entries))
+            self._remove(evicted)
+            self._removed(evicted)
+            self.evictions += 1
+        self.entries[name] = (calendar, size, time.monotonic() + ttl)
+        self.total_bytes += size
+        return True
+
+    def _remove(self, name):
+        entry = self.entries.pop(name)
+        self.total_bytes -= entry[1]
+
+    def _removed(self, name):
+        if self.on_remove is not None:
+            self.on_remove(name)
+
+    def invalidate(self, name):
+        """
+        Drop the calendar; a load already in progress won't be cached.
+        """
+        with self._lock:
+            if name in self.entries:
+                self._remove(name)
+                self._removed(name)
+            self._flights.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            for name in self.entries:
+                self._removed(name)
+            self.entries.clear()
+            self._flights.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self):
+        """
+        :return: a dict of the counters of the cache, with 'bytes'
+        the total size of the cached feeds
+        """
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'calendars': len(self.entries),
+                    'bytes': self.total_bytes}
@@ -11,46 +11,214 @@ Be sure to set the logging configuration if you use the LiveDao!
 
 import logging
 import re
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from uw_trumba.models import TrumbaCalendar, is_bot, is_sea, is_tac
-from uw_trumba import post_bot_resource, post_sea_resource, post_tac_resource
+from uw_trumba import (
+    get_campus_dao, post_bot_resource, post_sea_resource, post_tac_resource)
 from uw_trumba.permissions import Permissions, load_json
+from uw_trumba.throttle import background_priority, call_in_background
+from uw_trumba.trace import span
 
 
 logger = logging.getLogger(__name__)
 calendarlist_url = "/service/calendars.asmx/GetCalendarList"
 re_cal_id = re.compile(r'[1-9]\d*')
+CAMPUS_CODES = (TrumbaCalendar.SEA_CAMPUS_CODE,
+                TrumbaCalendar.BOT_CAMPUS_CODE,
+                TrumbaCalendar.TAC_CAMPUS_CODE)
 
 
 class Calendars:
 
-    def __init__(self):
+    def __init__(self, concurrent=False, load=True):
         """
         Build a dictionary of {calenderid, TrumbaCalendar} for each campus
+        :param concurrent: if True, the calendar permissions are fetched
+            in parallel by a worker pool bounded by the MAX_WORKERS
+            setting of each campus account.
+        :param load: if False, return an empty instance without
+            sending any request.
         """
         self.perm_loader = Permissions()
         self.campus_calendars = {}
         self.sea_calendar_ids = set()
-        self._load(TrumbaCalendar.SEA_CAMPUS_CODE)
-        self._load(TrumbaCalendar.BOT_CAMPUS_CODE)
-        self._load(TrumbaCalendar.TAC_CAMPUS_CODE)
+        self.concurrent = concurrent
+        self._refresh_cursor = 0
+        self._version = 0
+        self._invalidate_views()
+        if load:
+            self._load()
 
-    def _load(self, campus):
+    def _load(self):
         """
         Load a dictionary of {calenderid, TrumbaCalendar} to
-        the self.campus_calendars[campus]
+        the self.campus_calendars[campus] of each campus.
+        The calendar lists of all campuses are fetched at the same time.
         :except: DataFailureException if the underline request failed.
         """
+        with span("Calendars._load"):
+            with span("GetCalendarList"):
+                campus_data = _get_all_campus_calendars()
+            self._extract_all_cals(campus_data)
+            with span("Calendars._load_permissions"):
+                self._load_permissions(self._get_all_calendars())
+
+    def _extract_all_cals(self, campus_data):
+        """
+        :param campus_data: a dictionary of {campus, json data of
+            the GetCalendarList response}
+        Update self.campus_calendars, skipping the Seattle calendars
+        shared with Bothell or Tacoma.
+        """
+        self._invalidate_views()
+        sea = TrumbaCalendar.SEA_CAMPUS_CODE
+        self.campus_calendars[sea] = self._extract_campus_cals(
+            sea, campus_data[sea], set())
+        self.sea_calendar_ids = set(self.campus_calendars[sea].keys())
+        for campus in CAMPUS_CODES:
+            if not is_sea(campus):
+                self.campus_calendars[campus] = self._extract_campus_cals(
+                    campus, campus_data[campus], self.sea_calendar_ids)
+
+    def _get_all_calendars(self):
+        """
+        :return: the list of TrumbaCalendar of all campuses
+        """
+        calendars = []
+        for campus in CAMPUS_CODES:
+            calendars.extend(self.campus_calendars[campus].values())
+        return calendars
+
+    def _extract_campus_cals(self, campus, data, shared_ids):
+        """
+        :param data: the json data of a GetCalendarList response
+        :param shared_ids: the ids of the calendars to skip
+        :return: a dictionary of {calenderid, TrumbaCalendar}
+        """
         calendar_dict = {}
-        data = _get_campus_calenders(campus)
         if (data['d']['Calendars'] is not None and
                 len(data['d']['Calendars']) > 0):
-            self._extract_cals(campus, data['d']['Calendars'],
-                               calendar_dict, None)
-        self.campus_calendars[campus] = calendar_dict
+            with span("Calendars._extract_cals", campus=campus):
+                self._extract_cals(campus, data['d']['Calendars'],
+                                   calendar_dict, None, shared_ids)
+        return calendar_dict
+
+    def refresh(self, rotation_size=100):
+        """
+        Update the calendars with the current calendar lists.
+        The permissions are fetched for the new calendars and for the
+        next rotation_size existing calendars in turn only.
+        :return: a dictionary of the lists of TrumbaCalendar
+            'added', 'removed', 'renamed' and 'refreshed'.
+        :except: DataFailureException if the underline request failed.
+        """
+        latest = Calendars(load=False)
+        latest._extract_all_cals(_get_all_campus_calendars())
+        changes = {'added': [], 'removed': [], 'renamed': [],
+                   'refreshed': []}
+        existing = []
+        for campus in CAMPUS_CODES:
+            current_dict = self.campus_calendars.get(campus, {})
+            calendar_dict = latest.campus_calendars[campus]
+            for calendarid, trumba_cal in calendar_dict.items():
+                current_cal = current_dict.get(calendarid)
+                if current_cal is None:
+                    changes['added'].append(trumba_cal)
+                    continue
+                # keep the permissions, take the latest name and links
+                trumba_cal.permissions = current_cal.permissions
+                if current_cal.name != trumba_cal.name:
+                    changes['renamed'].append(trumba_cal)
+                existing.append(trumba_cal)
+            changes['removed'].extend(
+                trumba_cal for calendarid, trumba_cal in current_dict.items()
+                if calendarid not in calendar_dict)
+
+        for trumba_cal in changes['removed']:
+            self.perm_loader.remove_cal_permissions(trumba_cal)
+        changes['refreshed'] = self._next_rotation(existing, rotation_size)
+        self._load_permissions(changes['added'])
+        self._load_permissions(changes['refreshed'],
+                               self.perm_loader.reload_cal_permissions)
+        self.campus_calendars = latest.campus_calendars
+        self.sea_calendar_ids = latest.sea_calendar_ids
+        self._invalidate_views()
+        self.perm_loader.account_set = set()
+        for trumba_cal in self._get_all_calendars():
+            self.perm_loader.account_set.update(trumba_cal.permissions)
+        return changes
 
-    def _extract_cals(self, campus, resp_fragment, calendar_dict, parent):
+    def calendars_changed(self):
         """
-        Extract calendars and load permissions. Update calendar_dict.
+        Call after changing the calendars in place, ie, renaming or
+        moving a calendar or replacing an entry of campus_calendars,
+        so that the sorted lists and the calendar trees are rebuilt.
+        """
+        self._invalidate_views()
+
+    def _invalidate_views(self):
+        self._version += 1
+        self._sorted_calendars = {}
+        # a dict of {campus, (version, calendar dict,
+        #                     sorted list of its values)}
+        self._calendar_trees = {}
+        # a dict of {campus, (version, calendar dict, _CalendarTree)}
+
+    def _next_rotation(self, calendars, size):
+        """
+        :return: the next size calendars in the given list, continuing
+            from where the previous refresh stopped.
+        """
+        if len(calendars) == 0 or size <= 0:
+            return []
+        if size >= len(calendars):
+            return list(calendars)
+        start = self._refresh_cursor % len(calendars)
+        self._refresh_cursor = start + size
+        rotation = calendars[start:start + size]
+        return rotation + calendars[:size - len(rotation)]
+
+    def _load_permissions(self, calendars, load_func=None):
+        """
+        Load the permissions of the given list of TrumbaCalendar
+        :param load_func: the Permissions method loading a calendar,
+            defaults to get_cal_permissions.
+        """
+        if load_func is None:
+            load_func = self.perm_loader.get_cal_permissions
+
+        if not self.concurrent:
+            with background_priority():
+                for trumba_cal in calendars:
+                    load_func(trumba_cal)
+            return
+
+        executors = {}
+        failed = False
+        try:
+            futures = []
+            for trumba_cal in calendars:
+                if trumba_cal.campus not in executors:
+                    executors[trumba_cal.campus] = ThreadPoolExecutor(
+                        max_workers=get_campus_dao(
+                            trumba_cal.campus).get_max_workers())
+                futures.append(executors[trumba_cal.campus].submit(
+                    call_in_background, load_func, trumba_cal))
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                future.result()
+        except BaseException:
+            # fail fast, the queued requests are not sent
+            failed = True
+            raise
+        finally:
+            for executor in executors.values():
+                executor.shutdown(cancel_futures=failed)
+
+    def _extract_cals(self, campus, resp_fragment, calendar_dict, parent,
+                      shared_ids):
+        """
+        Extract calendars. Update calendar_dict.
         """
         for record in resp_fragment:
             if (re.match(r'Internal Event Actions', record['Name']) or
@@ -64,16 +232,17 @@ class Calendars:
 
             calendarid = int(record.get('ID'))
 
-            if self._not_shared_from_sea(campus, calendarid):
+            if calendarid not in shared_ids:
                 trumba_cal = TrumbaCalendar(calendarid=calendarid,
                                             campus=campus)
                 if parent is None:
                     trumba_cal.name = record.get('Name')
                 else:
                     trumba_cal.name = "{0} >> {1}".format(
-                        parent, record.get('Name'))
+                        parent.name, record.get('Name'))
+                    trumba_cal.parent = parent
+                    parent.children.append(trumba_cal)
 
-                self.perm_loader.get_cal_permissions(trumba_cal)
                 calendar_dict[trumba_cal.calendarid] = trumba_cal
 
                 if (record.get('ChildCalendars') is not None and
@@ -81,17 +250,8 @@ class Calendars:
                     self._extract_cals(campus,
                                        record['ChildCalendars'],
                                        calendar_dict,
-                                       trumba_cal.name)
-
-    def _not_shared_from_sea(self, campus, calendar_id):
-        """
-        return True if the calendar_id is not a Seattle calendar
-        share with Bothell or Tacoma
-        """
-        if is_sea(campus):
-            self.sea_calendar_ids.add(calendar_id)
-            return True
-        return calendar_id not in self.sea_calendar_ids
+                                       trumba_cal,
+                                       shared_ids)
 
     def exists(self, campus_code):
         """
@@ -101,9 +261,22 @@ class Calendars:
         return cals is not None and len(cals) > 0
 
     def get_campus_calendars(self, campus_code):
-        if self.exists(campus_code):
-            return sorted(self.campus_calendars[campus_code].values())
-        return None
+        """
+        :return: a new list of the TrumbaCalendar of the campus sorted
+            by name. The sorted list is cached until the calendars change
+            (see calendars_changed), each call returns a copy of it.
+        """
+        if not self.exists(campus_code):
+            return None
+        calendar_dict = self.campus_calendars[campus_code]
+        cached = self._sorted_calendars.get(campus_code)
+        if (cached is None or cached[0] != self._version or
+                cached[1] is not calendar_dict or
+                len(cached[2]) != len(calendar_dict)):
+            cached = (self._version, calendar_dict,
+                      sorted(calendar_dict.values(), key=_sort_key))
+            self._sorted_calendars[campus_code] = cached
+        return list(cached[2])
 
     def get_calendar(self, campus_code, calendarid):
         if self.exists(campus_code):
@@ -116,26 +289,203 @@ class Calendars:
 
     def total_calendars(self, campus_code):
         if self.exists(campus_code):
-            return len(self.get_campus_calendars(campus_code))
+            return len(self.campus_calendars[campus_code])
         return 0
 
+    def _get_tree(self, campus_code):
+        """
+        :return: the _CalendarTree of the campus, cached until
+            the calendars change (see calendars_changed).
+        """
+        calendar_dict = self.campus_calendars.get(campus_code, {})
+        cached = self._calendar_trees.get(campus_code)
+        if (cached is None or cached[0] != self._version or
+                cached[1] is not calendar_dict or
+                cached[2].size() != len(calendar_dict)):
+            cached = (self._version, calendar_dict,
+                      _CalendarTree(calendar_dict))
+            self._calendar_trees[campus_code] = cached
+        return cached[2]
+
+    def get_root_calendars(self, campus_code):
+        """
+        :return: the list of the top level TrumbaCalendar of the campus
+        """
+        return self._get_tree(campus_code).roots
+
+    def iter_subtree(self, campus_code, calendarid):
+        """
+        Iterate the given calendar and all its descendants, parents
+        before children.
+        """
+        return self._get_tree(campus_code).iter_subtree(calendarid)
+
+    def get_depth(self, campus_code, calendarid):
+        """
+        :return: 0 for a top level calendar, 1 for its children, etc.
+            None if the calendar doesn't exist.
+        """
+        return self._get_tree(campus_code).get_depth(calendarid)
+
+    def get_ancestors(self, campus_code, calendarid):
+        """
+        :return: the list of TrumbaCalendar from the parent of the
+            given calendar up to its top level calendar
+        """
+        ancestors = []
+        trumba_cal = self.get_calendar(campus_code, calendarid)
+        while trumba_cal is not None and trumba_cal.parent is not None:
+            trumba_cal = trumba_cal.parent
+            ancestors.append(trumba_cal)
+        return ancestors
+
+    def is_descendant(self, campus_code, calendarid, ancestorid):
+        """
+        :return: True if calendarid is in the subtree of ancestorid
+        """
+        return self._get_tree(campus_code).is_descendant(calendarid,
+                                                         ancestorid)
+
+    def get_subtree_permissions(self, campus_code, calendarid):
+        """
+        :return: a dict of {uwnetid, Permission} with the highest
+            permission of each user on the calendar or its descendants
+        """
+        rollup = {}
+        for trumba_cal in self.iter_subtree(campus_code, calendarid):
+            for netid, perm in trumba_cal.permissions.items():
+                highest = rollup.get(netid)
+                if highest is None or perm.is_higher_permission(
+                        highest.level):
+                    rollup[netid] = perm
+        return rollup
+
+    def get_user_permissions(self, uwnetid):
+        """
+        :return: a list of (TrumbaCalendar, Permission) of the calendars
+            on which the given uwnetid has a permission
+        """
+        user_perms = []
+        for (campus, calendarid), perm in (
+                self.perm_loader.get_account_permissions(uwnetid).items()):
+            trumba_cal = self.get_calendar(campus, calendarid)
+            if trumba_cal is not None:
+                user_perms.append((trumba_cal, perm))
+        return user_perms
+
+    def get_editable_calendars(self, uwnetid):
+        """
+        :return: the list of TrumbaCalendar the given uwnetid can edit
+        """
+        return [trumba_cal
+                for trumba_cal, perm in self.get_user_permissions(uwnetid)
+                if perm.in_editor_group()]
+
+    def get_showon_calendars(self, uwnetid):
+        """
+        :return: the list of TrumbaCalendar the given uwnetid can
+            show on (including those it can edit)
+        """
+        return [trumba_cal
+                for trumba_cal, perm in self.get_user_permissions(uwnetid)
+                if perm.is_showon_or_higher()]
+
+
+class _CalendarTree:
+    """
+    The Euler tour of a campus calendar hierarchy: the subtree of a
+    calendar is the slice of the preorder list between its entry and
+    exit positions.
+    """
+
+    def __init__(self, calendar_dict):
+        self.roots = [trumba_cal for trumba_cal in calendar_dict.values()
+                      if (trumba_cal.parent is None or
+                          trumba_cal.parent.calendarid not in calendar_dict)]
+        self.preorder = []
+        self.positions = {}
+        # a dict of {calenderid, (entry, exit, depth)}
+        for root in self.roots:
+            self._visit(root)
+
+    def _visit(self, root):
+        stack = [(root, 0, False)]
+        while len(stack) > 0:
+            trumba_cal, depth, visited = stack.pop()
+            if visited:
+                entry = self.positions[trumba_cal.calendarid][0]
+                self.positions[trumba_cal.calendarid] = (
+                    entry, len(self.preorder), depth)
+                continue
+            self.positions[trumba_cal.calendarid] = (
+                len(self.preorder), None, depth)
+            self.preorder.append(trumba_cal)
+            stack.append((trumba_cal, depth, True))
+            for child in reversed(trumba_cal.children):
+                stack.append((child, depth + 1, False))
+
+    def size(self):
+        return len(self.preorder)
+
+    def iter_subtree(self, calendarid):
+        position = self.positions.get(calendarid)
+        if position is None:
+            return iter([])
+        return iter(self.preorder[position[0]:position[1]])
+
+    def get_depth(self, calendarid):
+        position = self.positions.get(calendarid)
+        return position[2] if position is not None else None
+
+    def is_descendant(self, calendarid, ancestorid):
+        position = self.positions.get(calendarid)
+        ancestor = self.positions.get(ancestorid)
+        return (position is not None and ancestor is not None and
+                ancestor[0] <= position[0] < ancestor[1])
+
+
+def _sort_key(trumba_cal):
+    return (trumba_cal.name or "", trumba_cal.calendarid)
+
 
 def _is_valid_calendarid(calendarid):
     return re_cal_id.match(str(calendarid)) is not None
 
 
+def _get_all_campus_calendars():
+    """
+    Fetch the calendar lists of all campuses at the same time
+    :return: a dictionary of {campus, json data}
+    :except DataFailureException: when a request failed
+    """
+    with ThreadPoolExecutor(max_workers=len(CAMPUS_CODES)) as executor:
+        futures = {campus: executor.submit(
+                       call_in_background, _get_campus_calenders, campus)
+                   for campus in CAMPUS_CODES}
+        return {campus: future.result()
+                for campus, future in futures.items()}
+
+
 def _get_campus_calenders(campus):
     """
     :except DataFailureException: when the request failed
     """
+    resp = _post_calendarlist(campus)
+    if resp is None:
+        return None
+    return load_json(_make_request_id(campus), resp, campus)
+
+
+def _post_calendarlist(campus):
     if is_bot(campus):
-        resp = post_bot_resource(calendarlist_url, "{}")
+        return post_bot_resource(calendarlist_url, "{}")
     elif is_tac(campus):
-        resp = post_tac_resource(calendarlist_url, "{}")
+        return post_tac_resource(calendarlist_url, "{}")
     elif is_sea(campus):
-        resp = post_sea_resource(calendarlist_url, "{}")
-    else:
-        logger.error("Invalid campus code: {0}".format(campus))
-        return None
-    request_id = "{0} {1}".format(campus, calendarlist_url)
-    return load_json(request_id, resp)
+        return post_sea_resource(calendarlist_url, "{}")
+    logger.error("Invalid campus code: {0}".format(campus))
+    return None
+
+
+def _make_request_id(campus):
+    return "{0} {1}".format(campus, calendarlist_url)
@@ -3,21 +3,162 @@
 
 import os
 import json
+import logging
+import time
 from base64 import urlsafe_b64encode
 from os.path import abspath, dirname
 from urllib.parse import urlencode
-from restclients_core.dao import DAO
+from restclients_core.dao import DAO, LiveDAO
+from restclients_core.exceptions import DataFailureException
+from uw_trumba.metrics import get_endpoint, registry
+from uw_trumba.retry import (
+    backoff_delay, get_circuit_breaker, is_server_error)
+from uw_trumba.throttle import get_token_bucket, is_background
+from uw_trumba.trace import span
+
+logger = logging.getLogger(__name__)
+IDEMPOTENT_URLS = ("/service/calendars.asmx/GetCalendarList",
+                   "/service/calendars.asmx/GetPermissions")
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def to_bool(value):
+    """
+    :return: True if the setting value is True or one of the
+    TRUE_VALUES strings (case insensitive), ie, "False" is False.
+    """
+    return str(value).strip().lower() in TRUE_VALUES
 
 
 class TrumbaCalendar_DAO(DAO):
+    metrics_campus = "all"
+    # the campus label of the request metrics
+
     def service_name(self):
         return 'calendar'
 
     def service_mock_paths(self):
         return [abspath(os.path.join(dirname(__file__), "resources"))]
 
+    def get_max_workers(self):
+        """
+        :return: the size of the worker pool used when the requests
+        on this service are sent concurrently.
+        """
+        return int(self.get_service_setting("MAX_WORKERS", 4))
+
+    def get_circuit_breaker(self):
+        """
+        :return: the CircuitBreaker of this service, opening after
+        CIRCUIT_FAILURES consecutive failures for CIRCUIT_RESET_TIMEOUT
+        seconds. None if CIRCUIT_FAILURES is 0.
+        """
+        return get_circuit_breaker(
+            self.service_name(),
+            int(self.get_service_setting("CIRCUIT_FAILURES", 5)),
+            float(self.get_service_setting("CIRCUIT_RESET_TIMEOUT", 30)))
+
+    def _is_idempotent(self, method, url):
+        """
+        :return: True if the request can be safely retried
+        """
+        return method == "GET"
+
+    def _load_resource(self, method, url, headers, body):
+        """
+        Retry the failed idempotent requests up to MAX_RETRIES times,
+        waiting a random delay up to RETRY_BACKOFF * 2 ** retry
+        (capped at RETRY_BACKOFF_MAX) seconds.
+        """
+        circuit_breaker = self.get_circuit_breaker()
+        max_retries = (int(self.get_service_setting("MAX_RETRIES", 2))
+                       if self._is_idempotent(method, url) else 0)
+        attempt = 0
+        while True:
+            if (circuit_breaker is not None and
+                    not circuit_breaker.allow_request()):
+                raise DataFailureException(
+                    url, 503, "Circuit open on {0}".format(
+                        self.service_name()))
+            error = None
+            failed = True
+            # any other exception is a failure of the request
+            try:
+                response = self._send_request(method, url, headers, body)
+                failed = is_server_error(response.status)
+            except DataFailureException as ex:
+                if not is_server_error(ex.status):
+                    # the server answered
+                    failed = False
+                    raise
+                error = ex
+            finally:
+                # always record the outcome, so that a half-open
+                # circuit doesn't wait forever for its trial request
+                if circuit_breaker is not None:
+                    if failed:
+                        circuit_breaker.record_failure()
+                    else:
+                        circuit_breaker.record_success()
+
+            if not failed or attempt >= max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = backoff_delay(
+                attempt,
+                float(self.get_service_setting("RETRY_BACKOFF", 0.5)),
+                float(self.get_service_setting("RETRY_BACKOFF_MAX", 5)))
+            logger.warning("{0} {1} failed, retry in {2:.3f}s".format(
+                self.service_name(), url, delay))
+            time.sleep(delay)
+            attempt += 1
+
+    def _send_request(self, method, url, headers, body):
+        start_time = time.perf_counter()
+        status = 0
+        size = 0
+        try:
+            with span("request", service=self.service_name(),
+                      endpoint=get_endpoint(url)):
+                response = super()._load_resource(
+                    method, url, headers, body)
+            status = response.status
+            size = len(response.data) if response.data else 0
+            return response
+        except DataFailureException as ex:
+            status = ex.status
+            raise
+        finally:
+            registry.observe_request(
+                self.metrics_campus, get_endpoint(url), status,
+                time.perf_counter() - start_time, size)
+
+    def _get_live_implementation(self):
+        return TrumbaLiveDAO(self.service_name(), self)
+
+    def get_pool_stats(self):
+        """
+        :return: a dict of the connection pool statistics of this
+        service, None if the live pool hasn't been created.
+        'hits' counts the requests sent on a reused connection and
+        'misses' the new connections.
+        """
+        pool = LiveDAO.pools.get(self.service_name())
+        if pool is None:
+            return None
+        return {'requests': pool.num_requests,
+                'hits': max(pool.num_requests - pool.num_connections, 0),
+                'misses': pool.num_connections,
+                'idle': pool.pool.qsize() if pool.pool is not None else 0,
+                'maxsize': pool.pool.maxsize if pool.pool is not None else 0}
+
 
 class TrumbaSea_DAO(TrumbaCalendar_DAO):
+    metrics_campus = "sea"
+    _auth_headers = {}
+    # a dict of {service, ((id, password), Authorization header value)}
 
     def is_mock(self):
         return self.get_implementation().is_mock()
@@ -31,12 +172,50 @@ class TrumbaSea_DAO(TrumbaCalendar_DAO):
             self.get_service_setting("{0}_ID".format(service), ""),
             self.get_service_setting("{0}_PSWD".format(service), ""))
 
+    def _get_auth_header(self):
+        """
+        :return: the Authorization header value, encoded again only
+        when the account settings change
+        """
+        service = self.service_name().upper()
+        credentials = (
+            self.get_service_setting("{0}_ID".format(service), ""),
+            self.get_service_setting("{0}_PSWD".format(service), ""))
+        cached = TrumbaSea_DAO._auth_headers.get(service)
+        if cached is None or cached[0] != credentials:
+            basic_auth = "{0}:{1}".format(*credentials).encode()
+            cached = (credentials, "Basic {0}".format(
+                urlsafe_b64encode(basic_auth).decode("ascii")))
+            TrumbaSea_DAO._auth_headers[service] = cached
+        return cached[1]
+
     def _custom_headers(self, method, url, headers, body):
-        credentials = self._get_basic_auth().encode()
-        headers["Authorization"] = "Basic {0}".format(
-            urlsafe_b64encode(credentials).decode("ascii"))
+        headers["Authorization"] = self._get_auth_header()
+        if not to_bool(self.get_service_setting("KEEP_ALIVE", True)):
+            headers["Connection"] = "close"
         return headers
 
+    def get_rate_limiter(self):
+        """
+        :return: the TokenBucket of this campus account if the
+        RATE_LIMIT (requests per second) setting is set, otherwise None.
+        RATE_LIMIT_BURST sets the number of requests allowed at once.
+        """
+        return get_token_bucket(
+            self.service_name(),
+            float(self.get_service_setting("RATE_LIMIT", 0)),
+            float(self.get_service_setting("RATE_LIMIT_BURST", 0)))
+
+    def _is_idempotent(self, method, url):
+        # the account and permission changes are GET requests
+        return url.split("?")[0] in IDEMPOTENT_URLS
+
+    def _send_request(self, method, url, headers, body):
+        rate_limiter = self.get_rate_limiter()
+        if rate_limiter is not None:
+            rate_limiter.acquire(interactive=not is_background())
+        return super()._send_request(method, url, headers, body)
+
     def _get_mock_file_path(self, url, method, body):
         ret = "{0}.{1}".format(url, method.title())
         if body != "{}":
@@ -53,10 +232,29 @@ class TrumbaSea_DAO(TrumbaCalendar_DAO):
 
 
 class TrumbaBot_DAO(TrumbaSea_DAO):
+    metrics_campus = "bot"
+
     def service_name(self):
         return 'trumba_bot'
 
 
 class TrumbaTac_DAO(TrumbaSea_DAO):
+    metrics_campus = "tac"
+
     def service_name(self):
         return 'trumba_tac'
+
+
+class TrumbaLiveDAO(LiveDAO):
+    """
+    The live connection pool of a Trumba service. The connections
+    are kept alive and reused; POOL_SIZE sets the number of connections
+    kept per host and, if POOL_BLOCK is True (the default), the maximum
+    number of connections open at once to the host.
+    """
+
+    def create_pool(self):
+        pool = super().create_pool()
+        pool.block = to_bool(
+            self.dao.get_service_setting("POOL_BLOCK", True))
+        return pool
@@ -0,0 +1,265 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A time-range index of the events of a parsed calendar feed.
+The events are kept in a centered interval tree and in an array sorted
+by start time, answering overlap and start-range queries in
+O(log n + k). An index is built once per Calendar object, ie, again
+only when the feed has changed.
+"""
+
+import heapq
+import threading
+import weakref
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+class _Node(object):
+
+    def __init__(self, center, by_start, by_end, left, right):
+        self.center = center
+        self.by_start = by_start  # the intervals containing center
+        self.by_end = by_end      # the same, from the latest end
+        self.left = left
+        self.right = right
+
+
+class EventIndex(object):
+    """
+    The events of a calendar as half-open [start, end) intervals of
+    aware datetimes. A date or a floating time is in the timezone tz.
+    A recurring event is indexed by its first occurrence only.
+    """
+
+    def __init__(self, events, tz=timezone.utc):
+        self.tz = tz
+        intervals = []
+        for event in events:
+            start, end = get_event_interval(event, tz)
+            if start is not None:
+                intervals.append((start, end, len(intervals), event))
+        intervals.sort(key=_interval_key)
+        self.intervals = intervals
+        self.starts = [interval[0] for interval in intervals]
+        self.root = _build_tree(intervals)
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlapping(self, start, end):
+        """
+        :param start: a date or datetime
+        :param end: a date or datetime after start
+        :return: a list of the events overlapping [start, end),
+        ordered by start time.
+        """
+        return [interval[3]
+                for interval in self._get_overlapping(start, end)]
+
+    def _get_overlapping(self, start, end):
+        start = _to_datetime(start, self.tz)
+        end = _to_datetime(end, self.tz)
+        found = []
+        node = self.root
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            if end <= node.center:
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval)
+                if node.left is not None:
+                    stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval)
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+        found.sort(key=_interval_key)
+        return found
+
+    def at(self, instant):
+        """
+        :return: a list of the events in progress at the instant
+        """
+        instant = _to_datetime(instant, self.tz)
+        return self.overlapping(instant, instant + timedelta(microseconds=1))
+
+    def starting_between(self, start, end):
+        """
+        :return: a list of the events starting in [start, end),
+        ordered by start time.
+        """
+        low = bisect_left(self.starts, _to_datetime(start, self.tz))
+        high = bisect_left(self.starts, _to_datetime(end, self.tz))
+        return [interval[3] for interval in self.intervals[low:high]]
+
+
+def _interval_key(interval):
+    return interval[0], interval[2]
+
+
+def _contains(interval, center):
+    start, end = interval[0], interval[1]
+    return start <= center < end or start == end == center
+
+
+def _build_tree(intervals):
+    """
+    :param intervals: a list sorted by start time
+    """
+    if not intervals:
+        return None
+    center = intervals[len(intervals) // 2][0]
+    left = []
+    middle = []
+    right = []
+    for interval in intervals:
+        if interval[0] > center:
+            right.append(interval)
+        elif _contains(interval, center):
+            middle.append(interval)
+        else:
+            left.append(interval)
+    return _Node(center,
+                 middle,
+                 sorted(middle, key=lambda interval: interval[1],
+                        reverse=True),
+                 _build_tree(left),
+                 _build_tree(right))
+
+
+def get_event_interval(event, tz=timezone.utc):
+    """
+    :return: the (start, end) aware datetimes of the icalendar.Event,
+    (None, None) if it has no DTSTART. Without DTEND or DURATION,
+    an all-day event lasts one day and the others have no duration.
+    """
+    if event.get('DTSTART') is None:
+        return None, None
+    dtstart = event.decoded('DTSTART')
+    start = _to_datetime(dtstart, tz)
+    if event.get('DTEND') is not None:
+        end = _to_datetime(event.decoded('DTEND'), tz)
+    elif event.get('DURATION') is not None:
+        end = start + event.decoded('DURATION')
+    elif isinstance(dtstart, datetime):
+        end = start
+    else:
+        end = start + timedelta(days=1)
+    return start, max(start, end)
+
+
+def _to_datetime(value, tz):
+    if not isinstance(value, datetime):
+        if isinstance(value, date):
+            value = datetime(value.year, value.month, value.day)
+        else:
+            raise ValueError("Not a date: {0}".format(value))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return value
+
+
+def get_calendar_timezone(calendar):
+    """
+    :return: the tzinfo of the X-WR-TIMEZONE of the calendar, UTC if
+    it is missing or unknown.
+    """
+    name = calendar.get('X-WR-TIMEZONE')
+    if name:
+        try:
+            return ZoneInfo(str(name))
+        except (ValueError, KeyError, OSError):
+            pass
+    return timezone.utc
+
+
+def merge_timeline(calendars, start=None, end=None):
+    """
+    :param calendars: an iterable of icalendar.Calendar objects
+    :param start, end: the window of the events, all events if None
+    :return: a generator of the events of all the calendars ordered by
+    start time, merging the indexed events of each calendar lazily.
+    An event in several calendars (same UID and start) is returned once.
+    """
+    sources = []
+    for calendar in calendars:
+        index = get_event_index(calendar)
+        if start is None or end is None:
+            sources.append(index.intervals)
+        else:
+            sources.append(index._get_overlapping(start, end))
+
+    current_start = None
+    seen = set()
+    # the events starting at current_start
+    for interval in heapq.merge(*sources, key=lambda item: item[0]):
+        if interval[0] != current_start:
+            current_start = interval[0]
+            seen.clear()
+        uid = interval[3].get('UID')
+        if uid is not None:
+            key = (str(uid), str(interval[3].get('RECURRENCE-ID')))
+            if key in seen:
+                continue
+            seen.add(key)
+        yield interval[3]
+
+
+_derived = {}
+# a dict of {(id(calendar), kind), (weakref to the calendar, object)}
+_derived_lock = threading.RLock()
+
+
+def get_event_index(calendar):
+    """
+    :param calendar: an icalendar.Calendar object
+    :return: the EventIndex of the calendar, built on the first call and
+    kept as long as the calendar object is in use, ie, cached by
+    get_shared_calendar_by_name.
+    """
+    return _get_derived(calendar, 'index', _build_index)
+
+
+def _build_index(calendar):
+    return EventIndex(calendar.walk('VEVENT'),
+                      get_calendar_timezone(calendar))
+
+
+def _get_derived(calendar, kind, build):
+    """
+    :return: the object built by build(calendar), once per calendar
+    object and kind
+    """
+    key = (id(calendar), kind)
+    with _derived_lock:
+        entry = _derived.get(key)
+    if entry is not None and entry[0]() is calendar:
+        return entry[1]
+
+    derived = build(calendar)
+    with _derived_lock:
+        _derived[key] = (weakref.ref(calendar, _discarder(key)), derived)
+    return derived
+
+
+def _discarder(key):
+    def discard(ref):
+        with _derived_lock:
+            entry = _derived.get(key)
+            if entry is not None and entry[0] is ref:
+                del _derived[key]
+    return discard
@@ -11,6 +11,7 @@ class TrumbaException(Exception):
 
     def __init__(self, message, code):
         self.message = "{} ==> {}".format(message, code)
+        self.code = code
 
     def __str__(self):
         return "{}: {}".format(self.message, self.__class__.__name__)
@@ -0,0 +1,141 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A cache of the .ics feeds revalidated with conditional GET requests.
+The ETag and Last-Modified validators of each feed are kept with its
+parsed calendar, and a 304 Not Modified response reuses that calendar
+without downloading or parsing the feed again.
+The entries are bounded by the total size of their feeds, the least
+recently used feed is dropped first.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class FeedCache(object):
+    """
+    The feeds requested with the given DAO settings:
+    FEED_MAX_AGE, the seconds a feed checked is returned without a
+    request (default 0);
+    FEED_MAX_BYTES, the total size of the cached feeds (default 64 MB).
+    """
+
+    def __init__(self, dao):
+        self.dao = dao
+        self.entries = OrderedDict()
+        # {url, (etag, last_modified, checked_at, parsed, size)}
+        # from the least recently used
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, parse):
+        """
+        :param url: the url of the feed
+        :param parse: a function(url, response) returning the parsed feed
+        :return: the parsed feed, shared with the other callers if it
+        came from the cache (don't modify it).
+        raise the exceptions of parse if the response is not a 200 or 304.
+        """
+        return self.get_item(url, parse)[0]
+
+    def get_item(self, url, parse):
+        """
+        :return: a tuple of the parsed feed and True if it is shared
+        with other callers, ie, it came from the cache or is kept in it.
+        """
+        max_age = float(self.dao.get_service_setting("FEED_MAX_AGE", 0))
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is not None and time.time() - entry[2] < max_age:
+                self.entries.move_to_end(url)
+                self.hits += 1
+                return entry[3], True
+
+        headers = {}
+        if entry is not None:
+            if entry[0]:
+                headers["If-None-Match"] = entry[0]
+            if entry[1]:
+                headers["If-Modified-Since"] = entry[1]
+        response = self.dao.getURL(url, headers)
+
+        if response.status == 304 and entry is not None:
+            with self._lock:
+                self.not_modified += 1
+                if self.entries.get(url) is entry:
+                    self.entries[url] = (
+                        response.getheader("ETag") or entry[0],
+                        response.getheader("Last-Modified") or entry[1],
+                        time.time(), entry[3], entry[4])
+                    self.entries.move_to_end(url)
+            return entry[3], True
+
+        parsed = parse(url, response)
+        etag = response.getheader("ETag")
+        last_modified = response.getheader("Last-Modified")
+        added = False
+        with self._lock:
+            self.misses += 1
+            if url in self.entries:
+                self._remove(url)
+            if etag or last_modified:
+                added = self._add(url, (
+                    etag, last_modified, time.time(), parsed,
+                    len(response.data or b"")))
+        return parsed, added
+
+    def _add(self, url, entry):
+        max_bytes = int(self.dao.get_service_setting(
+            "FEED_MAX_BYTES", 64 * 1024 * 1024))
+        size = entry[4]
+        if size > max_bytes:
+            return False
+        while self.entries and self.total_bytes + size > max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+        self.entries[url] = entry
+        self.total_bytes += size
+        return True
+
+    def _remove(self, url):
+        entry = self.entries.pop(url)
+        self.total_bytes -= entry[4]
+
+    def invalidate(self, url):
+        with self._lock:
+            if url in self.entries:
+                self._remove(url)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.not_modified = 0
+            self.evictions = 0
+
+    def get_stats(self):
+        """
+        :return: a dict of the counters of the cache:
+        'hits': returned without a request (within FEED_MAX_AGE),
+        'not_modified': revalidated with a 304 response,
+        'misses': downloaded and parsed,
+        'evictions': dropped for FEED_MAX_BYTES,
+        'feeds': the number of feeds cached,
+        'bytes': the total size of the cached feeds.
+        """
+        with self._lock:
+            return {'hits': self.hits,
+                    'not_modified': self.not_modified,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'feeds': len(self.entries),
+                    'bytes': self.total_bytes}
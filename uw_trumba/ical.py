@@ -0,0 +1,81 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Incremental parsing of the iCalendar feeds of the Trumba calendars.
+The feed is read line by line from its bytes and each VEVENT is parsed
+as soon as its END line is read, so that only the event being parsed
+is held in memory.
+"""
+
+from io import BytesIO
+from icalendar import Event, Timezone
+
+
+# the components parsed by iter_events, the others are skipped
+_COMPONENTS = {b'VEVENT': Event, b'VTIMEZONE': Timezone}
+
+
+def iter_events(source):
+    """
+    :param source: the bytes of an iCalendar feed, or a binary file-like
+        object of the feed (ie, an open file or a streamed response)
+    :return: a generator of the icalendar.Event objects in the feed.
+    A VTIMEZONE is parsed (hence registered with icalendar) when it is
+    read, so that the TZIDs of the events following it are resolved.
+    raise ValueError or UnicodeDecodeError if an event can't be parsed.
+    """
+    component_cls = None
+    end_line = None
+    block = []
+    for line in _unfold(_iter_lines(source)):
+        if component_cls is None:
+            name = _get_begin_name(line)
+            if name in _COMPONENTS:
+                component_cls = _COMPONENTS[name]
+                end_line = b'END:' + name
+                block = [line]
+            continue
+
+        block.append(line)
+        if line.upper() == end_line:
+            component = component_cls.from_ical(
+                b'\r\n'.join(block).decode('UTF-8'))
+            if component_cls is Event:
+                yield component
+            component_cls = None
+            block = []
+
+    if component_cls is not None:
+        raise ValueError("Missing {0}".format(end_line.decode('UTF-8')))
+
+
+def _iter_lines(source):
+    if isinstance(source, str):
+        source = source.encode('UTF-8')
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    for line in source:
+        yield line.rstrip(b'\r\n')
+
+
+def _unfold(lines):
+    """
+    Join the folded lines (RFC 5545 3.1) into their content lines
+    """
+    parts = []
+    for line in lines:
+        if line[:1] in (b' ', b'\t') and parts:
+            parts.append(line[1:])
+            continue
+        if parts:
+            yield b''.join(parts)
+        parts = [line] if line else []
+    if parts:
+        yield b''.join(parts)
+
+
+def _get_begin_name(line):
+    if line[:6].upper() == b'BEGIN:':
+        return line[6:].strip().upper()
+    return None
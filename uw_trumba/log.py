@@ -0,0 +1,89 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Logging of the Trumba responses at (almost) no cost when the debug
+level is disabled: a debug message is built only when it is logged,
+the response bodies are truncated, and the debug logs of the
+high-volume requests can be sampled.
+"""
+
+import logging
+import random
+
+
+class LazyMessage(object):
+    """
+    A log message built by func(*args) only when it is formatted or
+    read, once for all the handlers. It is the msg of the log record:
+    the handlers reading the built message (ie, the dict of the
+    response logs) get it with get_message().
+    """
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+        self._message = None
+        self._text = None
+
+    def get_message(self):
+        """
+        :return: the message returned by func(*args), built on the
+        first call
+        """
+        if self.func is not None:
+            self._message = self.func(*self.args)
+            # release the response
+            self.func = None
+            self.args = None
+        return self._message
+
+    def __str__(self):
+        if self._text is None:
+            self._text = str(self.get_message())
+        return self._text
+
+
+def truncate(data, max_length):
+    """
+    :param data: a str or bytes, or None
+    :param max_length: the maximum number of characters (bytes) kept,
+        0 for no limit
+    :return: a str of data, cut at max_length with the number of
+    characters left out.
+    """
+    if data is None:
+        return None
+    length = len(data)
+    if max_length and length > max_length:
+        data = data[:max_length]
+    if isinstance(data, bytes):
+        data = data.decode('UTF-8', errors='replace')
+    if max_length and length > max_length:
+        return "{0}...({1} more)".format(data, length - max_length)
+    return data
+
+
+def is_sampled(rate):
+    """
+    :return: True for a rate fraction of the calls
+    """
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def log_debug(logger, dao, func, *args):
+    """
+    Log the message returned by func(max_length, *args) if the DEBUG
+    level is enabled, for a LOG_SAMPLE_RATE (default 1) fraction of the
+    calls. max_length is the LOG_BODY_MAX setting (default 1024)
+    of the dao.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if not is_sampled(float(dao.get_service_setting("LOG_SAMPLE_RATE", 1))):
+        return
+    logger.debug(LazyMessage(func, get_body_max(dao), *args))
+
+
+def get_body_max(dao):
+    return int(dao.get_service_setting("LOG_BODY_MAX", 1024))
@@ -0,0 +1,220 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+The request metrics of the Trumba services, per campus and endpoint:
+a latency histogram, the counts of http status codes and of Trumba
+error codes, and the bytes received. Recording a request takes one
+lock and a few dict updates; the metrics are formatted only when
+exported, ie, in the Prometheus text format by PrometheusTextExporter.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+_endpoint_re = re.compile(r"\.asmx/(\w+)")
+
+
+def get_endpoint(url):
+    """
+    :param url: a request url or a request id containing it
+    :return: the name of the Trumba web method, 'ics' for a feed
+    """
+    match = _endpoint_re.search(url)
+    if match is not None:
+        return match.group(1)
+    if url.split("?")[0].endswith(".ics"):
+        return "ics"
+    return "other"
+
+
+class Histogram(object):
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        # the last count is of the values above the last bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get_cumulative_counts(self):
+        """
+        :return: a list of (upper bound, count of the values <= bound),
+        ending with (float("inf"), count)
+        """
+        total = 0
+        cumulative = []
+        for bound, count in zip(
+                self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class EndpointMetrics(object):
+    """
+    The metrics of the requests sent to an endpoint with a campus account
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.latency = Histogram(buckets)
+        self.statuses = {}
+        # {http status, count}
+        self.error_codes = {}
+        # {Trumba error code, count}
+        self.bytes_received = 0
+
+
+class MetricsRegistry(object):
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.endpoints = {}
+        # {(campus, endpoint), EndpointMetrics}
+        self._lock = threading.Lock()
+
+    def _get(self, campus, endpoint):
+        key = (campus, endpoint)
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = EndpointMetrics(self.buckets)
+            self.endpoints[key] = metrics
+        return metrics
+
+    def observe_request(self, campus, endpoint, status, seconds, size):
+        """
+        Record a response (status 0 for a connection failure)
+        of size bytes received after seconds
+        """
+        with self._lock:
+            metrics = self._get(campus, endpoint)
+            metrics.latency.observe(seconds)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.bytes_received += size
+
+    def count_error_code(self, campus, endpoint, code):
+        """
+        Record an error code returned in a Trumba response
+        """
+        with self._lock:
+            metrics = self._get(campus, endpoint)
+            metrics.error_codes[code] = metrics.error_codes.get(code, 0) + 1
+
+    def collect(self):
+        """
+        :return: a list of (campus, endpoint, EndpointMetrics) copied
+        under the lock, sorted by campus and endpoint
+        """
+        collected = []
+        with self._lock:
+            for key in sorted(self.endpoints):
+                metrics = self.endpoints[key]
+                copy = EndpointMetrics(self.buckets)
+                copy.latency.counts = list(metrics.latency.counts)
+                copy.latency.sum = metrics.latency.sum
+                copy.latency.count = metrics.latency.count
+                copy.statuses = dict(metrics.statuses)
+                copy.error_codes = dict(metrics.error_codes)
+                copy.bytes_received = metrics.bytes_received
+                collected.append((key[0], key[1], copy))
+        return collected
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+
+
+class MetricsExporter(object):
+    """
+    The interface of the exporters of a MetricsRegistry
+    """
+
+    def export(self, registry):
+        raise NotImplementedError()
+
+
+class PrometheusTextExporter(MetricsExporter):
+    """
+    Format the metrics in the Prometheus text exposition format
+    """
+
+    def __init__(self, prefix="uw_trumba"):
+        self.prefix = prefix
+
+    def export(self, registry):
+        """
+        :return: a str of the metrics of the registry
+        """
+        collected = registry.collect()
+        lines = []
+        name = "{0}_request_duration_seconds".format(self.prefix)
+        lines.append("# HELP {0} Trumba request duration".format(name))
+        lines.append("# TYPE {0} histogram".format(name))
+        for campus, endpoint, metrics in collected:
+            labels = _format_labels(campus, endpoint)
+            for bound, count in metrics.latency.get_cumulative_counts():
+                lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(
+                    name, labels, _format_bound(bound), count))
+            lines.append("{0}_sum{{{1}}} {2}".format(
+                name, labels, repr(metrics.latency.sum)))
+            lines.append("{0}_count{{{1}}} {2}".format(
+                name, labels, metrics.latency.count))
+
+        name = "{0}_responses_total".format(self.prefix)
+        lines.append("# HELP {0} Trumba responses by http status".format(
+            name))
+        lines.append("# TYPE {0} counter".format(name))
+        for campus, endpoint, metrics in collected:
+            for status in sorted(metrics.statuses):
+                lines.append('{0}{{{1},status="{2}"}} {3}'.format(
+                    name, _format_labels(campus, endpoint), status,
+                    metrics.statuses[status]))
+
+        name = "{0}_response_bytes_total".format(self.prefix)
+        lines.append("# HELP {0} Trumba response bytes received".format(
+            name))
+        lines.append("# TYPE {0} counter".format(name))
+        for campus, endpoint, metrics in collected:
+            lines.append("{0}{{{1}}} {2}".format(
+                name, _format_labels(campus, endpoint),
+                metrics.bytes_received))
+
+        name = "{0}_error_codes_total".format(self.prefix)
+        lines.append("# HELP {0} Trumba error codes returned".format(name))
+        lines.append("# TYPE {0} counter".format(name))
+        for campus, endpoint, metrics in collected:
+            for code in sorted(metrics.error_codes):
+                lines.append('{0}{{{1},code="{2}"}} {3}'.format(
+                    name, _format_labels(campus, endpoint), code,
+                    metrics.error_codes[code]))
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(campus, endpoint):
+    return 'campus="{0}",endpoint="{1}"'.format(campus, endpoint)
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+registry = MetricsRegistry()
+
+
+def export_metrics(exporter=None):
+    """
+    :param exporter: a MetricsExporter, PrometheusTextExporter if None
+    :return: the metrics of the requests sent by this process
+    """
+    if exporter is None:
+        exporter = PrometheusTextExporter()
+    return exporter.export(registry)
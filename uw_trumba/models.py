@@ -114,6 +114,8 @@ class TrumbaCalendar(models.Model):
     def __init__(self, *args, **kwargs):
         super(TrumbaCalendar, self).__init__(*args, **kwargs)
         self.permissions = {}  # a dict of {uwnetid, Permission}
+        self.parent = None  # the parent TrumbaCalendar
+        self.children = []  # a list of the child TrumbaCalendar
 
 
 class Permission(models.Model):
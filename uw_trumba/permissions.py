@@ -12,8 +12,12 @@ Be sure to set the logging configuration if you use the LiveDao!
 import json
 import logging
 import re
+from threading import Lock
 from restclients_core.exceptions import DataFailureException
-from uw_trumba.models import Permission
+from uw_trumba.metrics import get_endpoint, registry
+from uw_trumba.models import Permission, TrumbaCalendar
+from uw_trumba.retry import is_server_error
+from uw_trumba.trace import span
 from uw_trumba import (
     post_bot_resource, post_sea_resource, post_tac_resource)
 from uw_trumba.exceptions import (
@@ -31,6 +35,9 @@ class Permissions:
     def __init__(self):
         self.account_set = set()
         # a set of the uwnetids of all the existing accounts
+        self.account_permissions = {}
+        # a dict of {uwnetid, {(campus, calendarid), Permission}}
+        self._lock = Lock()
 
     def account_exists(self, uwnetid):
         return uwnetid in self.account_set
@@ -44,16 +51,47 @@ class Permissions:
         :param calendar: a TrumbaCalendar object
         Set the calendar.permissions attribute with a dict of
         {uwnetid, Permission} and add uwnetids into self.account_set.
+        :except: DataFailureException if the service is unavailable
+        (after the DAO retries), the other errors are logged.
+        """
+        with span("Permissions.get_cal_permissions",
+                  campus=calendar.campus, calendarid=calendar.calendarid):
+            try:
+                self.set_cal_permissions(
+                    calendar, _get_permissions(calendar))
+            except Exception as ex:
+                if is_unavailable(ex):
+                    raise
+                logger.error(
+                    "get_cal_permissions on {0} ==> {1}".format(calendar, ex))
+
+    def reload_cal_permissions(self, calendar):
+        """
+        :param calendar: a TrumbaCalendar object
+        Replace the calendar.permissions with the current ones.
+        The calendar is unchanged if the request failed.
+        :except: DataFailureException if the service is unavailable
         """
         try:
             data = _get_permissions(calendar)
-            if (data.get('d') is not None and
-                    data['d'].get('Users') is not None and
-                    len(data['d']['Users']) > 0):
-                self._load_permissions(calendar, data['d']['Users'])
         except Exception as ex:
+            if is_unavailable(ex):
+                raise
             logger.error(
-                "get_cal_permissions on {0} ==> {1}".format(calendar, ex))
+                "reload_cal_permissions on {0} ==> {1}".format(calendar, ex))
+            return
+        self.remove_cal_permissions(calendar)
+        self.set_cal_permissions(calendar, data)
+
+    def set_cal_permissions(self, calendar, data):
+        """
+        :param calendar: a TrumbaCalendar object
+        :param data: the json data of a GetPermissions response
+        """
+        if (data.get('d') is not None and
+                data['d'].get('Users') is not None and
+                len(data['d']['Users']) > 0):
+            self._load_permissions(calendar, data['d']['Users'])
 
     def _load_permissions(self, calendar, resp_fragment):
         for record in resp_fragment:
@@ -66,6 +104,62 @@ class Permissions:
                               display_name=record.get('Name'))
             calendar.permissions[netid] = perm
             self.add_account(netid)
+        self.index_cal_permissions(calendar)
+
+    def index_cal_permissions(self, calendar):
+        """
+        Add the calendar.permissions to self.account_permissions
+        """
+        key = (calendar.campus, calendar.calendarid)
+        with self._lock:
+            for netid, perm in calendar.permissions.items():
+                self.account_permissions.setdefault(netid, {})[key] = perm
+
+    def remove_cal_permissions(self, calendar):
+        """
+        Clear the calendar.permissions and remove them from
+        self.account_permissions
+        """
+        key = (calendar.campus, calendar.calendarid)
+        with self._lock:
+            for netid in calendar.permissions:
+                cal_perms = self.account_permissions.get(netid)
+                if cal_perms is not None:
+                    cal_perms.pop(key, None)
+                    if len(cal_perms) == 0:
+                        del self.account_permissions[netid]
+        calendar.permissions = {}
+
+    def update_permission(self, calendar, uwnetid, level):
+        """
+        Apply a successful SetPermissions of the level to the
+        calendar.permissions and self.account_permissions
+        """
+        key = (calendar.campus, calendar.calendarid)
+        current = calendar.permissions.get(uwnetid)
+        with self._lock:
+            if level == Permission.NONE:
+                calendar.permissions.pop(uwnetid, None)
+                cal_perms = self.account_permissions.get(uwnetid, {})
+                cal_perms.pop(key, None)
+                if len(cal_perms) == 0:
+                    self.account_permissions.pop(uwnetid, None)
+                return
+            perm = Permission(uwnetid=uwnetid,
+                              level=level,
+                              display_name=(current.display_name
+                                            if current is not None
+                                            else None))
+            calendar.permissions[uwnetid] = perm
+            self.account_permissions.setdefault(uwnetid, {})[key] = perm
+        self.add_account(uwnetid)
+
+    def get_account_permissions(self, uwnetid):
+        """
+        :return: a dict of {(campus, calendarid), Permission}
+            of the given uwnetid
+        """
+        return self.account_permissions.get(uwnetid, {})
 
     def total_accounts(self):
         return len(self.account_set)
@@ -76,19 +170,26 @@ def _create_req_body(calendar_id):
 
 
 def _get_permissions(calendar):
+    return load_json(_make_request_id(calendar),
+                     _post_permissions(calendar), calendar.campus)
+
+
+def _post_permissions(calendar):
     if calendar.is_bot():
-        resp = post_bot_resource(
+        return post_bot_resource(
             permissions_url, _create_req_body(calendar.calendarid))
     elif calendar.is_tac():
-        resp = post_tac_resource(
+        return post_tac_resource(
             permissions_url, _create_req_body(calendar.calendarid))
     else:
-        resp = post_sea_resource(
+        return post_sea_resource(
             permissions_url, _create_req_body(calendar.calendarid))
-    request_id = "{0} {1} CalendarID:{2}".format(calendar.campus,
-                                                 permissions_url,
-                                                 calendar.calendarid)
-    return load_json(request_id, resp)
+
+
+def _make_request_id(calendar):
+    return "{0} {1} CalendarID:{2}".format(calendar.campus,
+                                           permissions_url,
+                                           calendar.calendarid)
 
 
 def _is_valid_email(email):
@@ -99,9 +200,11 @@ def _extract_uwnetid(email):
     return re.sub("@uw.edu", "", email, flags=re.I).lower()
 
 
-def _check_err(data, request_id):
+def _check_err(data, request_id, campus=None):
     """
     :param data: response json data (must be not None).
+    :param campus: the campus code of the account, by default the one
+        starting the request_id
     Check possible error code returned in the response body
     raise the coresponding exceptions
     """
@@ -116,6 +219,9 @@ def _check_err(data, request_id):
         raise UnknownError(request_id, 200)
 
     code = int(msg[0]['Code'])
+    if campus is None:
+        campus = _get_campus(request_id)
+    registry.count_error_code(campus, get_endpoint(request_id), code)
     if code == 3006:
         raise CalendarNotExist(request_id, code)
     elif code == 3007:
@@ -126,13 +232,41 @@ def _check_err(data, request_id):
         raise UnexpectedError(request_id, code)
 
 
-def load_json(request_id, post_response):
-    if post_response.status != 200:
-        raise DataFailureException(request_id,
-                                   post_response.status,
-                                   post_response.reason)
-    if post_response.data is None:
-        raise NoDataReturned(request_id, 200)
-    data = json.loads(post_response.data)
-    _check_err(data, request_id)
-    return data
+def _get_campus(request_id):
+    """
+    :return: the campus code starting the request_id (see
+    _make_request_id), None if there isn't one
+    """
+    campus = str(request_id).split(" ", 1)[0]
+    if campus in dict(TrumbaCalendar.CAMPUS_CHOICES):
+        return campus
+    return None
+
+
+def is_unavailable(ex):
+    """
+    :return: True if the exception is a server side or connection failure
+    """
+    return (isinstance(ex, DataFailureException) and
+            is_server_error(ex.status))
+
+
+def load_json(request_id, post_response, campus=None):
+    """
+    :param campus: the campus code of the account, the label of the
+        error code metrics, by default the one starting the request_id
+    :return: the json data of the response
+    raise DataFailureException or a corresponding TrumbaException
+    if the request failed or an error code has been returned.
+    """
+    with span("load_json", request_id=request_id):
+        if post_response.status != 200:
+            raise DataFailureException(request_id,
+                                       post_response.status,
+                                       post_response.reason)
+        if post_response.data is None:
+            raise NoDataReturned(request_id, 200)
+        with span("json.loads"):
+            data = json.loads(post_response.data)
+        _check_err(data, request_id, campus)
+        return data
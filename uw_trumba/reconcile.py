@@ -0,0 +1,112 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Bring the calendar permissions in Trumba to a desired state,
+sending only the SetPermissions requests that change something.
+"""
+
+import logging
+from uw_trumba.account import set_permissions_bulk
+from uw_trumba.models import Permission
+
+
+logger = logging.getLogger(__name__)
+MANAGED_LEVELS = (Permission.EDIT, Permission.SHOWON, Permission.NONE)
+
+
+class ReconcileReport(object):
+
+    def __init__(self):
+        self.changes = []
+        # a list of (TrumbaCalendar, uwnetid, level) to set
+        self.unchanged = 0
+        # the number of desired permissions already in place
+        self.unknown_calendars = []
+        # the keys of desired not found in the Calendars
+        self.results = None
+        # the list of PermissionChangeResult if the changes are applied
+
+    def total_calls(self):
+        return len(self.changes)
+
+    def saved_calls(self):
+        """
+        :return: the number of requests avoided compared to setting
+            every desired permission
+        """
+        return self.unchanged
+
+    def total_failures(self):
+        if self.results is None:
+            return 0
+        return len([r for r in self.results if not r.is_success()])
+
+
+def reconcile(calendars, desired, dry_run=False, prune=False):
+    """
+    :param calendars: a loaded Calendars object
+    :param desired: a dict of {TrumbaCalendar or (campus, calendarid),
+        {uwnetid, level}} where level is EDIT, SHOWON or NONE
+    :param dry_run: if True, only compute the changes
+    :param prune: if True, the EDIT and SHOWON permissions of the
+        desired calendars not listed in desired are set to NONE.
+        The PUBLISH and REPUBLISH permissions are never pruned: they
+        are outside of the MANAGED_LEVELS and are granted in Trumba.
+    :return: a ReconcileReport
+    A desired level is in place if the user has that level or a higher
+    one (Permission.is_higher_permission). The successful changes
+    are applied to the calendars.
+    """
+    report = ReconcileReport()
+    for key, user_levels in desired.items():
+        trumba_cal = _get_calendar(calendars, key)
+        if trumba_cal is None:
+            report.unknown_calendars.append(key)
+            continue
+
+        for uwnetid, level in user_levels.items():
+            if level not in MANAGED_LEVELS:
+                raise ValueError("Invalid permission level: {0}".format(
+                    level))
+            if _is_in_place(trumba_cal.permissions.get(uwnetid), level):
+                report.unchanged += 1
+            else:
+                report.changes.append((trumba_cal, uwnetid, level))
+
+        if prune:
+            for uwnetid, perm in trumba_cal.permissions.items():
+                if (uwnetid not in user_levels and
+                        (perm.is_edit() or perm.is_showon())):
+                    report.changes.append(
+                        (trumba_cal, uwnetid, Permission.NONE))
+
+    if dry_run or len(report.changes) == 0:
+        return report
+
+    report.results = set_permissions_bulk(report.changes)
+    for result in report.results:
+        if result.is_success():
+            calendars.perm_loader.update_permission(
+                result.calendar, result.userid, result.level)
+        else:
+            logger.error("reconcile {0}".format(result.to_json()))
+    return report
+
+
+def _get_calendar(calendars, key):
+    if isinstance(key, tuple):
+        campus, calendarid = key
+    else:
+        campus, calendarid = key.campus, key.calendarid
+    return calendars.get_calendar(campus, calendarid)
+
+
+def _is_in_place(perm, level):
+    """
+    :param perm: the current Permission of the user or None
+    """
+    if level == Permission.NONE:
+        return perm is None or perm.level == Permission.NONE
+    return perm is not None and (
+        perm.level == level or perm.is_higher_permission(level))
@@ -0,0 +1,222 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Expansion of the recurring events (RRULE, RDATE, EXDATE) of a parsed
+calendar feed within a requested window.
+A rule is expanded in the wall-clock time of its DTSTART timezone, so
+the occurrences keep their local time across DST changes. The
+occurrences are memoized per (UID, window bucket) for the calendar
+object, and the timezones are the ones icalendar and zoneinfo keep
+for all the feeds.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from dateutil.rrule import rruleset, rrulestr
+from uw_trumba.events import (
+    get_calendar_timezone, get_event_index, get_event_interval,
+    _get_derived, _to_datetime)
+
+
+BUCKET_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Occurrence(object):
+    """
+    An occurrence of an icalendar.Event in [start, end)
+    """
+
+    def __init__(self, event, start, end):
+        self.event = event
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other):
+        return (isinstance(other, Occurrence) and
+                self.event is other.event and
+                self.start == other.start and self.end == other.end)
+
+    def __repr__(self):
+        return "Occurrence({0}, {1}, {2})".format(
+            self.event.get('UID'), self.start, self.end)
+
+
+def is_recurring(event):
+    return ('RECURRENCE-ID' not in event and
+            ('RRULE' in event or 'RDATE' in event))
+
+
+class RecurrenceExpander(object):
+    """
+    The occurrences of the events of a calendar. Up to max_memo
+    (UID, bucket) expansions of bucket_days each are kept, the least
+    recently used are dropped first.
+    """
+
+    def __init__(self, calendar, bucket_days=7, max_memo=4096):
+        self.tz = get_calendar_timezone(calendar)
+        self.index = get_event_index(calendar)
+        self.bucket = timedelta(days=bucket_days)
+        self.max_memo = max_memo
+        self.masters = []
+        overrides = {}
+        for event in calendar.walk('VEVENT'):
+            if is_recurring(event):
+                self.masters.append(event)
+            elif 'RECURRENCE-ID' in event and 'UID' in event:
+                overrides.setdefault(str(event.get('UID')), set()).add(
+                    _to_datetime(event.decoded('RECURRENCE-ID'), self.tz))
+        self.overrides = overrides
+        # {UID, set of the starts replaced by a RECURRENCE-ID event}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def occurrences(self, start, end):
+        """
+        :param start: a date or datetime
+        :param end: a date or datetime after start
+        :return: a list of the Occurrence objects of all the events
+        overlapping [start, end), ordered by start time.
+        """
+        start = _to_datetime(start, self.tz)
+        end = _to_datetime(end, self.tz)
+        found = [Occurrence(event, *get_event_interval(event, self.tz))
+                 for event in self.index.overlapping(start, end)
+                 if not is_recurring(event)]
+        for event in self.masters:
+            found.extend(self.expand(event, start, end))
+        found.sort(key=lambda occurrence: occurrence.start)
+        return found
+
+    def expand(self, event, start, end):
+        """
+        :return: a list of the Occurrence objects of the recurring event
+        overlapping [start, end), ordered by start time.
+        """
+        first_start, first_end = get_event_interval(event, self.tz)
+        duration = first_end - first_start
+        found = []
+        bucket = self._get_bucket(start - duration)
+        while BUCKET_EPOCH + bucket * self.bucket < end:
+            for occurrence in self._expand_bucket(event, duration, bucket):
+                if occurrence.start >= end:
+                    break
+                if (occurrence.end > start or
+                        occurrence.start >= start):
+                    found.append(occurrence)
+            bucket += 1
+        return found
+
+    def _get_bucket(self, instant):
+        return (instant - BUCKET_EPOCH) // self.bucket
+
+    def _expand_bucket(self, event, duration, bucket):
+        uid = event.get('UID')
+        # an event without UID is memoized by its identity, kept alive
+        # in self.masters
+        key = (str(uid) if uid is not None else id(event), bucket)
+        with self._lock:
+            occurrences = self._memo.get(key)
+            if occurrences is not None:
+                self._memo.move_to_end(key)
+                return occurrences
+
+        bucket_start = BUCKET_EPOCH + bucket * self.bucket
+        bucket_end = bucket_start + self.bucket
+        replaced = self.overrides.get(str(uid), ()) if uid is not None else ()
+        occurrences = []
+        for start in _iter_starts(event, self.tz, bucket_start, bucket_end):
+            if start not in replaced:
+                occurrences.append(Occurrence(event, start, start + duration))
+
+        with self._lock:
+            self._memo[key] = occurrences
+            while len(self._memo) > self.max_memo:
+                self._memo.popitem(last=False)
+        return occurrences
+
+
+def _iter_starts(event, default_tz, start, end):
+    """
+    :return: a generator of the aware starts of the occurrences in
+    [start, end), in time order
+    """
+    dtstart = event.decoded('DTSTART')
+    tz = (dtstart.tzinfo
+          if isinstance(dtstart, datetime) and dtstart.tzinfo is not None
+          else default_tz)
+    wall_start = _to_wall_time(dtstart, tz)
+
+    rules = rruleset()
+    rules.rdate(wall_start)
+    for rrule in _get_list(event, 'RRULE'):
+        until = rrule.get('UNTIL')
+        rrule = rrule.copy()
+        rrule.pop('UNTIL', None)
+        rule = rrulestr(rrule.to_ical().decode('UTF-8'), dtstart=wall_start)
+        if until:
+            rule = rule.replace(until=_to_wall_time(until[0], tz, True))
+        rules.rrule(rule)
+    for value in _get_dates(event, 'RDATE'):
+        rules.rdate(_to_wall_time(value, tz))
+    for value in _get_dates(event, 'EXDATE'):
+        rules.exdate(_to_wall_time(value, tz))
+
+    # one day of margin for the UTC offsets of the bucket bounds
+    margin = timedelta(days=1)
+    for wall_time in rules.between(
+            _to_wall_time(start, tz) - margin,
+            _to_wall_time(end, tz) + margin, inc=True):
+        occurrence_start = wall_time.replace(tzinfo=tz)
+        if start <= occurrence_start < end:
+            yield occurrence_start
+
+
+def _to_wall_time(value, tz, end_of_day=False):
+    """
+    :return: the naive datetime of value in the wall-clock time of tz
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(tz)
+        return value.replace(tzinfo=None)
+    if end_of_day:
+        return datetime(value.year, value.month, value.day, 23, 59, 59)
+    return datetime(value.year, value.month, value.day)
+
+
+def _get_list(event, name):
+    values = event.get(name)
+    if values is None:
+        return []
+    return values if isinstance(values, list) else [values]
+
+
+def _get_dates(event, name):
+    for values in _get_list(event, name):
+        for value in values.dts:
+            value = value.dt
+            if isinstance(value, tuple):
+                # a PERIOD
+                value = value[0]
+            if isinstance(value, date):
+                yield value
+
+
+def get_recurrence_expander(calendar):
+    """
+    :param calendar: an icalendar.Calendar object
+    :return: the RecurrenceExpander of the calendar, kept (with its
+    memoized expansions) as long as the calendar object is in use.
+    """
+    return _get_derived(calendar, 'recurrence', RecurrenceExpander)
+
+
+def get_occurrences(calendar, start, end):
+    """
+    :return: a list of the Occurrence objects of the events of the
+    calendar overlapping [start, end), ordered by start time.
+    """
+    return get_recurrence_expander(calendar).occurrences(start, end)
@@ -0,0 +1,94 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Retry with jittered backoff and circuit breaking of the requests
+sent to the Trumba services.
+"""
+
+import random
+import threading
+import time
+
+
+def is_server_error(status):
+    """
+    :return: True if the http status means that the request failed
+        on the server side or in the connection (status 0)
+    """
+    return status is None or status == 0 or status >= 500
+
+
+def backoff_delay(attempt, base, cap):
+    """
+    :return: a random delay in seconds before the retry number attempt
+        (0 for the first retry), between 0 and base * 2 ** attempt,
+        capped at cap (the "full jitter" backoff)
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker(object):
+    """
+    Fail fast after failure_threshold consecutive failures,
+    then let one trial request through every reset_timeout seconds
+    until one succeeds.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        with self.lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return True
+            if (self.state == CircuitBreaker.OPEN and
+                    time.monotonic() - self.opened_at >= self.reset_timeout):
+                self.state = CircuitBreaker.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if (self.state == CircuitBreaker.HALF_OPEN or
+                    self.failures >= self.failure_threshold):
+                self.state = CircuitBreaker.OPEN
+                self.opened_at = time.monotonic()
+
+    def is_open(self):
+        return self.state != CircuitBreaker.CLOSED
+
+
+_breakers = {}
+# a dict of {service, ((failure_threshold, reset_timeout), CircuitBreaker)}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(service, failure_threshold, reset_timeout):
+    """
+    :return: the CircuitBreaker shared by the DAOs of the service,
+        None if failure_threshold is not set.
+    """
+    if not failure_threshold:
+        return None
+    with _breakers_lock:
+        entry = _breakers.get(service)
+        if entry is None or entry[0] != (failure_threshold, reset_timeout):
+            entry = ((failure_threshold, reset_timeout),
+                     CircuitBreaker(failure_threshold, reset_timeout))
+            _breakers[service] = entry
+        return entry[1]
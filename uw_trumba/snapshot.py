@@ -0,0 +1,126 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Save a loaded Calendars object, including the calendar permissions
+and the accounts, in a compact versioned file, and rebuild it from
+the file without sending any request to Trumba.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from uw_trumba.calendars import CAMPUS_CODES, Calendars
+from uw_trumba.models import Permission, TrumbaCalendar
+
+
+logger = logging.getLogger(__name__)
+SNAPSHOT_VERSION = 2
+
+
+def save_snapshot(calendars, path):
+    """
+    :param calendars: a loaded Calendars object
+    :param path: the file to (over)write
+    """
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'created': time.time(),
+        # the calendars of a campus in tree order, parents before
+        # children, even after calendars have been moved
+        'calendars': {
+            campus: [_calendar_to_list(trumba_cal)
+                     for trumba_cal in calendars._get_tree(campus).preorder]
+            for campus in CAMPUS_CODES},
+        'accounts': sorted(calendars.perm_loader.account_set),
+    }
+    tmp_path = "{0}.{1}.tmp".format(path, os.getpid())
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, max_age=None):
+    """
+    :param path: a file written by save_snapshot
+    :param max_age: the maximum age in seconds of a usable snapshot
+    :return: a Calendars object, or None if the file doesn't exist,
+    is older than max_age, has a different version or is corrupt.
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as ex:
+        logger.error("load_snapshot {0} ==> {1}".format(path, ex))
+        return None
+
+    if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION:
+        logger.info("Snapshot {0} version {1} ignored".format(
+            path, data.get('version') if isinstance(data, dict) else None))
+        return None
+
+    try:
+        if (max_age is not None and
+                time.time() - data['created'] > max_age):
+            return None
+        return _load_calendars(data)
+    except (KeyError, TypeError, ValueError) as ex:
+        logger.error("load_snapshot {0} corrupt ==> {1!r}".format(path, ex))
+        return None
+
+
+def _load_calendars(data):
+    calendars = Calendars(load=False)
+    for campus in CAMPUS_CODES:
+        calendars.campus_calendars[campus] = {}
+        for record in data['calendars'][campus]:
+            trumba_cal = _list_to_calendar(campus, record)
+            calendars.perm_loader.index_cal_permissions(trumba_cal)
+            calendar_dict = calendars.campus_calendars[campus]
+            parentid = record[3]
+            if parentid is not None:
+                trumba_cal.parent = calendar_dict[parentid]
+                trumba_cal.parent.children.append(trumba_cal)
+            calendar_dict[trumba_cal.calendarid] = trumba_cal
+    calendars.sea_calendar_ids = set(
+        calendars.campus_calendars[TrumbaCalendar.SEA_CAMPUS_CODE].keys())
+    calendars.perm_loader.account_set = set(data['accounts'])
+    return calendars
+
+
+def get_calendars(path, max_age=3600, concurrent=False):
+    """
+    :return: the Calendars object of the snapshot at path if it is
+    not older than max_age seconds, otherwise load a new one from
+    Trumba and save it at path.
+    """
+    calendars = load_snapshot(path, max_age=max_age)
+    if calendars is None:
+        calendars = Calendars(concurrent=concurrent)
+        save_snapshot(calendars, path)
+    return calendars
+
+
+def _calendar_to_list(trumba_cal):
+    return [trumba_cal.calendarid,
+            trumba_cal.name,
+            [[perm.uwnetid, perm.display_name, perm.level]
+             for perm in trumba_cal.permissions.values()],
+            (trumba_cal.parent.calendarid
+             if trumba_cal.parent is not None else None)]
+
+
+def _list_to_calendar(campus, record):
+    calendarid, name, permissions = record[:3]
+    trumba_cal = TrumbaCalendar(calendarid=calendarid,
+                                campus=campus,
+                                name=name)
+    for uwnetid, display_name, level in permissions:
+        trumba_cal.add_permission(Permission(uwnetid=uwnetid,
+                                             display_name=display_name,
+                                             level=level))
+    return trumba_cal
@@ -9,7 +9,7 @@ from uw_trumba.account import (
     _make_set_permissions_url, set_bot_permissions, set_sea_permissions,
     set_tac_permissions, set_perm_editor, set_perm_showon, set_perm_none,
     _is_editor_added, _is_editor_deleted, _is_permission_set,
-    _check_err)
+    _check_err, set_permissions, set_permissions_bulk)
 from uw_trumba.models import TrumbaCalendar
 from uw_trumba.exceptions import (
     AccountNameEmpty, AccountNotExist, UnexpectedError,
@@ -176,3 +176,37 @@ class TrumbaTestAccounts(TestCase):
         self.assertTrue(set_perm_editor(cal, 'test10'))
         self.assertTrue(set_perm_showon(cal, 'test10'))
         self.assertTrue(set_perm_none(cal, 'test10'))
+
+    def test_set_permissions(self):
+        cal = TrumbaCalendar(calendarid=3, campus='tac')
+        self.assertTrue(set_permissions(cal, 'test10', 'SHOWON'))
+        self.assertRaises(NoAllowedPermission,
+                          set_permissions, cal, 'test10', 'PUBLISH')
+
+    def test_set_permissions_bulk(self):
+        sea_cal = TrumbaCalendar(calendarid=1, campus='sea')
+        bot_cal = TrumbaCalendar(calendarid=2, campus='bot')
+        tac_cal = TrumbaCalendar(calendarid=3, campus='tac')
+        changes = [(sea_cal, 'test10', 'EDIT'),
+                   (bot_cal, 'test10', 'SHOWON'),
+                   (tac_cal, 'test10', 'NONE'),
+                   (sea_cal, '', 'EDIT'),
+                   (bot_cal, 'test10', 'PUBLISH'),
+                   (TrumbaCalendar(calendarid=5, campus='sea'),
+                    'test10', 'EDIT')]
+        results = set_permissions_bulk(iter(changes))
+        self.assertEqual(len(results), 6)
+        self.assertEqual([r.is_success() for r in results],
+                         [True, True, True, False, False, False])
+        self.assertIsInstance(results[3].error, AccountNotExist)
+        self.assertEqual(results[3].get_error_code(), 3008)
+        self.assertIsInstance(results[4].error, NoAllowedPermission)
+        self.assertIsInstance(results[5].error, DataFailureException)
+        self.assertEqual(results[5].get_error_code(), 404)
+        self.assertIsNone(results[0].get_error_code())
+        self.assertEqual(results[4].to_json(),
+                         {'campus': 'bot', 'calendarid': 2,
+                          'userid': 'test10', 'level': 'PUBLISH',
+                          'success': False,
+                          'error': 'NoAllowedPermission', 'code': 3015})
+        self.assertEqual(set_permissions_bulk([]), [])
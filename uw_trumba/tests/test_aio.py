@@ -0,0 +1,123 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from unittest import TestCase
+from commonconf import override_settings
+from restclients_core.dao import MockDAO
+from restclients_core.exceptions import DataFailureException
+from uw_trumba import aio
+from uw_trumba.calendars import Calendars
+from uw_trumba.models import TrumbaCalendar
+from uw_trumba.permissions import Permissions
+from uw_trumba.throttle import is_background
+from uw_trumba.exceptions import (
+    AccountNameEmpty, AccountNotExist, NoAllowedPermission)
+
+
+PRIORITY = 'uw_trumba.tests.test_aio.PriorityBackend'
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class PriorityBackend(MockDAO):
+    """
+    Records whether each request is sent in background_priority
+    """
+    priorities = []
+
+    def load(self, method, url, headers, body):
+        PriorityBackend.priorities.append(is_background())
+        return super().load(method, url, headers, body)
+
+
+class TestAio(TestCase):
+
+    def test_get_calendar_by_name(self):
+        calendar = run(aio.get_calendar_by_name('sea_acad-comm'))
+        self.assertEqual(len(calendar.walk('vevent')), 4)
+        self.assertRaises(DataFailureException,
+                          run, aio.get_calendar_by_name('sea_none'))
+        shared = run(aio.get_shared_calendar_by_name('sea_acad-comm'))
+        self.assertIsNot(shared, calendar)
+        self.assertEqual(shared.to_ical(), calendar.to_ical())
+
+    def test_get_calendars_by_names(self):
+        calendars = run(aio.get_calendars_by_names(
+            ['sea_err', 'sea_acad-comm', 'sea_err']))
+        self.assertEqual(list(calendars), ['sea_err', 'sea_acad-comm'])
+        self.assertEqual(len(calendars['sea_acad-comm'].walk('vevent')), 4)
+        calendars = run(aio.get_calendars_by_names(['sea_err'], shared=True))
+        self.assertEqual(len(calendars['sea_err'].walk('vevent')), 1)
+
+    def test_get_cal_permissions(self):
+        p_m = Permissions()
+        cal = TrumbaCalendar(calendarid=1, campus='sea')
+        run(aio.get_cal_permissions(p_m, cal))
+        self.assertEqual(p_m.total_accounts(), 3)
+        self.assertEqual(len(cal.permissions), 3)
+
+        cal = TrumbaCalendar(calendarid=10000, campus='sea')
+        run(aio.get_cal_permissions(p_m, cal))
+        self.assertEqual(len(cal.permissions), 0)
+
+    def test_get_calendars(self):
+        serial_cals = Calendars()
+        cals = run(aio.get_calendars())
+        for campus in ['sea', 'bot', 'tac']:
+            self.assertEqual(
+                [c.to_json() for c in cals.get_campus_calendars(campus)],
+                [c.to_json()
+                 for c in serial_cals.get_campus_calendars(campus)])
+        self.assertEqual(cals.perm_loader.account_set,
+                         serial_cals.perm_loader.account_set)
+
+    def test_accounts(self):
+        self.assertTrue(run(aio.add_editor('008', 'test8')))
+        self.assertRaises(AccountNameEmpty, run, aio.add_editor('', ''))
+        self.assertTrue(run(aio.delete_editor('test10')))
+        self.assertRaises(AccountNotExist, run, aio.delete_editor('test'))
+
+    def test_set_permissions(self):
+        self.assertTrue(run(aio.set_sea_permissions(1, 'test10', 'EDIT')))
+        self.assertTrue(run(aio.set_bot_permissions(2, 'test10', 'EDIT')))
+        self.assertTrue(run(aio.set_tac_permissions(3, 'test10', 'EDIT')))
+        self.assertRaises(NoAllowedPermission,
+                          run, aio.set_sea_permissions(1, 'test10',
+                                                       'PUBLISH'))
+        for cal in [TrumbaCalendar(calendarid=1, campus='sea'),
+                    TrumbaCalendar(calendarid=2, campus='bot'),
+                    TrumbaCalendar(calendarid=3, campus='tac')]:
+            self.assertTrue(run(aio.set_perm_editor(cal, 'test10')))
+            self.assertTrue(run(aio.set_perm_showon(cal, 'test10')))
+            self.assertTrue(run(aio.set_perm_none(cal, 'test10')))
+
+    def test_gather(self):
+        async def load():
+            p_m = Permissions()
+            cals = [TrumbaCalendar(calendarid=1, campus='sea')
+                    for i in range(20)]
+            await asyncio.gather(*[aio.get_cal_permissions(p_m, cal)
+                                   for cal in cals])
+            return p_m, cals
+        p_m, cals = run(load())
+        self.assertEqual(p_m.total_accounts(), 3)
+        for cal in cals:
+            self.assertEqual(len(cal.permissions), 3)
+
+    @override_settings(RESTCLIENTS_DAO_CLASS=PRIORITY)
+    def test_background_priority(self):
+        PriorityBackend.priorities = []
+        calendars = run(aio.get_calendars())
+        self.assertEqual(calendars.total_calendars('sea'), 10)
+        self.assertGreater(len(PriorityBackend.priorities), 10)
+        self.assertTrue(all(PriorityBackend.priorities))
+
+        PriorityBackend.priorities = []
+        run(aio.get_cal_permissions(Permissions(),
+                                    TrumbaCalendar(calendarid=1,
+                                                   campus='sea')))
+        self.assertGreater(len(PriorityBackend.priorities), 0)
+        self.assertFalse(any(PriorityBackend.priorities))
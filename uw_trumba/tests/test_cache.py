@@ -0,0 +1,156 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+from unittest import TestCase
+from commonconf import override_settings
+from restclients_core.exceptions import DataFailureException
+from uw_trumba import (
+    calendar_cache, get_calendar_by_name, get_shared_calendar_by_name,
+    invalidate_calendar)
+from uw_trumba.cache import CalendarCache
+from uw_trumba.dao import TrumbaCalendar_DAO
+
+
+class Loader(object):
+
+    def __init__(self, size=10):
+        self.size = size
+        self.calls = []
+
+    def __call__(self, name):
+        self.calls.append(name)
+        if name == "none":
+            raise DataFailureException(name, 404, "Not Found")
+        return object(), self.size
+
+
+@override_settings(RESTCLIENTS_CALENDAR_CACHE_TTL=60,
+                   RESTCLIENTS_CALENDAR_CACHE_MAX_BYTES=25)
+class TestCalendarCache(TestCase):
+
+    def setUp(self):
+        self.cache = CalendarCache(TrumbaCalendar_DAO())
+        self.load = Loader()
+
+    def test_lru(self):
+        cal_a = self.cache.get("a", self.load)
+        self.assertIs(self.cache.get("a", self.load), cal_a)
+        self.cache.get("b", self.load)
+        self.cache.get("a", self.load)
+        self.cache.get("c", self.load)
+        # b was the least recently used
+        self.assertEqual(list(self.cache.entries), ["a", "c"])
+        self.assertEqual(self.cache.get_stats(),
+                         {'hits': 2, 'misses': 3, 'evictions': 1,
+                          'calendars': 2, 'bytes': 20})
+
+        self.cache.invalidate("a")
+        self.assertIsNot(self.cache.get("a", self.load), cal_a)
+        self.assertEqual(self.load.calls, ["a", "b", "c", "a"])
+
+        self.cache.get("big", Loader(size=26))
+        self.assertNotIn("big", self.cache.entries)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.get_stats()['bytes'], 0)
+
+    def test_ttl(self):
+        with override_settings(RESTCLIENTS_CALENDAR_CACHE_TTL=0):
+            self.cache.get("a", self.load)
+            self.cache.get("a", self.load)
+        self.assertEqual(self.load.calls, ["a", "a"])
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def test_shared(self):
+        # cached
+        calendar, shared = self.cache.get_item("b", self.load)
+        self.assertTrue(shared)
+        self.assertEqual(self.cache.get_item("b", self.load),
+                         (calendar, True))
+        calendar, shared = self.cache.get_item("big", Loader(size=26))
+        self.assertFalse(shared)
+
+        with override_settings(RESTCLIENTS_CALENDAR_CACHE_TTL=0):
+            calendar, shared = self.cache.get_item("a", self.load)
+            self.assertFalse(shared)
+            calendar, shared = self.cache.get_item(
+                "a", lambda name: (object(), 10, True))
+            self.assertTrue(shared)
+
+    def test_expired(self):
+        self.cache.get("a", self.load)
+        entry = self.cache.entries["a"]
+        self.cache.entries["a"] = (entry[0], entry[1], 0)
+        self.cache.get("a", self.load)
+        self.assertEqual(self.load.calls, ["a", "a"])
+
+    def test_single_flight(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_load(name):
+            started.set()
+            release.wait(5)
+            return self.load(name)
+
+        results = []
+
+        def get():
+            results.append(self.cache.get("a", slow_load))
+
+        threads = [threading.Thread(target=get) for i in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.load.calls, ["a"])
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_errors(self):
+        self.assertRaises(DataFailureException,
+                          self.cache.get, "none", self.load)
+        self.assertRaises(DataFailureException,
+                          self.cache.get, "none", self.load)
+        self.assertEqual(self.load.calls, ["none", "none"])
+        self.assertEqual(len(self.cache.entries), 0)
+
+
+class TestGetCalendarByName(TestCase):
+
+    def test_cached(self):
+        calendar_cache.clear()
+        with override_settings(RESTCLIENTS_CALENDAR_CACHE_TTL=60):
+            calendar = get_shared_calendar_by_name('sea_acad-comm')
+            self.assertIs(get_shared_calendar_by_name('sea_acad-comm'),
+                          calendar)
+            self.assertEqual(calendar_cache.get_stats()['bytes'], 2591)
+
+            invalidate_calendar('sea_acad-comm')
+            self.assertIsNot(get_shared_calendar_by_name('sea_acad-comm'),
+                             calendar)
+        self.assertIsNot(get_shared_calendar_by_name('sea_acad-comm'),
+                         calendar)
+        calendar_cache.clear()
+
+    def test_copy(self):
+        calendar_cache.clear()
+        with override_settings(RESTCLIENTS_CALENDAR_CACHE_TTL=60):
+            shared = get_shared_calendar_by_name('sea_acad-comm')
+            calendar = get_calendar_by_name('sea_acad-comm')
+            self.assertIsNot(calendar, shared)
+            self.assertEqual(calendar.to_ical(), shared.to_ical())
+
+            calendar.walk('vevent')[0]['SUMMARY'] = "Changed"
+            self.assertNotEqual(
+                str(get_calendar_by_name(
+                    'sea_acad-comm').walk('vevent')[0]['SUMMARY']),
+                "Changed")
+            self.assertIs(get_shared_calendar_by_name('sea_acad-comm'),
+                          shared)
+            self.assertEqual(calendar_cache.get_stats()['misses'], 1)
+        calendar_cache.clear()
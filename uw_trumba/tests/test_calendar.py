@@ -1,9 +1,12 @@
 # Copyright 2025 UW-IT, University of Washington
 # SPDX-License-Identifier: Apache-2.0
 
+from io import BytesIO
 from unittest import TestCase
 from restclients_core.exceptions import DataFailureException
-from uw_trumba import get_calendar_by_name
+from uw_trumba import (
+    get_calendar_by_name, get_calendars_by_names, iter_calendar_events)
+from uw_trumba.ical import iter_events
 
 
 class TestCalendarParse(TestCase):
@@ -18,9 +21,76 @@ class TestCalendarParse(TestCase):
                           get_calendar_by_name,
                           'sea_none')
 
+    def test_get_calendars_by_names(self):
+        calendars = get_calendars_by_names(
+            ['sea_err', 'sea_acad-comm', 'sea_err'])
+        self.assertEqual(list(calendars), ['sea_err', 'sea_acad-comm'])
+        self.assertEqual(len(calendars['sea_acad-comm'].walk('vevent')), 4)
+        self.assertEqual(get_calendars_by_names([]), {})
+
+        shared = get_calendars_by_names(['sea_acad-comm'], shared=True)
+        self.assertIsNot(shared['sea_acad-comm'], calendars['sea_acad-comm'])
+        self.assertEqual(shared['sea_acad-comm'].to_ical(),
+                         calendars['sea_acad-comm'].to_ical())
+
+        self.assertRaises(DataFailureException,
+                          get_calendars_by_names,
+                          ['sea_acad-comm', 'sea_none'])
+
     def test_ical_parsing_err(self):
         calendar = get_calendar_by_name('sea_err')
         self.assertEqual(len(calendar.walk('vevent')), 1)
         # can't reprod the issue
         # https://github.com/collective/icalendar/commit/
         # 4f5f70bd5b863e0997ff93e2f9cf9187413730a3
+
+
+class TestCalendarEvents(TestCase):
+
+    def test_iter_calendar_events(self):
+        events = list(iter_calendar_events('sea_acad-comm'))
+        self.assertEqual(
+            [e.to_ical() for e in events],
+            [e.to_ical() for e in
+             get_calendar_by_name('sea_acad-comm').walk('vevent')])
+        self.assertEqual(str(events[0]['UID']),
+                         "http://uid.trumba.com/event/108207677")
+        self.assertEqual(
+            events[0]['X-TRUMBA-CUSTOMFIELD'][0],
+            "Important Dates/Deadlines")
+
+        events = list(iter_calendar_events('sea_err'))
+        self.assertEqual(str(events[0]['SUMMARY']),
+                         "\u00e5\u00e4\u00f6\u00c5\u00c4\u00d6")
+
+        self.assertRaises(DataFailureException,
+                          iter_calendar_events,
+                          'sea_none')
+
+    def test_iter_events(self):
+        data = (
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VTIMEZONE\r\nTZID:Pacific Time\r\n"
+            "BEGIN:STANDARD\r\nDTSTART:19701101T020000\r\n"
+            "TZOFFSETFROM:-0700\r\nTZOFFSETTO:-0800\r\n"
+            "END:STANDARD\r\nEND:VTIMEZONE\r\n"
+            "BEGIN:VEVENT\r\nUID:1\r\nSUMMARY:Caf\u00e9\r\n"
+            "DTSTART;TZID=Pacific Time:20200101T100000\r\n"
+            "BEGIN:VALARM\r\nACTION:DISPLAY\r\nEND:VALARM\r\n"
+            "END:VEVENT\r\n"
+            "BEGIN:VEVENT\r\nUID:2\r\n"
+            "END:VEVENT\r\nEND:VCALENDAR\r\n").encode('UTF-8')
+        # fold a line within its two-byte character
+        data = data.replace(b'Caf\xc3', b'Caf\xc3\r\n ')
+
+        events = iter_events(BytesIO(data))
+        event = next(events)
+        self.assertEqual(str(event['SUMMARY']), "Caf\u00e9")
+        self.assertEqual(
+            event.decoded('DTSTART').utcoffset().total_seconds(), -8 * 3600)
+        self.assertEqual(len(event.walk('valarm')), 1)
+        self.assertEqual(str(next(events)['UID']), "2")
+        self.assertRaises(StopIteration, next, events)
+
+        self.assertRaises(ValueError, list,
+                          iter_events(b"BEGIN:VEVENT\r\nUID:1\r\n"))
@@ -2,8 +2,11 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from unittest import TestCase
+from commonconf import override_settings
+from uw_trumba.models import TrumbaCalendar, new_edit_permission
 from uw_trumba.calendars import (
-    Calendars, _is_valid_calendarid, _get_campus_calenders)
+    Calendars, _is_valid_calendarid, _get_campus_calenders,
+    _get_all_campus_calendars)
 
 
 class TestCalendars(TestCase):
@@ -14,6 +17,27 @@ class TestCalendars(TestCase):
         self.assertIsNotNone(_get_campus_calenders('tac'))
         self.assertIsNone(_get_campus_calenders('sss'))
 
+    def test_get_all_campus_calendars(self):
+        data = _get_all_campus_calendars()
+        self.assertEqual(sorted(data.keys()), ['bot', 'sea', 'tac'])
+        self.assertEqual(data['bot'], _get_campus_calenders('bot'))
+
+    def test_extract_all_cals(self):
+        cals = Calendars(load=False)
+        self.assertEqual(cals.campus_calendars, {})
+        cals._extract_all_cals({
+            'tac': {'d': {'Calendars': [
+                {'ID': 1, 'Name': 'Shared', 'ChildCalendars': [
+                    {'ID': 31, 'Name': 'Shared child'}]},
+                {'ID': 3, 'Name': 'Tacoma', 'ChildCalendars': None}]}},
+            'sea': {'d': {'Calendars': [
+                {'ID': 1, 'Name': 'Seattle', 'ChildCalendars': None}]}},
+            'bot': {'d': {'Calendars': None}}})
+        self.assertEqual(cals.sea_calendar_ids, {1})
+        self.assertEqual(list(cals.campus_calendars['tac'].keys()), [3])
+        self.assertEqual(cals.campus_calendars['bot'], {})
+        self.assertEqual(len(cals._get_all_calendars()), 2)
+
     def test_load(self):
         cals = Calendars()
 
@@ -70,6 +94,188 @@ class TestCalendars(TestCase):
         self.assertFalse(cals.exists('bot'))
         self.assertEqual(cals.total_calendars('bot'), 0)
 
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_MAX_WORKERS=3,
+                       RESTCLIENTS_TRUMBA_BOT_MAX_WORKERS=1)
+    def test_concurrent_load(self):
+        serial_cals = Calendars()
+        cals = Calendars(concurrent=True)
+        self.assertTrue(cals.concurrent)
+        for campus in ['sea', 'bot', 'tac']:
+            self.assertEqual(
+                list(cals.campus_calendars[campus].keys()),
+                list(serial_cals.campus_calendars[campus].keys()))
+            for calendarid, trumba_cal in (
+                    cals.campus_calendars[campus].items()):
+                self.assertEqual(
+                    trumba_cal.to_json(),
+                    serial_cals.get_calendar(campus, calendarid).to_json())
+        self.assertEqual(cals.perm_loader.account_set,
+                         serial_cals.perm_loader.account_set)
+
+    def test_user_calendars(self):
+        cals = Calendars(concurrent=True)
+        user_perms = cals.get_user_permissions('dummye')
+        self.assertEqual(
+            sorted((c.campus, c.calendarid) for c, p in user_perms),
+            [('bot', 2), ('sea', 1), ('tac', 3)])
+        for trumba_cal, perm in user_perms:
+            self.assertTrue(perm.is_edit())
+            self.assertIs(trumba_cal.permissions['dummye'], perm)
+        self.assertEqual(len(cals.get_editable_calendars('dummyp')), 3)
+        self.assertEqual(len(cals.get_editable_calendars('dummys')), 0)
+        self.assertEqual(len(cals.get_showon_calendars('dummys')), 3)
+        self.assertEqual(len(cals.get_showon_calendars('dummye')), 3)
+        self.assertEqual(cals.get_user_permissions('none'), [])
+
+        cals.campus_calendars['bot'][9999] = TrumbaCalendar(
+            calendarid=9999, campus='bot', name="removed")
+        cals.get_calendar('bot', 9999).add_permission(
+            cals.get_calendar('bot', 2).permissions['dummye'])
+        cals.perm_loader.index_cal_permissions(cals.get_calendar('bot', 9999))
+        self.assertEqual(len(cals.get_editable_calendars('dummye')), 4)
+        cals.refresh(rotation_size=0)
+        self.assertEqual(len(cals.get_editable_calendars('dummye')), 3)
+
+    def test_sorted_calendars(self):
+        cals = Calendars()
+        sorted_cals = cals.get_campus_calendars('bot')
+        self.assertEqual([c.calendarid for c in sorted_cals], [2, 211, 212])
+        sorted_cals.pop()
+        self.assertEqual(len(cals.get_campus_calendars('bot')), 3)
+        self.assertIs(cals.get_campus_calendars('bot')[0], sorted_cals[0])
+
+        cals.campus_calendars['bot'][1] = TrumbaCalendar(
+            calendarid=1, campus='bot', name="A")
+        self.assertEqual([c.calendarid
+                          for c in cals.get_campus_calendars('bot')],
+                         [1, 2, 211, 212])
+        self.assertEqual(cals.total_calendars('bot'), 4)
+
+        cals.get_calendar('bot', 1).name = "Z"
+        cals.calendars_changed()
+        self.assertEqual([c.calendarid
+                          for c in cals.get_campus_calendars('bot')],
+                         [2, 211, 212, 1])
+        # replaced with the same number of calendars
+        cals.campus_calendars['bot'][1] = TrumbaCalendar(
+            calendarid=1, campus='bot', name="B")
+        cals.calendars_changed()
+        self.assertEqual([c.calendarid
+                          for c in cals.get_campus_calendars('bot')],
+                         [1, 2, 211, 212])
+        cals.refresh(rotation_size=0)
+        self.assertEqual([c.calendarid
+                          for c in cals.get_campus_calendars('bot')],
+                         [2, 211, 212])
+
+    def test_calendar_tree(self):
+        cals = Calendars()
+        self.assertEqual(
+            [c.calendarid for c in cals.get_root_calendars('sea')], [1])
+        self.assertEqual(
+            [c.calendarid for c in cals.get_root_calendars('bot')], [2])
+        trumba_cal = cals.get_calendar('sea', 113)
+        self.assertEqual(trumba_cal.parent.calendarid, 1)
+        self.assertEqual([c.calendarid for c in trumba_cal.children],
+                         [1131, 1132])
+
+        self.assertEqual(
+            [c.calendarid for c in cals.iter_subtree('sea', 113)],
+            [113, 1131, 1132, 11322, 11321])
+        self.assertEqual(len(list(cals.iter_subtree('sea', 1))), 10)
+        self.assertEqual(list(cals.iter_subtree('sea', 21)), [])
+
+        self.assertEqual(cals.get_depth('sea', 1), 0)
+        self.assertEqual(cals.get_depth('sea', 11321), 3)
+        self.assertIsNone(cals.get_depth('sss', 1))
+
+        self.assertEqual(
+            [c.calendarid for c in cals.get_ancestors('sea', 11321)],
+            [1132, 113, 1])
+        self.assertEqual(cals.get_ancestors('sea', 1), [])
+
+        self.assertTrue(cals.is_descendant('sea', 11321, 113))
+        self.assertTrue(cals.is_descendant('sea', 113, 113))
+        self.assertFalse(cals.is_descendant('sea', 112, 113))
+        self.assertFalse(cals.is_descendant('sea', 113, 11321))
+        self.assertFalse(cals.is_descendant('sea', 21, 1))
+
+        rollup = cals.get_subtree_permissions('sea', 1)
+        self.assertEqual(sorted(rollup.keys()),
+                         ['dummye', 'dummyp', 'dummys'])
+        self.assertEqual(cals.get_subtree_permissions('sea', 113), {})
+        cals.get_calendar('sea', 1131).add_permission(
+            new_edit_permission('dummys'))
+        rollup = cals.get_subtree_permissions('sea', 1)
+        self.assertTrue(rollup['dummys'].is_edit())
+        self.assertTrue(rollup['dummyp'].is_publish())
+
+    def test_moved_calendar(self):
+        cals = Calendars()
+        self.assertFalse(cals.is_descendant('sea', 1131, 112))
+        self.assertEqual(cals.get_subtree_permissions('sea', 112), {})
+        # move 1131 (and its permission) under 112
+        moved = cals.get_calendar('sea', 1131)
+        moved.add_permission(new_edit_permission('dummys'))
+        moved.parent.children.remove(moved)
+        moved.parent = cals.get_calendar('sea', 112)
+        moved.parent.children.append(moved)
+        cals.calendars_changed()
+        self.assertTrue(cals.is_descendant('sea', 1131, 112))
+        self.assertFalse(cals.is_descendant('sea', 1131, 113))
+        self.assertEqual(cals.get_depth('sea', 1131), 2)
+        self.assertEqual(list(cals.get_subtree_permissions('sea', 112)),
+                         ['dummys'])
+        self.assertEqual(cals.get_subtree_permissions('sea', 113), {})
+
+        cals.refresh(rotation_size=0)
+        self.assertIs(cals.get_calendar('sea', 113).parent,
+                      cals.get_calendar('sea', 1))
+        self.assertEqual(len(list(cals.iter_subtree('sea', 1))), 10)
+
+    def test_refresh(self):
+        cals = Calendars()
+        del cals.campus_calendars['sea'][1]
+        cals.get_calendar('sea', 111).name = "old name"
+        cals.campus_calendars['bot'][9999] = TrumbaCalendar(
+            calendarid=9999, campus='bot', name="removed")
+        cals.perm_loader.add_account('nobody')
+
+        changes = cals.refresh(rotation_size=0)
+        self.assertEqual([c.calendarid for c in changes['added']], [1])
+        self.assertEqual([c.calendarid for c in changes['removed']], [9999])
+        self.assertEqual([c.calendarid for c in changes['renamed']], [111])
+        self.assertEqual(changes['refreshed'], [])
+        self.assertEqual(cals.get_calendar('sea', 111).name,
+                         "Seattle calendar >> Seattle child calendar1")
+        self.assertIsNone(cals.get_calendar('bot', 9999))
+        self.assertEqual(len(cals.get_calendar('sea', 1).permissions), 3)
+        self.assertFalse(cals.perm_loader.account_exists('nobody'))
+
+        fresh_cals = Calendars()
+        for campus in ['sea', 'bot', 'tac']:
+            self.assertEqual(
+                [c.to_json() for c in cals.get_campus_calendars(campus)],
+                [c.to_json() for c in fresh_cals.get_campus_calendars(campus)])
+        self.assertEqual(cals.perm_loader.account_set,
+                         fresh_cals.perm_loader.account_set)
+
+    def test_refresh_rotation(self):
+        cals = Calendars()
+        cals.get_calendar('sea', 1).permissions = {}
+        changes = cals.refresh(rotation_size=10)
+        self.assertEqual(changes['added'], [])
+        self.assertEqual([c.calendarid for c in changes['refreshed']],
+                         [1, 111, 1111, 1112, 112, 113, 1131, 1132,
+                          11322, 11321])
+        self.assertEqual(len(cals.get_calendar('sea', 1).permissions), 3)
+
+        changes = cals.refresh(rotation_size=10)
+        self.assertEqual([c.calendarid for c in changes['refreshed']],
+                         [2, 211, 212, 3, 1, 111, 1111, 1112, 112, 113])
+        changes = cals.refresh(rotation_size=100)
+        self.assertEqual(len(changes['refreshed']), 14)
+
     def test_is_valid_calendarid(self):
         self.assertTrue(_is_valid_calendarid(1))
         self.assertFalse(_is_valid_calendarid(0))
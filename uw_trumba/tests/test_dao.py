@@ -3,9 +3,10 @@
 
 from unittest import TestCase
 from commonconf import override_settings
+from restclients_core.dao import LiveDAO
 from restclients_core.models import MockHTTP
 from uw_trumba.dao import (
-    TrumbaSea_DAO, TrumbaBot_DAO, TrumbaTac_DAO)
+    TrumbaSea_DAO, TrumbaBot_DAO, TrumbaTac_DAO, TrumbaLiveDAO, to_bool)
 from uw_trumba.tests import (
     fdao_trumba_sea_override, fdao_trumba_bot_override,
     fdao_trumba_tac_override)
@@ -37,6 +38,59 @@ class TestTrumbaDao(TestCase):
         self.assertEqual(TrumbaSea_DAO()._custom_headers('GET', '/', {}, None),
                          {'Authorization': 'Basic c3M6cHBw'})
 
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_MAX_WORKERS="8",
+                       RESTCLIENTS_TRUMBA_TAC_MAX_WORKERS=2)
+    def test_get_max_workers(self):
+        self.assertEqual(TrumbaSea_DAO().get_max_workers(), 8)
+        self.assertEqual(TrumbaBot_DAO().get_max_workers(), 4)
+        self.assertEqual(TrumbaTac_DAO().get_max_workers(), 2)
+
+    def test_auth_header_cache(self):
+        with override_settings(RESTCLIENTS_TRUMBA_SEA_ID="ss",
+                               RESTCLIENTS_TRUMBA_SEA_PSWD="ppp"):
+            dao = TrumbaSea_DAO()
+            header = dao._get_auth_header()
+            self.assertEqual(header, 'Basic c3M6cHBw')
+            self.assertIs(TrumbaSea_DAO()._get_auth_header(), header)
+        with override_settings(RESTCLIENTS_TRUMBA_SEA_ID="tt",
+                               RESTCLIENTS_TRUMBA_SEA_PSWD="ppp"):
+            self.assertEqual(dao._get_auth_header(), 'Basic dHQ6cHBw')
+
+    def test_to_bool(self):
+        for value in (True, 1, "1", "True", "true", " yes ", "on"):
+            self.assertTrue(to_bool(value))
+        for value in (False, 0, None, "", "0", "False", "no", "off"):
+            self.assertFalse(to_bool(value))
+
+    @override_settings(RESTCLIENTS_TRUMBA_BOT_KEEP_ALIVE=False,
+                       RESTCLIENTS_TRUMBA_TAC_KEEP_ALIVE="False")
+    def test_keep_alive(self):
+        self.assertNotIn("Connection",
+                         TrumbaSea_DAO()._custom_headers('GET', '/', {}, None))
+        self.assertEqual(
+            TrumbaBot_DAO()._custom_headers('GET', '/', {}, None)[
+                "Connection"], "close")
+        self.assertEqual(
+            TrumbaTac_DAO()._custom_headers('GET', '/', {}, None)[
+                "Connection"], "close")
+
+    @override_settings(RESTCLIENTS_TRUMBA_TAC_DAO_CLASS="Live",
+                       RESTCLIENTS_TRUMBA_TAC_HOST="http://localhost",
+                       RESTCLIENTS_TRUMBA_TAC_POOL_SIZE=3,
+                       RESTCLIENTS_TRUMBA_TAC_POOL_BLOCK="False")
+    def test_live_pool(self):
+        LiveDAO.pools.pop('trumba_tac', None)
+        dao = TrumbaTac_DAO()
+        self.assertIsNone(dao.get_pool_stats())
+        live = dao.get_implementation()
+        self.assertIsInstance(live, TrumbaLiveDAO)
+        pool = live.get_pool()
+        self.assertFalse(pool.block)
+        self.assertEqual(dao.get_pool_stats(),
+                         {'requests': 0, 'hits': 0, 'misses': 0,
+                          'idle': 3, 'maxsize': 3})
+        LiveDAO.pools.pop('trumba_tac', None)
+
     def test_service_mock_paths(self):
         self.assertEqual(len(TrumbaSea_DAO().service_mock_paths()), 1)
 
@@ -0,0 +1,114 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from unittest import TestCase
+from icalendar import Calendar, Event
+from uw_trumba import get_calendar_by_name
+from uw_trumba.events import (
+    EventIndex, get_event_index, get_event_interval, merge_timeline)
+
+UTC = timezone.utc
+
+
+def make_event(uid, start, end=None):
+    event = Event()
+    event.add('UID', str(uid))
+    event.add('DTSTART', start)
+    if end is not None:
+        event.add('DTEND', end)
+    return event
+
+
+class TestEventIndex(TestCase):
+
+    def test_calendar_index(self):
+        calendar = get_calendar_by_name('sea_acad-comm')
+        index = get_event_index(calendar)
+        self.assertIs(get_event_index(calendar), index)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(str(index.tz), "America/Los_Angeles")
+
+        events = index.overlapping(date(2016, 1, 1), date(2017, 12, 31))
+        self.assertEqual([str(e['UID']) for e in events],
+                         ["http://uid.trumba.com/event/108848406",
+                          "http://uid.trumba.com/event/108218057"])
+        self.assertEqual(
+            len(index.at(datetime(2015, 6, 13, 23, 59))), 1)
+        self.assertEqual(len(index.at(date(2015, 6, 14))), 0)
+        self.assertEqual(
+            len(index.starting_between(date(2015, 6, 13),
+                                       date(2018, 6, 9))), 3)
+
+    def test_event_interval(self):
+        start = datetime(2020, 1, 1, 10, tzinfo=UTC)
+        self.assertEqual(get_event_interval(make_event(1, start)),
+                         (start, start))
+        event = make_event(1, start)
+        event.add('DURATION', timedelta(hours=2))
+        self.assertEqual(get_event_interval(event),
+                         (start, start + timedelta(hours=2)))
+        self.assertEqual(
+            get_event_interval(make_event(1, date(2020, 1, 1))),
+            (datetime(2020, 1, 1, tzinfo=UTC),
+             datetime(2020, 1, 2, tzinfo=UTC)))
+        self.assertEqual(get_event_interval(Event()), (None, None))
+
+    def test_overlapping(self):
+        rand = random.Random(17)
+        base = datetime(2020, 1, 1, tzinfo=UTC)
+        events = []
+        for uid in range(500):
+            start = base + timedelta(hours=rand.randint(0, 2000))
+            end = start + timedelta(hours=rand.choice([0, 1, 5, 48, 500]))
+            events.append(make_event(uid, start, end))
+        index = EventIndex(events)
+        intervals = [get_event_interval(event) + (int(event['UID']),)
+                     for event in events]
+
+        for i in range(200):
+            start = base + timedelta(hours=rand.randint(-10, 2100))
+            end = start + timedelta(hours=rand.choice([1, 3, 24, 200]))
+            expected = sorted(
+                (ev_start, uid) for ev_start, ev_end, uid in intervals
+                if ev_start < end and (ev_end > start or ev_start >= start))
+            self.assertEqual(
+                [int(e['UID']) for e in index.overlapping(start, end)],
+                [uid for ev_start, uid in expected])
+
+        self.assertEqual(EventIndex([]).overlapping(base, base), [])
+
+
+class TestMergeTimeline(TestCase):
+
+    def _make_calendar(self, *events):
+        calendar = Calendar()
+        for event in events:
+            calendar.add_component(event)
+        return calendar
+
+    def test_merge_timeline(self):
+        day = datetime(2020, 1, 1, tzinfo=UTC)
+        shared = make_event("shared", day + timedelta(days=2))
+        cal_a = self._make_calendar(
+            make_event("a3", day + timedelta(days=3)),
+            make_event("a1", day + timedelta(days=1)),
+            shared)
+        cal_b = self._make_calendar(
+            make_event("b0", day),
+            make_event("b2", day + timedelta(days=2)),
+            make_event("shared", day + timedelta(days=2)),
+            make_event("b4", day + timedelta(days=4)))
+
+        timeline = merge_timeline([cal_a, cal_b])
+        self.assertEqual(str(next(timeline)['UID']), "b0")
+        self.assertEqual([str(e['UID']) for e in timeline],
+                         ["a1", "shared", "b2", "a3", "b4"])
+
+        self.assertEqual(
+            [str(e['UID']) for e in merge_timeline(
+                [cal_b, cal_a], day + timedelta(days=2),
+                day + timedelta(days=4))],
+            ["b2", "shared", "a3"])
+        self.assertEqual(list(merge_timeline([])), [])
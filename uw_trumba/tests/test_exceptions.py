@@ -15,6 +15,7 @@ class TrumbaTestExceptions(TestCase):
     def test_exceptions(self):
         ex = CalendarNotExist("test_url", 3006)
         self.assertEqual(str(ex), "test_url ==> 3006: CalendarNotExist")
+        self.assertEqual(ex.code, 3006)
 
         ex = CalendarOwnByDiffAccount("test_url", 3007)
         self.assertEqual(str(ex),
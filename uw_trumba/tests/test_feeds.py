@@ -0,0 +1,174 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import gc
+import weakref
+from unittest import TestCase
+from commonconf import override_settings
+from restclients_core.dao import MockDAO
+from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from uw_trumba import (
+    calendar_cache, feed_cache, get_calendar_by_name,
+    get_shared_calendar_by_name, load_ical, _load_calendar,
+    _make_calendar_url)
+from uw_trumba.dao import TrumbaCalendar_DAO
+from uw_trumba.feeds import FeedCache
+
+CONDITIONAL = 'uw_trumba.tests.test_feeds.ConditionalBackend'
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+class ConditionalBackend(MockDAO):
+    """
+    Serves the mock resources with validators, answering 304 to
+    a matching If-None-Match
+    """
+    requests = []
+
+    def load(self, method, url, headers, body):
+        ConditionalBackend.requests.append(dict(headers))
+        if headers.get("If-None-Match") == ETAG:
+            response = MockHTTP()
+            response.status = 304
+            response.headers = {}
+            return response
+        response = super().load(method, url, headers, body)
+        if response.status == 200:
+            response.headers = {"ETag": ETAG,
+                                "Last-Modified": LAST_MODIFIED}
+        return response
+
+
+@override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=CONDITIONAL)
+class TestFeedCache(TestCase):
+
+    def setUp(self):
+        ConditionalBackend.requests = []
+        self.cache = FeedCache(TrumbaCalendar_DAO())
+        self.url = _make_calendar_url('sea_acad-comm')
+
+    def test_not_modified(self):
+        calendar = self.cache.get(self.url, load_ical)
+        self.assertEqual(len(calendar.walk('vevent')), 4)
+        self.assertNotIn("If-None-Match", ConditionalBackend.requests[0])
+
+        self.assertIs(self.cache.get(self.url, load_ical), calendar)
+        self.assertEqual(ConditionalBackend.requests[1]["If-None-Match"],
+                         ETAG)
+        self.assertEqual(
+            ConditionalBackend.requests[1]["If-Modified-Since"],
+            LAST_MODIFIED)
+        self.assertEqual(self.cache.get_stats(),
+                         {'hits': 0, 'not_modified': 1, 'misses': 1,
+                          'evictions': 0, 'feeds': 1, 'bytes': 2591})
+
+        self.cache.invalidate(self.url)
+        self.assertIsNot(self.cache.get(self.url, load_ical), calendar)
+        self.assertEqual(self.cache.get_stats()['misses'], 2)
+
+    def test_max_age(self):
+        with override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=CONDITIONAL,
+                               RESTCLIENTS_CALENDAR_FEED_MAX_AGE=60):
+            calendar = self.cache.get(self.url, load_ical)
+            self.assertIs(self.cache.get(self.url, load_ical), calendar)
+        self.assertEqual(len(ConditionalBackend.requests), 1)
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.get_stats(),
+                         {'hits': 0, 'not_modified': 0, 'misses': 0,
+                          'evictions': 0, 'feeds': 0, 'bytes': 0})
+
+    def test_max_bytes(self):
+        other_url = _make_calendar_url('sea_err')
+        with override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=CONDITIONAL,
+                               RESTCLIENTS_CALENDAR_FEED_MAX_BYTES=2600):
+            calendar = weakref.ref(self.cache.get(self.url, load_ical))
+            self.cache.get(other_url, load_ical)
+            # the least recently used feed is dropped
+            self.assertEqual(list(self.cache.entries), [other_url])
+            self.assertEqual(self.cache.get_stats()['evictions'], 1)
+            gc.collect()
+            self.assertIsNone(calendar())
+
+        with override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=CONDITIONAL,
+                               RESTCLIENTS_CALENDAR_FEED_MAX_BYTES=100):
+            self.cache.get(self.url, load_ical)
+            self.assertNotIn(self.url, self.cache.entries)
+
+    def test_get_item(self):
+        calendar, shared = self.cache.get_item(self.url, load_ical)
+        # kept in the cache
+        self.assertTrue(shared)
+        self.assertEqual(self.cache.get_item(self.url, load_ical),
+                         (calendar, True))
+        calendar, size, shared = _load_calendar('sea_acad-comm')
+        self.assertEqual(size, 2591)
+        self.assertTrue(shared)
+        feed_cache.clear()
+
+    def test_errors(self):
+        self.assertRaises(DataFailureException, self.cache.get,
+                          _make_calendar_url('sea_none'), load_ical)
+        self.assertEqual(self.cache.get_stats()['feeds'], 0)
+
+    @override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=CONDITIONAL,
+                       RESTCLIENTS_CALENDAR_CACHE_TTL=60)
+    def test_get_calendar_by_name(self):
+        calendar_cache.clear()
+        feed_cache.clear()
+        calendar = get_shared_calendar_by_name('sea_acad-comm')
+        entry = calendar_cache.entries['sea_acad-comm']
+        calendar_cache.entries['sea_acad-comm'] = (entry[0], entry[1], 0)
+        # revalidated on expiry
+        self.assertIs(get_shared_calendar_by_name('sea_acad-comm'),
+                      calendar)
+        self.assertEqual(feed_cache.get_stats()['not_modified'], 1)
+        calendar_cache.clear()
+        self.assertEqual(feed_cache.get_stats()['feeds'], 0)
+        feed_cache.clear()
+
+    @override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=CONDITIONAL,
+                       RESTCLIENTS_CALENDAR_CACHE_TTL=60,
+                       RESTCLIENTS_CALENDAR_CACHE_MAX_BYTES=2600)
+    def test_evicted_released(self):
+        calendar_cache.clear()
+        feed_cache.clear()
+        calendar = weakref.ref(
+            get_shared_calendar_by_name('sea_acad-comm'))
+        self.assertEqual(feed_cache.get_stats()['feeds'], 1)
+
+        calendar_cache.get('other', lambda name: (object(), 10))
+        self.assertEqual(calendar_cache.get_stats()['evictions'], 1)
+        self.assertEqual(feed_cache.get_stats()['feeds'], 0)
+        gc.collect()
+        self.assertIsNone(calendar())
+        calendar_cache.clear()
+
+    def test_not_cached_calendar(self):
+        # CACHE_TTL is 0, the feed is still revalidated
+        calendar_cache.clear()
+        feed_cache.clear()
+        for i in range(3):
+            get_shared_calendar_by_name('sea_acad-comm')
+        self.assertEqual(feed_cache.get_stats()['misses'], 1)
+        self.assertEqual(feed_cache.get_stats()['not_modified'], 2)
+        self.assertEqual(ConditionalBackend.requests[-1]["If-None-Match"],
+                         ETAG)
+        feed_cache.clear()
+
+
+class TestFeedCacheNoValidators(TestCase):
+
+    def test_not_cached(self):
+        cache = FeedCache(TrumbaCalendar_DAO())
+        url = _make_calendar_url('sea_acad-comm')
+        self.assertIsNot(cache.get(url, load_ical),
+                         cache.get(url, load_ical))
+        self.assertEqual(cache.get_stats(),
+                         {'hits': 0, 'not_modified': 0, 'misses': 2,
+                          'evictions': 0, 'feeds': 0, 'bytes': 0})
+        self.assertFalse(cache.get_item(url, load_ical)[1])
+        self.assertFalse(_load_calendar('sea_acad-comm')[2])
@@ -0,0 +1,68 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+from unittest import TestCase
+from commonconf import override_settings
+from uw_trumba import TrumbaSea, get_sea_resource
+from uw_trumba.account import _make_add_account_url
+from uw_trumba.log import LazyMessage, is_sampled, log_debug, truncate
+
+logger = logging.getLogger("uw_trumba.tests.test_log")
+
+
+class TestLog(TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def _message(self, max_length, text):
+        self.calls.append(max_length)
+        return {'resp': truncate(text, max_length)}
+
+    def test_truncate(self):
+        self.assertIsNone(truncate(None, 10))
+        self.assertEqual(truncate("abc", 10), "abc")
+        self.assertEqual(truncate("abcdef", 0), "abcdef")
+        self.assertEqual(truncate("abcdef", 4), "abcd...(2 more)")
+        self.assertEqual(truncate(b"abcdef", 4), "abcd...(2 more)")
+        self.assertEqual(truncate("åä".encode('UTF-8'), 3),
+                         "å�...(1 more)")
+
+    def test_is_sampled(self):
+        self.assertTrue(is_sampled(1))
+        self.assertFalse(is_sampled(0))
+
+    def test_lazy_message(self):
+        message = LazyMessage(self._message, 2, "abc")
+        self.assertEqual(self.calls, [])
+        self.assertEqual(str(message), "{'resp': 'ab...(1 more)'}")
+        self.assertEqual(message.get_message(), {'resp': 'ab...(1 more)'})
+        self.assertEqual(str(message), "{'resp': 'ab...(1 more)'}")
+        # built once for all the handlers
+        self.assertEqual(self.calls, [2])
+
+    def test_log_debug(self):
+        logger.setLevel(logging.INFO)
+        log_debug(logger, TrumbaSea, self._message, "abc")
+        self.assertEqual(self.calls, [])
+
+        logger.setLevel(logging.DEBUG)
+        with self.assertLogs(logger, logging.DEBUG) as cm:
+            log_debug(logger, TrumbaSea, self._message, "abc")
+        self.assertEqual(self.calls, [1024])
+        self.assertEqual(cm.output,
+                         ["DEBUG:uw_trumba.tests.test_log:{'resp': 'abc'}"])
+        self.assertEqual(cm.records[0].msg.get_message(), {'resp': 'abc'})
+
+        with override_settings(RESTCLIENTS_LOG_SAMPLE_RATE=0):
+            log_debug(logger, TrumbaSea, self._message, "abc")
+        self.assertEqual(self.calls, [1024])
+
+    def test_response_logs(self):
+        url = _make_add_account_url('010', 'test10')
+        uw_logger = logging.getLogger("uw_trumba")
+        with self.assertLogs(uw_logger, logging.DEBUG) as cm:
+            with override_settings(RESTCLIENTS_LOG_BODY_MAX=10):
+                get_sea_resource(url)
+        self.assertIn("'resp': \"{'Code': '...(", cm.output[0])
@@ -0,0 +1,146 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from commonconf import override_settings
+from uw_trumba import get_calendar_by_name, calendar_cache, feed_cache
+from uw_trumba.account import (
+    set_bot_permissions, set_sea_permissions, set_tac_permissions)
+from uw_trumba.exceptions import (
+    CalendarNotExist, CalendarOwnByDiffAccount, NoAllowedPermission)
+from uw_trumba.metrics import (
+    Histogram, MetricsExporter, MetricsRegistry, PrometheusTextExporter,
+    export_metrics, get_endpoint, registry)
+from uw_trumba.models import TrumbaCalendar
+from uw_trumba.permissions import (
+    Permissions, _check_err, _get_campus, _get_permissions)
+from uw_trumba.util.backend import SyntheticBackend
+from uw_trumba.util.synthetic import SyntheticOrg
+
+
+class TestMetrics(TestCase):
+
+    def test_get_endpoint(self):
+        self.assertEqual(
+            get_endpoint("/service/calendars.asmx/GetPermissions"),
+            "GetPermissions")
+        self.assertEqual(
+            get_endpoint("sea /service/calendars.asmx/GetCalendarList"),
+            "GetCalendarList")
+        self.assertEqual(
+            get_endpoint("/service/accounts.asmx/CloseEditor?Email=a"),
+            "CloseEditor")
+        self.assertEqual(get_endpoint("/calendars/sea_acad-comm.ics"), "ics")
+        self.assertEqual(get_endpoint("/"), "other")
+
+    def test_histogram(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        self.assertEqual(histogram.get_cumulative_counts(),
+                         [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+
+    def test_prometheus_text(self):
+        metrics = MetricsRegistry(buckets=(0.5,))
+        metrics.observe_request("sea", "GetPermissions", 200, 0.25, 100)
+        metrics.observe_request("sea", "GetPermissions", 503, 1.0, 0)
+        metrics.count_error_code("sea", "GetPermissions", 3006)
+        text = PrometheusTextExporter("t").export(metrics)
+        self.assertEqual(text, "\n".join([
+            "# HELP t_request_duration_seconds Trumba request duration",
+            "# TYPE t_request_duration_seconds histogram",
+            't_request_duration_seconds_bucket{campus="sea",'
+            'endpoint="GetPermissions",le="0.5"} 1',
+            't_request_duration_seconds_bucket{campus="sea",'
+            'endpoint="GetPermissions",le="+Inf"} 2',
+            't_request_duration_seconds_sum{campus="sea",'
+            'endpoint="GetPermissions"} 1.25',
+            't_request_duration_seconds_count{campus="sea",'
+            'endpoint="GetPermissions"} 2',
+            "# HELP t_responses_total Trumba responses by http status",
+            "# TYPE t_responses_total counter",
+            't_responses_total{campus="sea",endpoint="GetPermissions",'
+            'status="200"} 1',
+            't_responses_total{campus="sea",endpoint="GetPermissions",'
+            'status="503"} 1',
+            "# HELP t_response_bytes_total Trumba response bytes received",
+            "# TYPE t_response_bytes_total counter",
+            't_response_bytes_total{campus="sea",'
+            'endpoint="GetPermissions"} 100',
+            "# HELP t_error_codes_total Trumba error codes returned",
+            "# TYPE t_error_codes_total counter",
+            't_error_codes_total{campus="sea",endpoint="GetPermissions",'
+            'code="3006"} 1', ""]))
+
+        self.assertRaises(NotImplementedError,
+                          MetricsExporter().export, metrics)
+
+    def test_recorded_requests(self):
+        registry.reset()
+        calendar_cache.clear()
+        feed_cache.clear()
+        get_calendar_by_name('sea_acad-comm')
+        self.assertRaises(NoAllowedPermission,
+                          set_sea_permissions, 1, 'test10', 'PUBLISH')
+        Permissions().get_cal_permissions(
+            TrumbaCalendar(calendarid=1, campus='bot'))
+
+        metrics = {(campus, endpoint): endpoint_metrics
+                   for campus, endpoint, endpoint_metrics
+                   in registry.collect()}
+        self.assertEqual(sorted(metrics),
+                         [("all", "ics"), ("bot", "GetPermissions"),
+                          ("sea", "SetPermissions")])
+        self.assertEqual(metrics[("all", "ics")].statuses, {200: 1})
+        self.assertEqual(metrics[("all", "ics")].bytes_received, 2591)
+        self.assertEqual(metrics[("sea", "SetPermissions")].error_codes,
+                         {3015: 1})
+        self.assertEqual(metrics[("bot", "GetPermissions")].latency.count, 1)
+        self.assertIn('endpoint="SetPermissions",code="3015"} 1',
+                      export_metrics())
+        registry.reset()
+
+    @override_settings(
+        RESTCLIENTS_DAO_CLASS='uw_trumba.util.backend.SyntheticBackend')
+    def test_error_code_campus(self):
+        registry.reset()
+        SyntheticBackend.configure(SyntheticOrg(calendars=20,
+                                                permissions=50))
+        sea_calendarid = SyntheticBackend.org.campus_ids['sea'][0]
+        self.assertRaises(CalendarOwnByDiffAccount, set_tac_permissions,
+                          sea_calendarid, 'test10', 'EDIT')
+        self.assertRaises(CalendarOwnByDiffAccount, set_bot_permissions,
+                          sea_calendarid, 'test10', 'EDIT')
+        self.assertRaises(
+            CalendarOwnByDiffAccount, _get_permissions,
+            TrumbaCalendar(calendarid=sea_calendarid, campus='tac'))
+
+        metrics = {(campus, endpoint): endpoint_metrics
+                   for campus, endpoint, endpoint_metrics
+                   in registry.collect()}
+        self.assertEqual(metrics[("tac", "SetPermissions")].error_codes,
+                         {3007: 1})
+        self.assertEqual(metrics[("bot", "SetPermissions")].error_codes,
+                         {3007: 1})
+        self.assertEqual(metrics[("tac", "GetPermissions")].error_codes,
+                         {3007: 1})
+        self.assertNotIn(("sea", "SetPermissions"), metrics)
+        registry.reset()
+
+    def test_request_id_campus(self):
+        registry.reset()
+        self.assertEqual(_get_campus("bot /service/calendars.asmx/"
+                                     "GetPermissions CalendarID:1"), "bot")
+        self.assertIsNone(_get_campus("/service/calendars.asmx/"
+                                      "GetPermissions"))
+        self.assertRaises(CalendarNotExist, _check_err,
+                          {"d": {"Messages": [{"Code": 3006}]}},
+                          "tac /service/calendars.asmx/GetPermissions "
+                          "CalendarID:1")
+        self.assertEqual(
+            [(campus, endpoint, metrics.error_codes)
+             for campus, endpoint, metrics in registry.collect()],
+            [("tac", "GetPermissions", {3006: 1})])
+        registry.reset()
@@ -34,6 +34,8 @@ class TestModels(TestCase):
                                          'name': 'CampusEvents',
                                          'campus': 'sea',
                                          'permissions': {}})
+        self.assertIsNone(cal.parent)
+        self.assertEqual(cal.children, [])
         self.assertIsNotNone(str(cal))
         self.assertEqual(cal.get_group_admin(), "u_eventcal_support")
         self.assertIsNotNone(cal.get_group_desc('editor'))
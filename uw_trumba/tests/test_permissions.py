@@ -38,6 +38,31 @@ class TestPermissions(TestCase):
         self.assertTrue(p_m.account_exists('dummys'))
         self.assertEqual(len(cal.permissions), 3)
         self.assertEqual(cal.permissions['dummyp'].uwnetid, 'dummyp')
+        self.assertEqual(
+            p_m.get_account_permissions('dummye'),
+            {('sea', 1): cal.permissions['dummye']})
+        self.assertEqual(p_m.get_account_permissions('none'), {})
+
+    def test_reload_cal_permissions(self):
+        p_m = Permissions()
+        cal = TrumbaCalendar(calendarid=1, campus='sea')
+        p_m.get_cal_permissions(cal)
+        cal.permissions['dummyx'] = cal.permissions['dummye']
+        p_m.index_cal_permissions(cal)
+        self.assertEqual(len(p_m.get_account_permissions('dummyx')), 1)
+
+        p_m.reload_cal_permissions(cal)
+        self.assertEqual(len(cal.permissions), 3)
+        self.assertEqual(p_m.get_account_permissions('dummyx'), {})
+        self.assertEqual(len(p_m.get_account_permissions('dummye')), 1)
+
+        # unchanged if the request failed
+        cal.calendarid = 10000
+        p_m.reload_cal_permissions(cal)
+        self.assertEqual(len(cal.permissions), 3)
+
+        p_m.remove_cal_permissions(cal)
+        self.assertEqual(cal.permissions, {})
 
     def test_check_err(self):
         self.assertRaises(UnexpectedError,
@@ -0,0 +1,94 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_trumba.calendars import Calendars
+from uw_trumba.models import Permission, new_edit_permission
+from uw_trumba.reconcile import reconcile, _is_in_place
+
+
+class TestReconcile(TestCase):
+
+    def setUp(self):
+        self.cals = Calendars()
+        self.sea_cal = self.cals.get_calendar('sea', 1)
+        self.desired = {
+            self.sea_cal: {'dummyp': 'EDIT',
+                           'dummye': 'EDIT',
+                           'dummys': 'SHOWON',
+                           'test10': 'EDIT'},
+            ('bot', 2): {'dummye': 'SHOWON',
+                         'test10': 'SHOWON'},
+            ('sea', 9999): {'test10': 'EDIT'}}
+
+    def test_is_in_place(self):
+        self.assertTrue(_is_in_place(None, 'NONE'))
+        self.assertFalse(_is_in_place(None, 'EDIT'))
+        self.assertFalse(_is_in_place(new_edit_permission('a'), 'NONE'))
+        self.assertTrue(_is_in_place(new_edit_permission('a'), 'EDIT'))
+        self.assertTrue(_is_in_place(new_edit_permission('a'), 'SHOWON'))
+        self.assertTrue(_is_in_place(
+            Permission(uwnetid='a', level='PUBLISH'), 'EDIT'))
+        self.assertFalse(_is_in_place(
+            Permission(uwnetid='a', level='SHOWON'), 'EDIT'))
+
+    def test_dry_run(self):
+        report = reconcile(self.cals, self.desired, dry_run=True)
+        self.assertEqual(
+            [(c.calendarid, u, lv) for c, u, lv in report.changes],
+            [(1, 'test10', 'EDIT'), (2, 'test10', 'SHOWON')])
+        self.assertEqual(report.total_calls(), 2)
+        self.assertEqual(report.saved_calls(), 4)
+        self.assertEqual(report.unknown_calendars, [('sea', 9999)])
+        self.assertIsNone(report.results)
+        self.assertEqual(report.total_failures(), 0)
+        self.assertNotIn('test10', self.sea_cal.permissions)
+
+        self.assertRaises(ValueError, reconcile, self.cals,
+                          {self.sea_cal: {'test10': 'PUBLISH'}})
+
+    def test_apply(self):
+        report = reconcile(self.cals, self.desired)
+        self.assertEqual(len(report.results), 2)
+        self.assertEqual(report.total_failures(), 0)
+        self.assertTrue(self.sea_cal.permissions['test10'].is_edit())
+        self.assertTrue(
+            self.cals.get_calendar('bot', 2).permissions[
+                'test10'].is_showon())
+        self.assertEqual(len(self.cals.get_editable_calendars('test10')), 1)
+        self.assertEqual(len(self.cals.get_showon_calendars('test10')), 2)
+        self.assertTrue(self.cals.perm_loader.account_exists('test10'))
+
+        # already in place
+        report = reconcile(self.cals, self.desired)
+        self.assertEqual(report.total_calls(), 0)
+        self.assertEqual(report.saved_calls(), 6)
+
+        report = reconcile(self.cals, {('sea', 1): {'test10': 'NONE'}})
+        self.assertEqual(report.total_failures(), 0)
+        self.assertNotIn('test10', self.sea_cal.permissions)
+        self.assertEqual(len(self.cals.get_editable_calendars('test10')), 0)
+
+    def test_prune(self):
+        tac_cal = self.cals.get_calendar('tac', 3)
+        # the PUBLISH permission of dummyp is never pruned
+        report = reconcile(self.cals, {('tac', 3): {}}, prune=True,
+                           dry_run=True)
+        self.assertEqual(
+            [(c.calendarid, u, lv) for c, u, lv in report.changes],
+            [(3, 'dummye', 'NONE'), (3, 'dummys', 'NONE')])
+
+        report = reconcile(self.cals, {('tac', 3): {'dummyp': 'EDIT'}},
+                           prune=True)
+        self.assertEqual(
+            [(c.calendarid, u, lv) for c, u, lv in report.changes],
+            [(3, 'dummye', 'NONE'), (3, 'dummys', 'NONE')])
+        self.assertEqual(len(report.results), 2)
+        self.assertEqual(report.total_failures(), 0)
+        self.assertEqual(list(tac_cal.permissions.keys()), ['dummyp'])
+        self.assertTrue(tac_cal.permissions['dummyp'].is_publish())
+
+        # pruned already
+        report = reconcile(self.cals, {('tac', 3): {'dummyp': 'EDIT'}},
+                           prune=True)
+        self.assertEqual(report.total_calls(), 0)
@@ -0,0 +1,125 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from datetime import date, datetime, timedelta
+from unittest import TestCase
+from zoneinfo import ZoneInfo
+from icalendar import Calendar
+from uw_trumba.recurrence import (
+    get_occurrences, get_recurrence_expander, is_recurring)
+
+PACIFIC = ZoneInfo("America/Los_Angeles")
+FEED = "\r\n".join([
+    "BEGIN:VCALENDAR",
+    "X-WR-TIMEZONE:America/Los_Angeles",
+    "BEGIN:VEVENT",
+    "UID:weekly",
+    "DTSTART;TZID=America/Los_Angeles:20200301T100000",
+    "DTEND;TZID=America/Los_Angeles:20200301T110000",
+    "RRULE:FREQ=WEEKLY;UNTIL=20200401T000000Z;BYDAY=SU,TU",
+    "EXDATE;TZID=America/Los_Angeles:20200308T100000,20200310T100000",
+    "RDATE;TZID=America/Los_Angeles:20200501T100000",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "UID:weekly",
+    "RECURRENCE-ID;TZID=America/Los_Angeles:20200315T100000",
+    "DTSTART;TZID=America/Los_Angeles:20200315T150000",
+    "DTEND;TZID=America/Los_Angeles:20200315T160000",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "UID:daily",
+    "DTSTART;VALUE=DATE:20200302",
+    "RRULE:FREQ=DAILY;COUNT=5",
+    "EXDATE;VALUE=DATE:20200304",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "UID:single",
+    "DTSTART:20200303T190000Z",
+    "DTEND:20200303T200000Z",
+    "END:VEVENT",
+    "END:VCALENDAR", ""])
+
+
+class TestRecurrence(TestCase):
+
+    def setUp(self):
+        self.calendar = Calendar.from_ical(FEED)
+
+    def _get(self, start, end):
+        return [(str(o.event['UID']), o.start)
+                for o in get_occurrences(self.calendar, start, end)]
+
+    def test_expansion(self):
+        self.assertEqual(
+            self._get(date(2020, 3, 1), date(2020, 3, 18)),
+            [("weekly", datetime(2020, 3, 1, 10, tzinfo=PACIFIC)),
+             ("daily", datetime(2020, 3, 2, tzinfo=PACIFIC)),
+             ("daily", datetime(2020, 3, 3, tzinfo=PACIFIC)),
+             ("weekly", datetime(2020, 3, 3, 10, tzinfo=PACIFIC)),
+             ("single", datetime(2020, 3, 3, 11, tzinfo=PACIFIC)),
+             ("daily", datetime(2020, 3, 5, tzinfo=PACIFIC)),
+             ("daily", datetime(2020, 3, 6, tzinfo=PACIFIC)),
+             # the overridden occurrence
+             ("weekly", datetime(2020, 3, 15, 15, tzinfo=PACIFIC)),
+             ("weekly", datetime(2020, 3, 17, 10, tzinfo=PACIFIC))])
+
+        occurrences = get_occurrences(
+            self.calendar, date(2020, 3, 29), date(2020, 6, 1))
+        self.assertEqual([o.start for o in occurrences],
+                         [datetime(2020, 3, 29, 10, tzinfo=PACIFIC),
+                          datetime(2020, 3, 31, 10, tzinfo=PACIFIC),
+                          datetime(2020, 5, 1, 10, tzinfo=PACIFIC)])
+        # the local time is kept after the DST change
+        self.assertEqual(occurrences[0].start.utcoffset(),
+                         timedelta(hours=-7))
+        self.assertEqual(occurrences[0].end - occurrences[0].start,
+                         timedelta(hours=1))
+
+    def test_window_bounds(self):
+        # an occurrence in progress at the start of the window
+        self.assertEqual(
+            self._get(datetime(2020, 3, 1, 10, 30, tzinfo=PACIFIC),
+                      datetime(2020, 3, 1, 12, tzinfo=PACIFIC)),
+            [("weekly", datetime(2020, 3, 1, 10, tzinfo=PACIFIC))])
+        self.assertEqual(
+            self._get(datetime(2020, 3, 1, 11, tzinfo=PACIFIC),
+                      datetime(2020, 3, 2, tzinfo=PACIFIC)), [])
+
+    def test_memo(self):
+        expander = get_recurrence_expander(self.calendar)
+        self.assertIs(get_recurrence_expander(self.calendar), expander)
+        self.assertEqual(len(expander.masters), 2)
+        self.assertTrue(is_recurring(expander.masters[0]))
+
+        first = get_occurrences(self.calendar,
+                                date(2020, 3, 1), date(2020, 3, 8))
+        memo_size = len(expander._memo)
+        self.assertGreater(memo_size, 0)
+        self.assertEqual(get_occurrences(self.calendar,
+                                         date(2020, 3, 1), date(2020, 3, 8)),
+                         first)
+        self.assertEqual(len(expander._memo), memo_size)
+
+        expander.max_memo = 2
+        get_occurrences(self.calendar, date(2020, 1, 1), date(2020, 6, 1))
+        self.assertEqual(len(expander._memo), 2)
+
+    def test_no_uid(self):
+        calendar = Calendar.from_ical("\r\n".join([
+            "BEGIN:VCALENDAR",
+            "X-WR-TIMEZONE:America/Los_Angeles",
+            "BEGIN:VEVENT",
+            "SUMMARY:first",
+            "DTSTART;VALUE=DATE:20200302",
+            "RRULE:FREQ=DAILY;COUNT=2",
+            "END:VEVENT",
+            "BEGIN:VEVENT",
+            "SUMMARY:second",
+            "DTSTART;VALUE=DATE:20200304",
+            "RRULE:FREQ=DAILY;COUNT=2",
+            "END:VEVENT",
+            "END:VCALENDAR", ""]))
+        self.assertEqual(
+            [(str(o.event['SUMMARY']), o.start.day) for o in
+             get_occurrences(calendar, date(2020, 3, 1), date(2020, 3, 8))],
+            [("first", 2), ("first", 3), ("second", 4), ("second", 5)])
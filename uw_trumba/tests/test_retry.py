@@ -0,0 +1,196 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import ssl
+import time
+from unittest import TestCase
+from commonconf import override_settings
+from restclients_core.dao import MockDAO
+from restclients_core.exceptions import DataFailureException
+from restclients_core.models import MockHTTP
+from uw_trumba.dao import TrumbaCalendar_DAO, TrumbaSea_DAO
+from uw_trumba.models import TrumbaCalendar
+from uw_trumba.permissions import Permissions
+from uw_trumba.retry import (
+    CircuitBreaker, backoff_delay, get_circuit_breaker, is_server_error)
+
+FLAKY = 'uw_trumba.tests.test_retry.FlakyBackend'
+PERMISSIONS_URL = "/service/calendars.asmx/GetPermissions"
+
+
+class FlakyBackend(MockDAO):
+    """
+    Fails the next `failures` requests, then serves the mock resources.
+    If set, error is raised by the next request.
+    """
+    failures = 0
+    calls = 0
+    error = None
+
+    def load(self, method, url, headers, body):
+        FlakyBackend.calls += 1
+        if FlakyBackend.error is not None:
+            error = FlakyBackend.error
+            FlakyBackend.error = None
+            raise error
+        if FlakyBackend.failures > 0:
+            FlakyBackend.failures -= 1
+            response = MockHTTP()
+            response.status = 503
+            response.reason = "Service Unavailable"
+            return response
+        return super().load(method, url, headers, body)
+
+
+def post_permissions(calendarid=1):
+    return TrumbaSea_DAO().postURL(
+        PERMISSIONS_URL, {"Content-Type": "application/json"},
+        '{{"CalendarID": {0}}}'.format(calendarid))
+
+
+class TestRetry(TestCase):
+
+    def setUp(self):
+        FlakyBackend.failures = 0
+        FlakyBackend.calls = 0
+        FlakyBackend.error = None
+
+    def test_is_server_error(self):
+        self.assertTrue(is_server_error(0))
+        self.assertTrue(is_server_error(503))
+        self.assertFalse(is_server_error(200))
+        self.assertFalse(is_server_error(404))
+
+    def test_backoff_delay(self):
+        for attempt in range(10):
+            delay = backoff_delay(attempt, 0.5, 4)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(4, 0.5 * 2 ** attempt))
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(2, 0.05)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.is_open())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+        self.assertFalse(breaker.allow_request())
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertFalse(breaker.is_open())
+        self.assertTrue(breaker.allow_request())
+
+        self.assertIsNone(get_circuit_breaker('trumba_test', 0, 1))
+        breaker = get_circuit_breaker('trumba_test', 3, 1)
+        self.assertIs(get_circuit_breaker('trumba_test', 3, 1), breaker)
+        self.assertIsNot(get_circuit_breaker('trumba_test', 4, 1), breaker)
+
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_DAO_CLASS=FLAKY,
+                       RESTCLIENTS_TRUMBA_SEA_CIRCUIT_FAILURES=0,
+                       RESTCLIENTS_TRUMBA_SEA_RETRY_BACKOFF=0.001)
+    def test_retry(self):
+        FlakyBackend.failures = 2
+        response = post_permissions()
+        self.assertEqual(response.status, 200)
+        # plus the mock resource lookup of _edit_mock_response
+        self.assertEqual(FlakyBackend.calls, 4)
+
+        FlakyBackend.calls = 0
+        FlakyBackend.failures = 3
+        response = post_permissions()
+        self.assertEqual(response.status, 503)
+        self.assertEqual(FlakyBackend.calls, 3)
+
+        # the permission changes are not retried
+        FlakyBackend.calls = 0
+        FlakyBackend.failures = 1
+        response = TrumbaSea_DAO().getURL(
+            "/service/calendars.asmx/SetPermissions?CalendarID=1&" +
+            "Email=test10@uw.edu&Level=EDIT")
+        self.assertEqual(response.status, 503)
+        self.assertEqual(FlakyBackend.calls, 1)
+
+    @override_settings(RESTCLIENTS_CALENDAR_DAO_CLASS=FLAKY,
+                       RESTCLIENTS_CALENDAR_CIRCUIT_FAILURES=0,
+                       RESTCLIENTS_CALENDAR_RETRY_BACKOFF=0.001)
+    def test_retry_ics(self):
+        FlakyBackend.failures = 1
+        response = TrumbaCalendar_DAO().getURL(
+            "/calendars/sea_acad-comm.ics")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(FlakyBackend.calls, 2)
+
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_DAO_CLASS=FLAKY,
+                       RESTCLIENTS_TRUMBA_SEA_CIRCUIT_FAILURES=2,
+                       RESTCLIENTS_TRUMBA_SEA_CIRCUIT_RESET_TIMEOUT=0.05,
+                       RESTCLIENTS_TRUMBA_SEA_MAX_RETRIES=0)
+    def test_circuit_open(self):
+        FlakyBackend.failures = 2
+        self.assertEqual(post_permissions().status, 503)
+        self.assertEqual(post_permissions().status, 503)
+        self.assertTrue(TrumbaSea_DAO().get_circuit_breaker().is_open())
+        self.assertRaises(DataFailureException, post_permissions)
+        self.assertEqual(FlakyBackend.calls, 2)
+
+        time.sleep(0.06)
+        self.assertEqual(post_permissions().status, 200)
+        self.assertFalse(TrumbaSea_DAO().get_circuit_breaker().is_open())
+
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_DAO_CLASS=FLAKY,
+                       RESTCLIENTS_TRUMBA_SEA_CIRCUIT_FAILURES=1,
+                       RESTCLIENTS_TRUMBA_SEA_CIRCUIT_RESET_TIMEOUT=0.05,
+                       RESTCLIENTS_TRUMBA_SEA_MAX_RETRIES=0)
+    def test_circuit_trial_errors(self):
+        breaker = TrumbaSea_DAO().get_circuit_breaker()
+        FlakyBackend.failures = 1
+        self.assertEqual(post_permissions().status, 503)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # a client error closes the circuit, the server answered
+        time.sleep(0.06)
+        FlakyBackend.error = DataFailureException(
+            PERMISSIONS_URL, 404, "Not Found")
+        self.assertRaises(DataFailureException, post_permissions)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        FlakyBackend.failures = 1
+        self.assertEqual(post_permissions().status, 503)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # any other error opens the circuit again
+        time.sleep(0.06)
+        FlakyBackend.error = ssl.SSLError("handshake failure")
+        self.assertRaises(ssl.SSLError, post_permissions)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(DataFailureException, post_permissions)
+
+        time.sleep(0.06)
+        self.assertEqual(post_permissions().status, 200)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_DAO_CLASS=FLAKY,
+                       RESTCLIENTS_TRUMBA_SEA_CIRCUIT_FAILURES=0,
+                       RESTCLIENTS_TRUMBA_SEA_MAX_RETRIES=0)
+    def test_get_cal_permissions_unavailable(self):
+        p_m = Permissions()
+        cal = TrumbaCalendar(calendarid=1, campus='sea')
+        FlakyBackend.failures = 1
+        self.assertRaises(DataFailureException, p_m.get_cal_permissions, cal)
+        p_m.get_cal_permissions(cal)
+        self.assertEqual(len(cal.permissions), 3)
+
+        FlakyBackend.failures = 1
+        self.assertRaises(DataFailureException,
+                          p_m.reload_cal_permissions, cal)
+        self.assertEqual(len(cal.permissions), 3)
+
+        # other errors are still logged only
+        p_m.get_cal_permissions(TrumbaCalendar(calendarid=10000,
+                                               campus='sea'))
@@ -0,0 +1,122 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import gzip
+import json
+import os
+import time
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from uw_trumba.calendars import Calendars
+from uw_trumba.snapshot import (
+    save_snapshot, load_snapshot, get_calendars, SNAPSHOT_VERSION)
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "calendars.json.gz")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _rewrite(self, **kwargs):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        data.update(kwargs)
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def test_save_and_load(self):
+        cals = Calendars()
+        save_snapshot(cals, self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+        loaded = load_snapshot(self.path, max_age=60)
+        for campus in ['sea', 'bot', 'tac']:
+            self.assertEqual(
+                [c.to_json() for c in loaded.get_campus_calendars(campus)],
+                [c.to_json() for c in cals.get_campus_calendars(campus)])
+            self.assertEqual(loaded.total_calendars(campus),
+                             cals.total_calendars(campus))
+        self.assertEqual(loaded.sea_calendar_ids, cals.sea_calendar_ids)
+        self.assertEqual(loaded.perm_loader.account_set,
+                         cals.perm_loader.account_set)
+        trumba_cal = loaded.get_calendar('sea', 1)
+        self.assertTrue(trumba_cal.permissions['dummyp'].is_publish())
+        self.assertEqual(len(loaded.get_editable_calendars('dummyp')), 3)
+        self.assertEqual(
+            [c.calendarid for c in loaded.iter_subtree('sea', 113)],
+            [113, 1131, 1132, 11322, 11321])
+        self.assertEqual(loaded.get_depth('sea', 11321), 3)
+
+    def test_moved_calendar(self):
+        cals = Calendars()
+        # move 111 under 113, after it in the calendar dict
+        moved = cals.get_calendar('sea', 111)
+        moved.parent.children.remove(moved)
+        moved.parent = cals.get_calendar('sea', 113)
+        moved.parent.children.append(moved)
+        cals.calendars_changed()
+        save_snapshot(cals, self.path)
+
+        loaded = load_snapshot(self.path)
+        self.assertEqual(loaded.total_calendars('sea'), 10)
+        self.assertIs(loaded.get_calendar('sea', 111).parent,
+                      loaded.get_calendar('sea', 113))
+        self.assertEqual(
+            [c.calendarid for c in loaded.iter_subtree('sea', 113)],
+            [c.calendarid for c in cals.iter_subtree('sea', 113)])
+        self.assertEqual(loaded.get_depth('sea', 1111), 3)
+
+    def test_unusable_snapshot(self):
+        self.assertIsNone(load_snapshot(self.path))
+
+        with open(self.path, 'w') as f:
+            f.write("not a snapshot")
+        self.assertIsNone(load_snapshot(self.path))
+
+        save_snapshot(Calendars(), self.path)
+        self._rewrite(created=time.time() - 120)
+        self.assertIsNone(load_snapshot(self.path, max_age=60))
+        self.assertIsNotNone(load_snapshot(self.path))
+
+        self._rewrite(version=SNAPSHOT_VERSION + 1)
+        self.assertIsNone(load_snapshot(self.path))
+
+    def test_corrupt_snapshot(self):
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump([SNAPSHOT_VERSION], f)
+        self.assertIsNone(load_snapshot(self.path))
+
+        save_snapshot(Calendars(), self.path)
+        self._rewrite(accounts=None)
+        self.assertIsNone(load_snapshot(self.path))
+        self._rewrite(calendars={'sea': [[1, "name"]]})
+        self.assertIsNone(load_snapshot(self.path))
+        self._rewrite(calendars={})
+        self.assertIsNone(load_snapshot(self.path))
+        self._rewrite(calendars={'sea': [], 'bot': [], 'tac': [
+            [3, "child", [], 2]]})
+        self.assertIsNone(load_snapshot(self.path))
+        self._rewrite(created="yesterday")
+        self.assertIsNone(load_snapshot(self.path, max_age=60))
+
+        # a live load replaces it
+        cals = get_calendars(self.path)
+        self.assertEqual(cals.total_calendars('sea'), 10)
+        self.assertIsNotNone(load_snapshot(self.path))
+
+    def test_get_calendars(self):
+        cals = get_calendars(self.path)
+        self.assertEqual(cals.total_calendars('sea'), 10)
+        self.assertTrue(os.path.exists(self.path))
+
+        self._rewrite(accounts=[])
+        cals = get_calendars(self.path)
+        self.assertEqual(cals.perm_loader.total_accounts(), 0)
+
+        self._rewrite(created=0)
+        cals = get_calendars(self.path, max_age=60)
+        self.assertEqual(cals.perm_loader.total_accounts(), 3)
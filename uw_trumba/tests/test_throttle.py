@@ -0,0 +1,73 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+from unittest import TestCase
+from commonconf import override_settings
+from uw_trumba.dao import TrumbaSea_DAO, TrumbaBot_DAO
+from uw_trumba.throttle import (
+    TokenBucket, background_priority, call_in_background, is_background,
+    get_token_bucket)
+
+
+class TestThrottle(TestCase):
+
+    def test_background_priority(self):
+        self.assertFalse(is_background())
+        with background_priority():
+            self.assertTrue(is_background())
+            with background_priority():
+                self.assertTrue(is_background())
+            self.assertTrue(is_background())
+        self.assertFalse(is_background())
+        self.assertTrue(call_in_background(is_background))
+        self.assertFalse(is_background())
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(50, 2)
+        start = time.monotonic()
+        for i in range(6):
+            bucket.acquire()
+        # 2 at once, then 4 more at 50 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.07)
+        self.assertEqual(TokenBucket(0.5).burst, 1)
+        self.assertEqual(TokenBucket(20).burst, 20)
+
+    def test_interactive_first(self):
+        bucket = TokenBucket(10, 1)
+        bucket.acquire()
+        order = []
+
+        def request(interactive):
+            bucket.acquire(interactive=interactive)
+            order.append(interactive)
+
+        background = threading.Thread(target=request, args=(False,))
+        background.start()
+        time.sleep(0.02)
+        interactive = threading.Thread(target=request, args=(True,))
+        interactive.start()
+        background.join()
+        interactive.join()
+        self.assertEqual(order, [True, False])
+
+    def test_get_token_bucket(self):
+        self.assertIsNone(get_token_bucket('trumba_test', 0, 0))
+        bucket = get_token_bucket('trumba_test', 5, 0)
+        self.assertIs(get_token_bucket('trumba_test', 5, 0), bucket)
+        self.assertIsNot(get_token_bucket('trumba_test', 5, 2), bucket)
+
+    @override_settings(RESTCLIENTS_TRUMBA_SEA_RATE_LIMIT="100",
+                       RESTCLIENTS_TRUMBA_SEA_RATE_LIMIT_BURST="3")
+    def test_dao_rate_limiter(self):
+        self.assertIsNone(TrumbaBot_DAO().get_rate_limiter())
+        rate_limiter = TrumbaSea_DAO().get_rate_limiter()
+        self.assertEqual(rate_limiter.rate, 100)
+        self.assertEqual(rate_limiter.burst, 3)
+        self.assertIs(TrumbaSea_DAO().get_rate_limiter(), rate_limiter)
+        response = TrumbaSea_DAO().postURL(
+            "/service/calendars.asmx/GetPermissions",
+            {"Content-Type": "application/json"}, '{"CalendarID": 1}')
+        self.assertEqual(response.status, 200)
+        self.assertLess(rate_limiter.tokens, 3)
@@ -0,0 +1,70 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+import time
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from uw_trumba import calendar_cache, get_calendar_by_name
+from uw_trumba.calendars import Calendars
+from uw_trumba.trace import (
+    span, start_tracing, stop_tracing, tracing, _NULL_SPAN)
+
+
+class TestTrace(TestCase):
+
+    def tearDown(self):
+        stop_tracing()
+
+    def test_disabled(self):
+        self.assertIsNone(stop_tracing())
+        self.assertIs(span("a"), _NULL_SPAN)
+        with span("a"):
+            pass
+
+    def test_nested_spans(self):
+        tracer = start_tracing()
+        with span("outer", key=1):
+            with span("inner"):
+                time.sleep(0.01)
+            with span("inner"):
+                pass
+        self.assertIs(stop_tracing(), tracer)
+
+        names = [record[0] for record in tracer.spans]
+        self.assertEqual(names, ["inner", "inner", "outer"])
+        outer = tracer.spans[2]
+        self.assertEqual(outer[5], {'key': 1})
+        # the self time of outer excludes the inner spans
+        self.assertLess(outer[4], outer[3] - 10 ** 7)
+
+        profile = tracer.get_profile()
+        self.assertEqual(profile[0]['name'], "inner")
+        self.assertEqual(profile[0]['count'], 2)
+        self.assertGreaterEqual(profile[0]['total'], 0.01)
+        self.assertTrue(tracer.format_profile().startswith("span"))
+
+    def test_calendars_load(self):
+        calendar_cache.clear()
+        with tracing() as tracer:
+            Calendars()
+            get_calendar_by_name('sea_acad-comm')
+        names = set(record[0] for record in tracer.spans)
+        for name in ["Calendars._load", "GetCalendarList",
+                     "Calendars._extract_cals", "Calendars._load_permissions",
+                     "Permissions.get_cal_permissions", "load_json",
+                     "json.loads", "request", "get_calendar_by_name",
+                     "Calendar.from_ical"]:
+            self.assertIn(name, names)
+
+        tmp_dir = TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, "trace.json")
+        tracer.write_chrome_trace(path)
+        with open(path) as f:
+            events = json.load(f)['traceEvents']
+        tmp_dir.cleanup()
+        self.assertEqual(len(events), len(tracer.spans))
+        event = [e for e in events if e['name'] == "Calendars._load"][0]
+        self.assertEqual(event['ph'], "X")
+        self.assertGreater(event['dur'], 0)
@@ -0,0 +1,125 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from commonconf import override_settings
+from restclients_core.exceptions import DataFailureException
+from uw_trumba import post_sea_resource
+from uw_trumba.account import set_sea_permissions
+from uw_trumba.calendars import Calendars, calendarlist_url
+from uw_trumba.exceptions import CalendarNotExist, CalendarOwnByDiffAccount
+from uw_trumba.models import TrumbaCalendar
+from uw_trumba.permissions import _get_permissions, permissions_url
+from uw_trumba.util.backend import (
+    MemoryBackend, SyntheticBackend, lognormal_latency, uniform_latency)
+from uw_trumba.util.synthetic import SyntheticOrg
+
+MEMORY = 'uw_trumba.util.backend.MemoryBackend'
+SYNTHETIC = 'uw_trumba.util.backend.SyntheticBackend'
+
+
+@override_settings(RESTCLIENTS_DAO_CLASS=MEMORY)
+class TestMemoryBackend(TestCase):
+
+    def setUp(self):
+        MemoryBackend.reset()
+
+    def test_responses(self):
+        MemoryBackend.add_responses({
+            ("POST", permissions_url, None): '{"d": {"Users": []}}',
+            ("POST", permissions_url, '{"CalendarID": 2}'):
+                '{"d": {"Users": null}}'})
+        self.assertEqual(
+            post_sea_resource(permissions_url, '{"CalendarID": 1}').data,
+            b'{"d": {"Users": []}}')
+        self.assertEqual(
+            post_sea_resource(permissions_url, '{"CalendarID": 2}').data,
+            b'{"d": {"Users": null}}')
+        self.assertEqual(
+            post_sea_resource(calendarlist_url, "{}").status, 404)
+        MemoryBackend.add_response("POST", calendarlist_url, "{}",
+                                   service_name="trumba_bot")
+        self.assertEqual(
+            post_sea_resource(calendarlist_url, "{}").status, 404)
+        self.assertEqual(MemoryBackend.get_request_count(), 4)
+        self.assertEqual(MemoryBackend.get_request_count(
+            "POST", calendarlist_url, "trumba_sea"), 2)
+        self.assertEqual(MemoryBackend.get_request_count(
+            service_name="trumba_bot"), 0)
+
+    def test_mock_files(self):
+        MemoryBackend.reset(mock_files=True)
+        cals = Calendars()
+        self.assertEqual(cals.total_calendars('sea'), 10)
+        self.assertEqual(len(cals.get_calendar('sea', 1).permissions), 3)
+        # the loaded files are kept in the response map
+        count = len(MemoryBackend._get_state().responses)
+        self.assertEqual(Calendars().total_calendars('sea'), 10)
+        self.assertEqual(len(MemoryBackend._get_state().responses), count)
+
+    def test_latency(self):
+        latency = uniform_latency(0.01, 0.02)
+        self.assertTrue(all(0.01 <= latency() <= 0.02 for i in range(10)))
+        latency = lognormal_latency(0.01)
+        self.assertTrue(all(latency() > 0 for i in range(10)))
+
+
+@override_settings(RESTCLIENTS_DAO_CLASS=SYNTHETIC,
+                   RESTCLIENTS_RETRY_BACKOFF=0)
+class TestFaults(TestCase):
+
+    def setUp(self):
+        SyntheticBackend.configure(SyntheticOrg(calendars=20,
+                                                permissions=50))
+        self.calendar = TrumbaCalendar()
+        self.calendar.calendarid = 1
+        self.calendar.campus = 'sea'
+
+    def test_server_error(self):
+        fault = SyntheticBackend.add_fault(
+            status=503, url="GetCalendarList", count=1)
+        cals = Calendars()
+        self.assertEqual(fault.injected, 1)
+        self.assertEqual(cals.total_calendars('sea'),
+                         len(SyntheticBackend.org.campus_ids['sea']))
+        # retried once
+        self.assertEqual(SyntheticBackend.get_request_count(
+            url=calendarlist_url), 4)
+
+        SyntheticBackend.add_fault(status=500, method="POST")
+        self.assertRaises(DataFailureException,
+                          _get_permissions, self.calendar)
+
+    def test_concurrent_fail_fast(self):
+        SyntheticBackend.configure(SyntheticOrg(calendars=300,
+                                                permissions=300),
+                                   latency=0.002)
+        SyntheticBackend.add_fault(status=500, url="GetPermissions",
+                                   count=1)
+        with override_settings(RESTCLIENTS_DAO_CLASS=SYNTHETIC,
+                               RESTCLIENTS_MAX_RETRIES=0,
+                               RESTCLIENTS_CIRCUIT_FAILURES=0,
+                               RESTCLIENTS_MAX_WORKERS=2):
+            self.assertRaises(DataFailureException,
+                              Calendars, concurrent=True)
+        # the queued requests were cancelled
+        self.assertLess(
+            SyntheticBackend.get_request_count(url=permissions_url), 100)
+
+    def test_error_codes(self):
+        self.assertIsNotNone(_get_permissions(self.calendar))
+        self.assertTrue(set_sea_permissions(1, "test10", "EDIT"))
+        self.assertRaises(CalendarOwnByDiffAccount,
+                          set_sea_permissions, 10000000, "test10", "EDIT")
+
+        SyntheticBackend.add_fault(code=3006, url="GetPermissions")
+        self.assertRaises(CalendarNotExist,
+                          _get_permissions, self.calendar)
+        SyntheticBackend.add_fault(code=3007, method="GET")
+        self.assertRaises(CalendarOwnByDiffAccount,
+                          set_sea_permissions, 1, "test10", "EDIT")
+
+    def test_rate(self):
+        fault = SyntheticBackend.add_fault(code=3006, rate=0.0)
+        self.assertIsNotNone(_get_permissions(self.calendar))
+        self.assertEqual(fault.injected, 0)
@@ -0,0 +1,97 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from datetime import date, datetime
+from unittest import TestCase
+from commonconf import override_settings
+from icalendar import Calendar
+from uw_trumba.calendars import Calendars
+from uw_trumba.ical import iter_events
+from uw_trumba.exceptions import CalendarNotExist, CalendarOwnByDiffAccount
+from uw_trumba.models import TrumbaCalendar
+from uw_trumba.permissions import _get_permissions
+from uw_trumba.util.backend import SyntheticBackend
+from uw_trumba.util.synthetic import SyntheticOrg, make_ics
+
+BACKEND = 'uw_trumba.util.backend.SyntheticBackend'
+
+
+def _count(records):
+    return sum(1 + _count(record['ChildCalendars'] or [])
+               for record in records)
+
+
+class TestSyntheticOrg(TestCase):
+
+    def test_calendar_lists(self):
+        org = SyntheticOrg(calendars=200, permissions=1000)
+        total = 0
+        for campus in ('sea', 'bot', 'tac'):
+            data = json.loads(org.get_calendar_list(campus))
+            self.assertIsNone(data['d']['Messages'])
+            total += _count(data['d']['Calendars'])
+        self.assertEqual(total, 200)
+        self.assertEqual(org.get_campus(1), 'sea')
+        self.assertEqual(org.get_campus(10000000), 'bot')
+        self.assertIsNone(org.get_campus(5000))
+
+    def test_deterministic(self):
+        org = SyntheticOrg(calendars=100, permissions=2000, seed=3)
+        other = SyntheticOrg(calendars=100, permissions=2000, seed=3)
+        self.assertEqual(org.get_calendar_list('sea'),
+                         other.get_calendar_list('sea'))
+        self.assertEqual(org.get_permissions(7), other.get_permissions(7))
+        total = sum(len(org.get_users(calendarid))
+                    for ids in org.campus_ids.values()
+                    for calendarid in ids)
+        self.assertTrue(1000 < total < 3000)
+
+
+class TestSyntheticFeed(TestCase):
+
+    def test_make_ics(self):
+        data = make_ics(50, seed=2, recurring=0.5)
+        self.assertEqual(data, make_ics(50, seed=2, recurring=0.5))
+        self.assertTrue(all(len(line) <= 75
+                            for line in data.split(b"\r\n")))
+        self.assertIn(b"\r\n ", data)
+
+        calendar = Calendar.from_ical(data.decode('UTF-8'))
+        events = calendar.walk('VEVENT')
+        self.assertEqual(len(events), 50)
+        self.assertEqual(len(list(iter_events(data))), 50)
+        self.assertEqual(
+            [str(field) for field in events[0]['X-TRUMBA-CUSTOMFIELD']][0],
+            "Important Dates/Deadlines")
+        self.assertTrue(any('RRULE' in event for event in events))
+        starts = [event.decoded('DTSTART') for event in events]
+        self.assertTrue(any(type(start) is date for start in starts))
+        self.assertTrue(any(isinstance(start, datetime) and
+                            start.tzinfo is not None for start in starts))
+
+
+@override_settings(RESTCLIENTS_DAO_CLASS=BACKEND)
+class TestSyntheticBackend(TestCase):
+
+    def setUp(self):
+        SyntheticBackend.configure(SyntheticOrg(calendars=50,
+                                                permissions=200))
+
+    def test_load_calendars(self):
+        cals = Calendars(concurrent=True)
+        # the 3 calendar lists and a GetPermissions per calendar
+        self.assertEqual(
+            SyntheticBackend.get_request_count(),
+            3 + sum(len(c) for c in cals.campus_calendars.values()))
+
+    def test_errors(self):
+        calendar = TrumbaCalendar()
+        calendar.calendarid = 999
+        calendar.campus = 'sea'
+        self.assertRaises(CalendarNotExist, _get_permissions, calendar)
+        calendar.calendarid = 10000000
+        self.assertRaises(CalendarOwnByDiffAccount,
+                          _get_permissions, calendar)
+        calendar.calendarid = 1
+        self.assertIsNone(_get_permissions(calendar)['d']['Messages'])
@@ -0,0 +1,104 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Rate limiting of the requests sent with each Trumba campus account.
+The requests made inside background_priority() (ie, the Calendars
+loading and the bulk permission changes) yield to the interactive
+ones whenever both are waiting for a token.
+"""
+
+import threading
+import time
+
+
+_local = threading.local()
+
+
+class background_priority(object):
+    """
+    A context manager marking the requests of the current thread
+    as background ones.
+    """
+
+    def __enter__(self):
+        self.previous = is_background()
+        _local.background = True
+        return self
+
+    def __exit__(self, *args):
+        _local.background = self.previous
+
+
+def is_background():
+    return getattr(_local, 'background', False)
+
+
+def call_in_background(func, *args):
+    """
+    Call func in background_priority, for use in a worker thread
+    """
+    with background_priority():
+        return func(*args)
+
+
+class TokenBucket(object):
+    """
+    Allow rate requests per second on average and up to burst
+    requests at once.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst else max(1.0, self.rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.waiting_interactive = 0
+        self.condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, interactive=True):
+        """
+        Block until a token is available for the request
+        """
+        with self.condition:
+            if interactive:
+                self.waiting_interactive += 1
+            try:
+                while True:
+                    self._refill()
+                    if self.tokens >= 1 and (
+                            interactive or self.waiting_interactive == 0):
+                        self.tokens -= 1
+                        return
+                    self.condition.wait(
+                        max(1 - self.tokens, 0.1) / self.rate)
+            finally:
+                if interactive:
+                    self.waiting_interactive -= 1
+                    self.condition.notify_all()
+
+
+_buckets = {}
+# a dict of {service, ((rate, burst), TokenBucket)}
+_buckets_lock = threading.Lock()
+
+
+def get_token_bucket(service, rate, burst=None):
+    """
+    :return: the TokenBucket shared by the DAOs of the service,
+        None if rate is not set.
+    """
+    if not rate:
+        return None
+    with _buckets_lock:
+        entry = _buckets.get(service)
+        if entry is None or entry[0] != (rate, burst):
+            entry = ((rate, burst), TokenBucket(rate, burst))
+            _buckets[service] = entry
+        return entry[1]
@@ -0,0 +1,192 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Opt-in tracing of the phases of the Calendars loading and of the
+calendar feed requests. While no Tracer is started, span() returns a
+shared no-op context manager. The spans of a Tracer can be exported
+as Chrome trace-event JSON (for chrome://tracing or Perfetto) or as a
+flat profile table.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.child_time = 0
+
+    def __enter__(self):
+        self.parent = self.tracer._push(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *args):
+        duration = time.perf_counter_ns() - self.start
+        self.tracer._pop(self, duration)
+        return False
+
+
+class Tracer(object):
+    """
+    The spans recorded by all the threads of the process,
+    each a tuple of (name, thread id, start ns, duration ns,
+    self time ns, args).
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _push(self, span):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        parent = stack[-1] if stack else None
+        stack.append(span)
+        return parent
+
+    def _pop(self, span, duration):
+        self._local.stack.pop()
+        if span.parent is not None:
+            span.parent.child_time += duration
+        record = (span.name, threading.get_ident(), span.start - self.origin,
+                  duration, duration - span.child_time, span.args)
+        with self._lock:
+            self.spans.append(record)
+
+    def to_chrome_trace(self):
+        """
+        :return: a dict of the spans in the Chrome trace-event format
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        return {'traceEvents': [
+            {'name': name,
+             'cat': 'uw_trumba',
+             'ph': 'X',
+             'ts': start / 1000.0,
+             'dur': duration / 1000.0,
+             'pid': pid,
+             'tid': tid,
+             'args': args}
+            for name, tid, start, duration, self_time, args in spans],
+            'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def get_profile(self):
+        """
+        :return: a list of dicts of the name, count, total, self, mean
+        and max time (in seconds) of the spans of each name, from the
+        largest self time.
+        """
+        rows = {}
+        with self._lock:
+            spans = list(self.spans)
+        for name, tid, start, duration, self_time, args in spans:
+            row = rows.get(name)
+            if row is None:
+                row = {'name': name, 'count': 0, 'total': 0,
+                       'self': 0, 'max': 0}
+                rows[name] = row
+            row['count'] += 1
+            row['total'] += duration
+            row['self'] += self_time
+            row['max'] = max(row['max'], duration)
+        profile = []
+        for row in sorted(rows.values(), key=lambda r: -r['self']):
+            profile.append({'name': row['name'],
+                            'count': row['count'],
+                            'total': row['total'] / 1e9,
+                            'self': row['self'] / 1e9,
+                            'mean': row['total'] / row['count'] / 1e9,
+                            'max': row['max'] / 1e9})
+        return profile
+
+    def format_profile(self):
+        """
+        :return: the profile as a text table
+        """
+        lines = ["{0:<40} {1:>8} {2:>10} {3:>10} {4:>10} {5:>10}".format(
+            "span", "count", "total(s)", "self(s)", "mean(ms)", "max(ms)")]
+        for row in self.get_profile():
+            lines.append(
+                "{0:<40} {1:>8} {2:>10.4f} {3:>10.4f} {4:>10.3f} "
+                "{5:>10.3f}".format(
+                    row['name'][:40], row['count'], row['total'],
+                    row['self'], row['mean'] * 1000, row['max'] * 1000))
+        return "\n".join(lines)
+
+
+_tracer = None
+
+
+def span(name, **args):
+    """
+    :return: a context manager timing the enclosed code as the span
+    name if tracing is started
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+
+def start_tracing():
+    """
+    :return: a new Tracer recording the spans from now on
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing():
+    """
+    :return: the Tracer stopped, None if tracing wasn't started
+    """
+    global _tracer
+    tracer = _tracer
+    _tracer = None
+    return tracer
+
+
+class tracing(object):
+    """
+    A context manager tracing the enclosed code, ie,
+        with tracing() as tracer:
+            Calendars()
+        tracer.write_chrome_trace("load.json")
+    """
+
+    def __enter__(self):
+        return start_tracing()
+
+    def __exit__(self, *args):
+        stop_tracing()
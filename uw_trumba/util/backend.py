@@ -0,0 +1,307 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Programmable in-memory DAO implementations for the offline load tests
+of the Trumba services. Select one with the DAO_CLASS setting of the
+services, ie,
+    RESTCLIENTS_TRUMBA_SEA_DAO_CLASS =
+        'uw_trumba.util.backend.SyntheticBackend'
+MemoryBackend serves a preloaded map of responses, with a latency
+(constant or drawn from a distribution), injected faults (Trumba
+error codes or http errors) and request counts.
+SyntheticBackend also answers the calendar requests from a
+SyntheticOrg. Both report is_mock() False, so the DAO doesn't look
+for an alternative mock file on a 404.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from restclients_core.dao import MockDAO
+from restclients_core.models import MockHTTP
+from uw_trumba.util.synthetic import (
+    SyntheticOrg, make_error_response, make_xml_response)
+
+CAMPUSES = {'trumba_sea': 'sea', 'trumba_bot': 'bot', 'trumba_tac': 'tac'}
+CODE_DESCRIPTIONS = {
+    1003: "Permission set for calendar",
+    3006: "Calendar does not exist",
+    3007: "Calendar is owned by a different account"}
+REASONS = {200: "OK", 404: "Not Found", 500: "Internal Server Error",
+           502: "Bad Gateway", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+_lock = threading.Lock()
+
+
+def uniform_latency(low, high):
+    """
+    :return: a latency function of seconds uniformly in [low, high]
+    """
+    return lambda: random.uniform(low, high)
+
+
+def lognormal_latency(median, sigma=0.5):
+    """
+    :return: a latency function of seconds log-normally distributed
+    around median, ie, with a long tail of slow responses
+    """
+    mu = math.log(median)
+    return lambda: random.lognormvariate(mu, sigma)
+
+
+class Fault(object):
+    """
+    An error returned, with a rate probability, to the requests of
+    method (any if None) whose url contains url (any if None),
+    at most count times (no limit if None).
+    A code returns the Trumba error code in a 200 response (json for
+    a POST, xml for a GET), otherwise the http status is returned.
+    """
+
+    def __init__(self, status=500, code=None, rate=1.0, method=None,
+                 url=None, count=None):
+        self.status = status
+        self.code = code
+        self.rate = rate
+        self.method = method
+        self.url = url
+        self.count = count
+        self.injected = 0
+
+    def matches(self, method, url):
+        return ((self.method is None or self.method == method) and
+                (self.url is None or self.url in url))
+
+    def make_response(self, method):
+        if self.code is None:
+            return _make_response(self.status, b"")
+        description = CODE_DESCRIPTIONS.get(self.code, "Injected error")
+        if method == "GET":
+            return _make_response(
+                200, make_xml_response(self.code, description),
+                "text/xml")
+        return _make_response(
+            200, make_error_response(self.code, description))
+
+
+class _State(object):
+
+    def __init__(self):
+        self.responses = {}
+        # {(service name or None, method, url, body or None),
+        #  (status, data, content type)}
+        self.faults = []
+        self.latency = 0.0
+        # seconds, or a function returning the seconds
+        self.counts = {}
+        # {(service name, method, url path), count}
+        self.mock_files = False
+
+
+class MemoryBackend(object):
+    """
+    A new instance is created for each request, the state is kept on
+    the class (each subclass has its own).
+    """
+
+    def __init__(self, service_name, dao):
+        self.service_name = service_name
+        self.dao = dao
+
+    @classmethod
+    def _get_state(cls):
+        state = cls.__dict__.get('_state')
+        if state is None:
+            state = _State()
+            cls._state = state
+        return state
+
+    @classmethod
+    def reset(cls, latency=0.0, mock_files=False):
+        """
+        Clear the responses, the faults and the counts
+        :param latency: the seconds each response is delayed,
+            or a function returning them, ie, uniform_latency(0.01, 0.1)
+        :param mock_files: if True, the requests not in the map are
+            answered from the mock resource files, each loaded once.
+        """
+        state = _State()
+        state.latency = latency
+        state.mock_files = mock_files
+        cls._state = state
+
+    @classmethod
+    def add_response(cls, method, url, data, body=None, status=200,
+                     content_type="application/json", service_name=None):
+        """
+        Answer the requests of (method, url, body) with data, of any
+        body if body is None, on the service (any if None).
+        """
+        if isinstance(data, str):
+            data = data.encode('UTF-8')
+        cls._get_state().responses[(service_name, method, url, body)] = (
+            status, data, content_type)
+
+    @classmethod
+    def add_responses(cls, responses, service_name=None):
+        """
+        :param responses: a dict of {(method, url, body), data}
+        """
+        for (method, url, body), data in responses.items():
+            cls.add_response(method, url, data, body=body,
+                             service_name=service_name)
+
+    @classmethod
+    def add_fault(cls, **kwargs):
+        """
+        Add a Fault of the kwargs, checked in the order added
+        :return: the Fault
+        """
+        fault = Fault(**kwargs)
+        cls._get_state().faults.append(fault)
+        return fault
+
+    @classmethod
+    def get_request_count(cls, method=None, url=None, service_name=None):
+        """
+        :return: the number of the requests received of the method,
+        the url path and the service, all if None
+        """
+        with _lock:
+            return sum(
+                count for (service, m, path), count in
+                cls._get_state().counts.items()
+                if ((method is None or m == method) and
+                    (url is None or path == url) and
+                    (service_name is None or service == service_name)))
+
+    def is_mock(self):
+        # serves complete responses, no mock file edits are needed
+        return False
+
+    def load(self, method, url, headers, body):
+        state = self._get_state()
+        path = url.split("?")[0]
+        key = (self.service_name, method, path)
+        fault = None
+        with _lock:
+            state.counts[key] = state.counts.get(key, 0) + 1
+            for item in state.faults:
+                if (item.matches(method, url) and
+                        (item.count is None or item.injected < item.count)
+                        and random.random() < item.rate):
+                    item.injected += 1
+                    fault = item
+                    break
+
+        latency = (state.latency() if callable(state.latency)
+                   else state.latency)
+        if latency:
+            time.sleep(latency)
+        if fault is not None:
+            return fault.make_response(method)
+
+        for service_name in (self.service_name, None):
+            stored = state.responses.get(
+                (service_name, method, url, body),
+                state.responses.get((service_name, method, url, None)))
+            if stored is not None:
+                return _make_response(*stored)
+        response = self._respond(method, url, body)
+        if response is None and state.mock_files:
+            response = self._load_mock_file(method, url, headers, body)
+            self.add_response(method, url, response.data, body=body,
+                              status=response.status,
+                              content_type=response.getheader(
+                                  "Content-Type", None),
+                              service_name=self.service_name)
+        return response if response is not None else _make_response(404)
+
+    def _respond(self, method, url, body):
+        """
+        :return: the response of a request not in the map, None if unknown
+        """
+        return None
+
+    def _load_mock_file(self, method, url, headers, body):
+        mock = MockDAO(self.service_name, self.dao)
+        response = mock.load(method, url, headers, body)
+        if (response.status == 404 and method != "GET" and
+                hasattr(self.dao, '_get_mock_file_path')):
+            response = mock.load(
+                method, self.dao._get_mock_file_path(url, method, body),
+                headers, body)
+        return response
+
+
+class SyntheticBackend(MemoryBackend):
+    """
+    Answers the GetCalendarList, GetPermissions and SetPermissions
+    requests of the campus accounts from a SyntheticOrg
+    """
+    org = None
+
+    @classmethod
+    def configure(cls, org=None, latency=0.0, mock_files=False):
+        """
+        :param org: a SyntheticOrg, a default one if None
+        """
+        cls.org = org if org is not None else SyntheticOrg()
+        cls.reset(latency=latency, mock_files=mock_files)
+
+    def _respond(self, method, url, body):
+        campus = CAMPUSES.get(self.service_name)
+        if campus is None:
+            return None
+        if self.org is None:
+            type(self).org = SyntheticOrg()
+        path = url.split("?")[0]
+        if method == "POST" and path.endswith("/GetCalendarList"):
+            return _make_response(200, self.org.get_calendar_list(campus))
+        if method == "POST" and path.endswith("/GetPermissions"):
+            calendarid = json.loads(body).get('CalendarID')
+            code = self._check_calendar(campus, calendarid)
+            if code is not None:
+                return _make_response(200, make_error_response(
+                    code, CODE_DESCRIPTIONS[code]))
+            return _make_response(200, self.org.get_permissions(calendarid))
+        if method == "GET" and path.endswith("/SetPermissions"):
+            calendarid = _get_query_value(url, "CalendarID")
+            code = self._check_calendar(
+                campus, int(calendarid) if calendarid else None)
+            if code is None:
+                code = 1003
+            return _make_response(200, make_xml_response(
+                code, CODE_DESCRIPTIONS[code]), "text/xml")
+        return None
+
+    def _check_calendar(self, campus, calendarid):
+        """
+        :return: the Trumba error code of a request on the calendar,
+        None if the calendar is of the campus
+        """
+        calendar_campus = self.org.get_campus(calendarid)
+        if calendar_campus is None:
+            return 3006
+        if calendar_campus != campus:
+            return 3007
+        return None
+
+
+def _get_query_value(url, name):
+    values = parse_qs(urlsplit(url).query).get(name)
+    return values[0] if values else None
+
+
+def _make_response(status, data=None, content_type="application/json"):
+    response = MockHTTP()
+    response.status = status
+    response.reason = REASONS.get(status, "Error")
+    response.data = data
+    response.headers = ({"Content-Type": content_type}
+                        if content_type else {})
+    return response
@@ -0,0 +1,241 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Generators of large, realistic Trumba organizations: the calendar
+trees of the GetCalendarList responses and the user lists of the
+GetPermissions responses, and of the iCalendar feeds of the calendars,
+deterministic for a given seed.
+"""
+
+import json
+import random
+from datetime import date, timedelta
+from uw_trumba.models import Permission
+
+
+CAMPUS_SHARES = (('sea', 0.7), ('bot', 0.15), ('tac', 0.15))
+FIRST_IDS = {'sea': 1, 'bot': 10000000, 'tac': 20000000}
+LEVELS = ((Permission.PUBLISH, 0.05), (Permission.EDIT, 0.3),
+          (Permission.SHOWON, 0.5), (Permission.VIEW, 0.15))
+
+
+class SyntheticOrg(object):
+    """
+    calendars calendars split between the campuses, in trees of up to
+    max_depth levels, with permissions permission entries in total.
+    """
+
+    def __init__(self, calendars=1000, permissions=10000, seed=0,
+                 max_depth=4):
+        self.seed = seed
+        self.total_calendars = calendars
+        self.avg_permissions = float(permissions) / max(calendars, 1)
+        self.total_users = max(10, permissions // 5)
+        self.campus_ids = {}
+        # {campus, list of calendar ids}
+        self.calendar_lists = {}
+        # {campus, the GetCalendarList json data}
+        rand = random.Random(seed)
+        remaining = calendars
+        for i, (campus, share) in enumerate(CAMPUS_SHARES):
+            count = (remaining if i == len(CAMPUS_SHARES) - 1
+                     else int(calendars * share))
+            remaining -= count
+            self.calendar_lists[campus] = self._make_calendar_list(
+                rand, campus, count, max_depth)
+        self._campus_of = {
+            calendarid: campus
+            for campus, ids in self.campus_ids.items() for calendarid in ids}
+
+    def _make_calendar_list(self, rand, campus, count, max_depth):
+        ids = list(range(FIRST_IDS[campus], FIRST_IDS[campus] + count))
+        self.campus_ids[campus] = ids
+        roots = []
+        nodes = []
+        # a list of (record, depth) of the calendars that can have children
+        for calendarid in ids:
+            record = {'ID': calendarid,
+                      'Name': _make_name(rand, campus, calendarid),
+                      'ChildCalendars': None}
+            if not nodes or rand.random() < 0.02:
+                roots.append(record)
+                depth = 1
+            else:
+                parent, depth = nodes[rand.randrange(len(nodes))]
+                if parent['ChildCalendars'] is None:
+                    parent['ChildCalendars'] = []
+                parent['ChildCalendars'].append(record)
+                depth += 1
+            if depth < max_depth:
+                nodes.append((record, depth))
+        return {'d': {'__type': 'Graw.Rainbow.Import.Response',
+                      'Calendars': roots,
+                      'Messages': None,
+                      'Users': None}}
+
+    def get_campus(self, calendarid):
+        """
+        :return: the campus code of the calendar, None if unknown
+        """
+        return self._campus_of.get(calendarid)
+
+    def get_calendar_list(self, campus):
+        """
+        :return: the body of the GetCalendarList response of the campus
+        """
+        return json.dumps(self.calendar_lists[campus]).encode('UTF-8')
+
+    def get_users(self, calendarid):
+        """
+        :return: the list of the users of the GetPermissions response
+        of the calendar
+        """
+        rand = random.Random(self.seed * 1000003 + calendarid)
+        count = rand.randint(0, int(2 * self.avg_permissions))
+        users = []
+        for index in rand.sample(range(self.total_users),
+                                 min(count, self.total_users)):
+            email = ("user{0}@uw.edu" if rand.random() < 0.97
+                     else "user{0}@example.com").format(index)
+            users.append({'Email': email,
+                          'Name': "User {0}".format(index),
+                          'Level': _choose(rand, LEVELS)})
+        return users
+
+    def get_permissions(self, calendarid):
+        """
+        :return: the body of the GetPermissions response of the calendar
+        """
+        return json.dumps({'d': {'__type': 'Graw.Rainbow.Import.Response',
+                                 'Calendars': None,
+                                 'Messages': None,
+                                 'Users': self.get_users(calendarid)}}
+                          ).encode('UTF-8')
+
+
+def make_error_response(code, description):
+    """
+    :return: the body of a json response with a Trumba error code
+    """
+    return json.dumps({'d': {'__type': 'Graw.Rainbow.Import.Response',
+                             'Calendars': None,
+                             'Messages': [{'Code': code,
+                                           'Description': description}],
+                             'Users': None}}).encode('UTF-8')
+
+
+def make_xml_response(code, description):
+    """
+    :return: the body of an xml response with a Trumba response code
+    """
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\r\n'
+        '<Response xmlns="http://tempuri.org/">\r\n'
+        '  <ResponseMessage Code="{0}" Description="{1}" '
+        'Level="Information" />\r\n'
+        '</Response>').format(code, description).encode('UTF-8')
+
+
+ICS_HEADER = (
+    "BEGIN:VCALENDAR",
+    "PRODID:-//Trumba Corporation//Trumba Calendar Services 0.11.11919//EN",
+    "VERSION:2.0",
+    "CALSCALE:GREGORIAN",
+    "X-WR-CALNAME:UW Seattle Synthetic Calendar",
+    "X-WR-TIMEZONE:America/Los_Angeles",
+    "METHOD:PUBLISH")
+QUARTERS = ("Winter", "Spring", "Summer", "Autumn")
+
+
+def iter_ics(events, seed=0, first_day=date(2015, 1, 1), days=1461,
+             recurring=0.1):
+    """
+    :param events: the number of VEVENTs in the feed
+    :param days: the number of days the event starts are spread over
+    :param recurring: the fraction of the events with a weekly RRULE
+    :return: a generator of the bytes of an iCalendar feed shaped like
+    the Trumba feeds (folded lines, X-TRUMBA-CUSTOMFIELD properties,
+    all-day and timed events), one component at a time.
+    """
+    rand = random.Random(seed)
+    yield _make_lines(ICS_HEADER)
+    for number in range(events):
+        day = first_day + timedelta(days=rand.randrange(days))
+        yield _make_lines(_make_event(rand, number, day, recurring))
+    yield _make_lines(("END:VCALENDAR",))
+
+
+def make_ics(events, **kwargs):
+    """
+    :return: the bytes of a feed of iter_ics(events, **kwargs)
+    """
+    return b"".join(iter_ics(events, **kwargs))
+
+
+def _make_event(rand, number, day, recurring):
+    quarter = QUARTERS[(day.month - 1) // 3]
+    lines = ["BEGIN:VEVENT",
+             "SUMMARY:Synthetic event {0} for Seattle Campus".format(number)]
+    if rand.random() < 0.2:
+        lines.append("DTSTART;VALUE=DATE:{0:%Y%m%d}".format(day))
+        lines.append("DTEND;VALUE=DATE:{0:%Y%m%d}".format(
+            day + timedelta(days=1)))
+        lines.append("X-MICROSOFT-CDO-ALLDAYEVENT:TRUE")
+    else:
+        hour = rand.randrange(7, 20)
+        lines.append(
+            "DTSTART;TZID=America/Los_Angeles:{0:%Y%m%d}T{1:02d}0000".format(
+                day, hour))
+        lines.append(
+            "DTEND;TZID=America/Los_Angeles:{0:%Y%m%d}T{1:02d}3000".format(
+                day, hour + 1))
+    if rand.random() < recurring:
+        lines.append("RRULE:FREQ=WEEKLY;COUNT={0}".format(
+            rand.randrange(2, 11)))
+    lines.extend((
+        "URL:http://www.washington.edu/calendar/?trumbaEmbed=eventid%3D"
+        "{0}".format(number),
+        'X-TRUMBA-CUSTOMFIELD;NAME="Event Type";ID=21;TYPE=number:'
+        "Important Dates/Deadlines",
+        'X-TRUMBA-CUSTOMFIELD;NAME="Year";ID=30147;TYPE=CustomAsset:'
+        "{0}".format(day.year),
+        'X-TRUMBA-CUSTOMFIELD;NAME="Quarter";ID=30148;TYPE=CustomAsset:'
+        "{0}".format(quarter),
+        "DTSTAMP:20140121T144710Z",
+        "DESCRIPTION:Year: {0}\\nQuarter: {1}\\nLink: "
+        "http://www.washington.edu/calendar/event/{2}/".format(
+            day.year, quarter, number),
+        "CATEGORIES:Synthetic",
+        "UID:http://uid.trumba.com/event/{0}".format(100000000 + number),
+        "END:VEVENT"))
+    return lines
+
+
+def _make_lines(lines):
+    return "".join(_fold(line) for line in lines).encode('UTF-8')
+
+
+def _fold(line, width=75):
+    """
+    :return: the content line folded at width characters, with CRLF
+    """
+    parts = [line[:width]]
+    for index in range(width, len(line), width - 1):
+        parts.append(" " + line[index:index + width - 1])
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _make_name(rand, campus, calendarid):
+    if rand.random() < 0.01:
+        return "Migrated calendar {0}".format(calendarid)
+    return "{0} calendar {1}".format(campus.upper(), calendarid)
+
+
+def _choose(rand, weighted):
+    value = rand.random()
+    for item, weight in weighted:
+        value -= weight
+        if value < 0:
+            return item
+    return weighted[-1][0]